@@ -3,7 +3,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 # 🚨 IMPORTAÇÕES CRÍTICAS (User e Profile)
-from .models import User, Profile 
+from .models import User, Profile, Arquivo, PortfolioItem 
 from .forms import AdminUserCreationForm, ClientProfessionalChangeForm 
 
 # --- 1. Inline para o Perfil (DEVE SER DEFINIDO PRIMEIRO) ---
@@ -20,6 +20,8 @@ class ProfileInline(admin.StackedInline):
         'servico_principal', 'descricao_servicos', 
         'palavras_chave', 'cnpj', 'rating'
     )
+    # Mantida pelos signals de Feedback (o save do perfil não grava a média)
+    readonly_fields = ('rating',)
 
 # --- 2. Admin Customizado para o Usuário (User) ---
 class UserAdmin(BaseUserAdmin):
@@ -64,4 +66,18 @@ except admin.sites.NotRegistered:
     pass
 
 # Registra o seu modelo User customizado com a sua classe UserAdmin
-admin.site.register(User, UserAdmin)
\ No newline at end of file
+admin.site.register(User, UserAdmin)
+
+
+# --- 4. Mídia ---
+@admin.register(Arquivo)
+class ArquivoAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'content_type', 'tamanho', 'created_at')
+    search_fields = ('sha256',)
+    readonly_fields = ('sha256', 'nome', 'tamanho', 'content_type', 'created_at')
+
+
+@admin.register(PortfolioItem)
+class PortfolioItemAdmin(admin.ModelAdmin):
+    list_display = ('profile', 'legenda', 'created_at')
+    raw_id_fields = ('profile', 'arquivo')
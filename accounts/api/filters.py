@@ -0,0 +1,61 @@
+# accounts/api/filters.py
+
+from rest_framework.filters import BaseFilterBackend
+
+from accounts.models import Profile, User
+from accounts.search import extrair_tags, get_search_backend, intervalo_de_prefixo
+from localizacao.filters import PerfilDoUsuarioProximidadeFilter
+
+
+class ProfileFullTextSearchFilter(BaseFilterBackend):
+    """
+    Substitui o SearchFilter (LIKE '%termo%') pelo índice invertido de perfis.
+    Uso: ?search=eletricista centro
+    - Termo com '@' é tratado como e-mail exato (comportamento do antigo '=email').
+    - Os resultados são ordenados por relevância (anotação 'search_rank').
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        termo = request.query_params.get(self.search_param, '').strip()
+        if not termo:
+            return queryset
+
+        if '@' in termo:
+            # E-mails são gravados em minúsculas: busca exata, pelo índice único
+            return queryset.filter(email=User.objects.normalize_email(termo))
+
+        queryset = get_search_backend().buscar(queryset, termo)
+        return queryset.order_by('-search_rank', 'id')
+
+
+class ProfileTagFilter(BaseFilterBackend):
+    """
+    Filtra profissionais pela tabela normalizada de tags (joins indexados).
+    - ?tag=bolo&tag=pao de mel -> perfis que têm TODAS as tags informadas (igualdade exata)
+    - ?tag_prefix=bri          -> perfis com alguma tag iniciando em "bri" (busca por intervalo)
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        TagLink = Profile.tags.through
+
+        for valor in request.query_params.getlist('tag'):
+            for termo in extrair_tags(valor):
+                perfis = TagLink.objects.filter(palavrachave__termo=termo).values('profile_id')
+                queryset = queryset.filter(profile__id__in=perfis)
+
+        prefixo = request.query_params.get('tag_prefix', '')
+        intervalo = intervalo_de_prefixo(prefixo)
+        if intervalo:
+            inicio, fim = intervalo
+            perfis = TagLink.objects.filter(
+                palavrachave__termo__gte=inicio, palavrachave__termo__lt=fim
+            ).values('profile_id')
+            queryset = queryset.filter(profile__id__in=perfis)
+
+        return queryset
+
+
+class ProfissionalProximidadeFilter(PerfilDoUsuarioProximidadeFilter):
+    """ ?cep=24020000&raio_km=15 -> profissionais a até 15 km do CEP (ou do CEP do usuário logado). """
+    prefixo = 'profile__'
@@ -1,10 +1,16 @@
+from collections.abc import Mapping
+
 from rest_framework import serializers
-from accounts.models import User, Profile 
+from accounts.models import User, Profile, PalavraChave, PortfolioItem, UploadSessao
+from accounts.midia import get_config as get_config_midia
+from app_servicos.models import CONTADOR_CLIENTE_POR_STATUS
+from agenda.intervalos import formatar
 from django.db import transaction 
 from rest_framework.authtoken.serializers import AuthTokenSerializer as DRFAuthTokenSerializer
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import authenticate 
 from rest_framework.authtoken.models import Token 
+from djoser.serializers import SetUsernameSerializer, UserCreateSerializer
 
 # --- 1. Serializer do Modelo Profile (Aninhado) ---
 class ProfileSerializer(serializers.ModelSerializer):
@@ -41,12 +47,16 @@ class FullProfileSerializer(serializers.ModelSerializer):
     rating = serializers.SerializerMethodField(read_only=True)
     feedback_count = serializers.SerializerMethodField(read_only=True)
     demands_completed = serializers.SerializerMethodField(read_only=True) 
+    demandas_criadas = serializers.SerializerMethodField(read_only=True)
+    avatar_url = serializers.SerializerMethodField(read_only=True)
+    banner_url = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = User
         fields = (
             'id', 'email', 'is_professional', 'date_joined', 
-            'profile', 'rating', 'feedback_count', 'demands_completed'
+            'profile', 'rating', 'feedback_count', 'demands_completed', 'demandas_criadas',
+            'avatar_url', 'banner_url',
         )
         read_only_fields = ('email', 'date_joined', 'id')
     
@@ -59,14 +69,34 @@ class FullProfileSerializer(serializers.ModelSerializer):
         
     def get_feedback_count(self, obj):
         if hasattr(obj, 'profile') and obj.profile is not None:
-             # Usar getattr para lidar com campos que podem não existir no Profile
-             return getattr(obj.profile, 'feedback_count', 0)
+             # Contador mantido incrementalmente pelos signals de Feedback
+             return obj.profile.feedback_count
         return 0 
         
     def get_demands_completed(self, obj):
-        # Este campo é um mock, mantido como 0.
+        # Contador desnormalizado (signals de Demanda), sem COUNT em 'demandas_aceitas'
+        if hasattr(obj, 'profile') and obj.profile is not None:
+            return obj.profile.demandas_concluidas
         return 0
 
+    def get_demandas_criadas(self, obj):
+        # Demandas criadas pelo usuário (como cliente), por status
+        if hasattr(obj, 'profile') and obj.profile is not None:
+            return {
+                status: getattr(obj.profile, campo)
+                for status, campo in CONTADOR_CLIENTE_POR_STATUS.items()
+            }
+        return {}
+
+    # Imagens enviadas por /perfil/photo/, /upload-midia/ ou /uploads/ (ver accounts/midia.py)
+    def get_avatar_url(self, obj):
+        profile = getattr(obj, 'profile', None)
+        return profile.foto.url if profile is not None and profile.foto_id else None
+
+    def get_banner_url(self, obj):
+        profile = getattr(obj, 'profile', None)
+        return profile.banner.url if profile is not None and profile.banner_id else None
+
     @transaction.atomic
     def update(self, instance, validated_data):
         profile_data = validated_data.pop('profile', None)
@@ -103,10 +133,17 @@ class ProfessionalSerializer(serializers.ModelSerializer):
     servico_principal = serializers.SerializerMethodField()
     cidade = serializers.SerializerMethodField()
     rating = serializers.SerializerMethodField()
+    relevancia = serializers.SerializerMethodField()
+    distancia_km = serializers.SerializerMethodField()
+    horarios_livres = serializers.SerializerMethodField()
+    avatar_url = serializers.SerializerMethodField()
 
     class Meta:
         model = User
-        fields = ('id', 'email', 'full_name', 'servico_principal', 'cidade', 'rating') 
+        fields = (
+            'id', 'email', 'full_name', 'servico_principal', 'cidade', 'rating', 'relevancia', 'distancia_km',
+            'horarios_livres', 'avatar_url',
+        )
         
     def get_full_name(self, obj):
         return obj.profile.full_name if hasattr(obj, 'profile') and obj.profile is not None else obj.email
@@ -119,9 +156,82 @@ class ProfessionalSerializer(serializers.ModelSerializer):
 
     def get_rating(self, obj):
         return obj.profile.rating if hasattr(obj, 'profile') and obj.profile is not None else 0.00
+
+    def get_relevancia(self, obj):
+        # Só existe quando a listagem veio de uma busca (?search=); anotado pelo filtro de busca.
+        rank = getattr(obj, 'search_rank', None)
+        return round(rank, 4) if rank is not None else None
+
+    def get_distancia_km(self, obj):
+        # Só existe quando a listagem foi filtrada por ?raio_km= (filtro de proximidade).
+        distancia = getattr(obj, 'distancia_km', None)
+        return round(distancia, 1) if distancia is not None else None
+
+    def get_horarios_livres(self, obj):
+        # Só existe quando a listagem foi filtrada por ?livre_em= (DisponibilidadeFilter).
+        horarios = getattr(self.context.get('view'), 'horarios_livres', None)
+        if horarios is None:
+            return None
+        return [formatar(inicio) for inicio in horarios.get(obj.pk, [])]
+
+    def get_avatar_url(self, obj):
+        # 'profile__foto' vem no select_related da view
+        profile = getattr(obj, 'profile', None)
+        return profile.foto.url if profile is not None and profile.foto_id else None
     
     
-# --- 4. Serializer Customizado para Login ---
+# --- 4. Serializer das Tags Normalizadas ---
+class PalavraChaveSerializer(serializers.ModelSerializer):
+    """
+    Tag normalizada com o total de profissionais que a utilizam
+    (anotado pela view; não é uma coluna).
+    """
+    total = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = PalavraChave
+        fields = ('id', 'termo', 'total')
+
+
+# --- 4.1. Serializers de Mídia (portfólio e upload retomável) ---
+class PortfolioItemSerializer(serializers.ModelSerializer):
+    image_url = serializers.CharField(source='arquivo.url', read_only=True)
+    caption = serializers.CharField(source='legenda', read_only=True)
+
+    class Meta:
+        model = PortfolioItem
+        fields = ('id', 'image_url', 'caption', 'created_at')
+
+
+class UploadSessaoSerializer(serializers.ModelSerializer):
+    """
+    Sessão de upload retomável. O cliente informa finalidade e tamanho total (e, se
+    quiser, o SHA-256 para conferência); os pedaços vão por PATCH em /uploads/<id>/.
+    """
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSessao
+        fields = ('id', 'finalidade', 'legenda', 'tamanho', 'sha256', 'recebido', 'concluida', 'url', 'created_at')
+        read_only_fields = ('recebido', 'concluida', 'created_at')
+
+    def get_url(self, obj):
+        return obj.arquivo.url if obj.arquivo_id else None
+
+    def validate_tamanho(self, valor):
+        maximo = get_config_midia()['TAMANHO_MAXIMO']
+        if not 0 < valor <= maximo:
+            raise serializers.ValidationError(f'O tamanho deve estar entre 1 e {maximo} bytes.')
+        return valor
+
+    def validate_sha256(self, valor):
+        valor = valor.lower()
+        if valor and (len(valor) != 64 or any(c not in '0123456789abcdef' for c in valor)):
+            raise serializers.ValidationError('SHA-256 inválido (64 caracteres hexadecimais).')
+        return valor
+
+
+# --- 5. Serializer Customizado para Login ---
 class CustomAuthTokenSerializer(serializers.Serializer):
     """
     Serializer simplificado e robusto para login por 'email' e 'password'.
@@ -150,4 +260,28 @@ class CustomAuthTokenSerializer(serializers.Serializer):
             raise serializers.ValidationError(msg, code='authorization')
 
         attrs['user'] = user
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+# --- 6. Serializers do Djoser com E-mail Normalizado (ver settings.DJOSER) ---
+class EmailNormalizadoMixin:
+    """
+    Normaliza o e-mail (minúsculas, sem espaços) antes dos validadores do campo: o
+    UniqueValidator compara por igualdade exata e só assim recusa um e-mail que
+    difere de outro apenas na caixa (em vez de estourar no índice único).
+    """
+    campo_email = 'email'
+
+    def to_internal_value(self, data):
+        if isinstance(data, Mapping) and isinstance(data.get(self.campo_email), str):
+            data = data.copy()
+            data[self.campo_email] = User.objects.normalize_email(data[self.campo_email])
+        return super().to_internal_value(data)
+
+
+class UsuarioCreateSerializer(EmailNormalizadoMixin, UserCreateSerializer):
+    pass
+
+
+class SetEmailSerializer(EmailNormalizadoMixin, SetUsernameSerializer):
+    campo_email = 'new_email'
@@ -4,7 +4,10 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 # Importa as Views necessárias
-from .views import ProfileViewSet, ProfessionalViewSet
+from .views import (
+    ProfileViewSet, ProfessionalViewSet, PalavraChaveViewSet, FotoPerfilView, UploadMidiaView, PortfolioViewSet,
+    UploadSessaoViewSet,
+)
 # Importa a view de cadastro de outro arquivo (accounts.views)
 from accounts.views import CadastroView 
 
@@ -13,11 +16,18 @@ router = DefaultRouter()
 
 router.register(r'perfil', ProfileViewSet, basename='perfil') 
 router.register(r'profissionais', ProfessionalViewSet, basename='profissionais') # 🚨 Rota corrigida!
+router.register(r'palavras-chave', PalavraChaveViewSet, basename='palavras-chave')
+router.register(r'portfolio', PortfolioViewSet, basename='portfolio')
+router.register(r'uploads', UploadSessaoViewSet, basename='uploads')  # upload retomável em pedaços
 
 urlpatterns = [
     # ROTA DE CADASTRO CORRIGIDA: Usa CadastroView (resolve o 404)
     # A URL completa é: /api/v1/accounts/register/
     path('register/', CadastroView.as_view(), name='register'),
+
+    # Mídia: antes do router, senão 'perfil/<pk>/' captura 'perfil/photo/'
+    path('perfil/photo/', FotoPerfilView.as_view(), name='perfil-photo'),
+    path('upload-midia/', UploadMidiaView.as_view(), name='upload-midia'),
     
     # Rotas que usam o DefaultRouter (perfil, profissionais)
     path('', include(router.urls)), 
@@ -1,46 +1,118 @@
-from rest_framework import viewsets, permissions, mixins
+import hashlib
+import os
+
+from rest_framework import viewsets, permissions, mixins, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token 
 from rest_framework.settings import api_settings
-from rest_framework.filters import SearchFilter 
 from rest_framework import generics # Garante que você tem generics importado
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.views import TokenRefreshView
+from django.db.models import Count, Q
+from django.utils import timezone
 
 # Importações Absolutas
-from accounts.models import User 
+from accounts.models import User, PalavraChave, PortfolioItem, Profile, UploadSessao
+from accounts.midia import (
+    ArquivoHashUploadHandler, MidiaGrandeDemais, UploadConflito, aplicar, armazenar, caminho_parcial,
+    enviar_pedaco, get_config as get_config_midia,
+)
+from accounts.search import intervalo_de_prefixo
+from accounts.tokens import RefreshRotativoSerializer, RefreshTokenRevogavel, emitir_tokens
 from accounts.views import CadastroView 
+from vagali_project.conditional import ConditionalGetMixin, resposta_condicional
+from vagali_project.pagination import KeysetPagination, ProfissionalKeysetPagination
+from vagali_project.throttling import CADASTRO_THROTTLES, LOGIN_THROTTLES, RESET_SENHA_THROTTLES
+from djoser.views import UserViewSet as DjoserUserViewSet
 
 # Importa Serializers
-from .serializers import ProfessionalSerializer, FullProfileSerializer, CustomAuthTokenSerializer 
+from .serializers import (
+    ProfessionalSerializer, FullProfileSerializer, CustomAuthTokenSerializer, PalavraChaveSerializer,
+    PortfolioItemSerializer, UploadSessaoSerializer,
+)
+from .filters import ProfileFullTextSearchFilter, ProfileTagFilter, ProfissionalProximidadeFilter
+from agenda.filters import DisponibilidadeFilter
 
 
 # --- 1. ViewSet para a listagem pública de profissionais (COM BUSCA) ---
-class ProfessionalViewSet(viewsets.ReadOnlyModelViewSet):
+class ProfessionalViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """
     Lista apenas usuários que são profissionais (is_professional=True) e permite busca.
     Endpoint: /api/v1/accounts/profissionais/
     """
     
-    queryset = User.objects.filter(is_professional=True, profile__isnull=False).select_related('profile')
+    queryset = User.objects.filter(is_professional=True, profile__isnull=False).select_related('profile', 'profile__foto').order_by('id')
     
     serializer_class = ProfessionalSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly] 
+    pagination_class = ProfissionalKeysetPagination # Cursor por id (ou relevância + id na busca)
+    etag_campos = ('profile__updated_at',) # ETag/Last-Modified a partir do Profile
+    etag_campos_extras = ('email',)
     
-    filter_backends = [SearchFilter] 
-    
-    search_fields = [
-        '=email',                       
-        'profile__full_name',           
-        'profile__palavras_chave',      
-        'profile__cidade', 
-    ]
+    # Busca pelo índice invertido (FTS5/tsvector) sobre nome, palavras-chave, serviço e cidade.
+    # O termo com '@' continua sendo tratado como e-mail exato.
+    # ?tag= / ?tag_prefix= filtram pela tabela normalizada de tags.
+    # ?raio_km= (com ?cep= opcional) limita aos profissionais próximos.
+    # ?livre_em=AAAA-MM-DD&livre_de=08:00&livre_ate=12:00 limita aos que têm horário livre
+    # na janela (calculado em lote sobre os candidatos dos filtros anteriores; fica por último).
+    filter_backends = [ProfileTagFilter, ProfissionalProximidadeFilter, ProfileFullTextSearchFilter, DisponibilidadeFilter] 
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return FullProfileSerializer
         return ProfessionalSerializer
 
+    # Com ?livre_em= o resultado depende da agenda, que não está em 'etag_campos':
+    # os horários calculados entram no ETag (listagens não enviam Last-Modified).
+    def _etag(self, request, *partes):
+        horarios = getattr(self, 'horarios_livres', None)
+        if horarios is not None:
+            partes = (*partes, sorted(horarios.items()))
+        return super()._etag(request, *partes)
+
+
+# --- 1.1. ViewSet para as Tags Normalizadas (autocomplete e populares) ---
+class PalavraChaveViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Lista as tags normalizadas com a contagem de profissionais que as usam.
+    Endpoints:
+    - /api/v1/accounts/palavras-chave/?prefixo=bri   (autocomplete por prefixo)
+    - /api/v1/accounts/palavras-chave/populares/?limite=20
+    """
+    serializer_class = PalavraChaveSerializer
+    permission_classes = [permissions.AllowAny]
+    filter_backends = []
+
+    LIMITE_PADRAO = 20
+    LIMITE_MAXIMO = 100
+
+    def get_queryset(self):
+        queryset = PalavraChave.objects.annotate(
+            total=Count('profiles', filter=Q(profiles__user__is_professional=True))
+        ).filter(total__gt=0)
+
+        intervalo = intervalo_de_prefixo(self.request.query_params.get('prefixo', ''))
+        if intervalo:
+            queryset = queryset.filter(termo__gte=intervalo[0], termo__lt=intervalo[1])
+
+        return queryset.order_by('-total', 'termo')[:self._limite()]
+
+    def _limite(self):
+        try:
+            limite = int(self.request.query_params.get('limite', self.LIMITE_PADRAO))
+        except (TypeError, ValueError):
+            limite = self.LIMITE_PADRAO
+        return max(1, min(limite, self.LIMITE_MAXIMO))
+
+    @action(detail=False, methods=['get'])
+    def populares(self, request):
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return Response(serializer.data)
+
 
 # ----------------------------------------------------------------------
 # --- 2. ViewSet para o Perfil do Usuário Logado (CORREÇÃO CRÍTICA) ---
@@ -57,7 +129,9 @@ class ProfileViewSet(mixins.RetrieveModelMixin, mixins.UpdateModelMixin, viewset
         return User.objects.filter(pk=self.request.user.pk)
 
     def get_object(self):
-        return self.request.user
+        # Relido do banco com o Profile no mesmo JOIN: o usuário da autenticação vem do
+        # cache, e os contadores do Profile mudam por UPDATE ... F() a qualquer momento.
+        return self.get_queryset().select_related('profile').get()
 
     @action(detail=False, methods=['get', 'put', 'patch'], url_path='me')
     def me(self, request):
@@ -71,8 +145,18 @@ class ProfileViewSet(mixins.RetrieveModelMixin, mixins.UpdateModelMixin, viewset
              pass
         
         if request.method == 'GET':
-            serializer = self.get_serializer(instance)
-            return Response(serializer.data)
+            # GET condicional: a versão vem do Profile (updated_at) e dos campos do User exibidos
+            profile = getattr(instance, 'profile', None)
+            versao = (
+                instance.pk, instance.email, instance.is_professional,
+                profile.updated_at.isoformat() if profile is not None else None,
+            )
+            return resposta_condicional(
+                request,
+                lambda: self.get_serializer(instance).data,
+                etag=hashlib.sha1(repr(versao).encode('utf-8')).hexdigest(),
+                last_modified=profile.updated_at.timestamp() if profile is not None else None,
+            )
         
         # Para PUT/PATCH (Update)
         
@@ -114,6 +198,8 @@ class CustomAuthToken(ObtainAuthToken):
     o ID do usuário e o status de profissional junto com o token.
     """
     serializer_class = CustomAuthTokenSerializer 
+    # Por IP e por e-mail, antes do serializer (que calcula o hash da senha)
+    throttle_classes = LOGIN_THROTTLES
 
     def post(self, request, *args, **kwargs):
         # 1. Validação
@@ -130,4 +216,236 @@ class CustomAuthToken(ObtainAuthToken):
             'user_id': user.pk, 
             'is_professional': user.is_professional, 
             'email': user.email,
-        })
\ No newline at end of file
+        })
+
+# --- 4. Login JWT (access curto + refresh rotativo) ---
+class JWTLoginView(APIView):
+    """
+    Mesmo login por email/senha do CustomAuthToken, mas sem token persistido:
+    devolve um access token assinado (curto) e um refresh token rotativo.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    serializer_class = CustomAuthTokenSerializer
+    throttle_classes = LOGIN_THROTTLES
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        refresh, access = emitir_tokens(user)
+        return Response({
+            'access': access,
+            'refresh': refresh,
+            'user_id': user.pk,
+            'is_professional': user.is_professional,
+            'email': user.email,
+        })
+
+
+class JWTRefreshView(TokenRefreshView):
+    """ Troca o refresh por um novo par; o refresh usado é revogado (uso único). """
+    serializer_class = RefreshRotativoSerializer
+
+
+# --- 5. Logout ---
+class LogoutView(APIView):
+    """
+    Modo Token: exclui o token usado na requisição (o signal de post_delete do Token
+    remove a entrada do cache de autenticação, ver accounts/authentication.py).
+    Modo JWT: revoga o refresh enviado em {"refresh": ...}; o access expira sozinho.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        if isinstance(request.auth, Token):
+            Token.objects.filter(key=request.auth.key).delete()
+        if request.data.get('refresh'):
+            try:
+                RefreshTokenRevogavel(request.data['refresh']).revogar()
+            except TokenError:
+                pass  # já expirado ou revogado: nada a fazer
+        return Response(status=204)
+
+
+# --- 6. Usuários (Djoser) com limite nos endpoints caros ---
+class UsuarioDjoserViewSet(DjoserUserViewSet):
+    """
+    UserViewSet do Djoser com throttle no cadastro (hash da senha) e nos endpoints
+    que enviam e-mail (recuperação de senha, reenvio de ativação).
+    """
+
+    def get_throttles(self):
+        if self.action == 'create':
+            return [throttle() for throttle in CADASTRO_THROTTLES]
+        if self.action in ('reset_password', 'resend_activation', 'reset_password_confirm'):
+            return [throttle() for throttle in RESET_SENHA_THROTTLES]
+        return super().get_throttles()
+
+
+# --- 7. Upload de mídia (foto de perfil, banner e portfólio), ver accounts/midia.py ---
+class UploadSimplesMixin:
+    """
+    Upload multipart gravado direto em disco pelo ArquivoHashUploadHandler (sem
+    buffer em memória), com SHA-256 calculado durante a leitura do corpo.
+    """
+    # Folga para os cabeçalhos do multipart e os demais campos do formulário
+    FOLGA_MULTIPART = 64 * 1024
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [ArquivoHashUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        try:
+            tamanho_corpo = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            tamanho_corpo = 0
+        # Corpo declarado maior que o permitido: recusa antes de ler qualquer byte
+        if tamanho_corpo > get_config_midia()['TAMANHO_MAXIMO'] + self.FOLGA_MULTIPART:
+            raise MidiaGrandeDemais()
+
+    def receber_arquivo(self, request, campo):
+        """ Retorna o Arquivo (deduplicado pelo SHA-256) enviado em 'campo'. """
+        arquivo = request.FILES.get(campo)
+        if getattr(request, 'midia_grande_demais', False):
+            raise MidiaGrandeDemais()
+        if arquivo is None:
+            raise ValidationError({campo: 'Envie o arquivo da imagem (multipart/form-data).'})
+        return armazenar(arquivo, arquivo.sha256)
+
+
+class FotoPerfilView(UploadSimplesMixin, APIView):
+    """
+    Foto de perfil do usuário logado.
+    Endpoint: /api/v1/accounts/perfil/photo/  (POST/PATCH multipart 'photo'; DELETE remove)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        arquivo = self.receber_arquivo(request, 'photo')
+        aplicar(request.user, 'avatar', arquivo)
+        return Response({'avatar_url': arquivo.url})
+
+    patch = post
+
+    def delete(self, request, *args, **kwargs):
+        Profile.objects.filter(user=request.user).update(foto=None, updated_at=timezone.now())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadMidiaView(UploadSimplesMixin, APIView):
+    """
+    Upload simples de qualquer finalidade.
+    Endpoint: /api/v1/accounts/upload-midia/  (multipart 'file', 'type' = avatar|banner|portfolio, 'caption')
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        finalidade = request.POST.get('type', 'avatar')
+        if finalidade not in dict(UploadSessao.FINALIDADE_CHOICES):
+            raise ValidationError({'type': 'Use avatar, banner ou portfolio.'})
+        arquivo = self.receber_arquivo(request, 'file')
+        item = aplicar(request.user, finalidade, arquivo, request.POST.get('caption', ''))
+        resposta = {'type': finalidade, 'url': arquivo.url, 'sha256': arquivo.sha256}
+        if item is not None:
+            resposta['portfolio_item'] = PortfolioItemSerializer(item).data
+        return Response(resposta, status=status.HTTP_201_CREATED)
+
+
+class PortfolioViewSet(UploadSimplesMixin, mixins.ListModelMixin, mixins.CreateModelMixin,
+                       mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Portfólio do profissional.
+    - GET /portfolio/ (o próprio) ou /portfolio/?professional=<id> (público)
+    - POST multipart 'image' + 'caption'
+    - DELETE /portfolio/<id>/ (só os próprios itens)
+    """
+    serializer_class = PortfolioItemSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination  # índice (profile, -created_at, -id)
+
+    def get_queryset(self):
+        profissional = self.request.query_params.get('professional')
+        if self.action == 'list' and profissional is not None:
+            if not profissional.isdigit():
+                raise ValidationError({'professional': 'Informe o id do profissional.'})
+            filtro = Q(profile__user_id=profissional)
+        elif self.request.user.is_authenticated:
+            filtro = Q(profile__user=self.request.user)
+        else:
+            raise ValidationError({'professional': 'Informe o id do profissional.'})
+        return PortfolioItem.objects.filter(filtro).select_related('arquivo').order_by('-created_at', '-id')
+
+    def create(self, request, *args, **kwargs):
+        arquivo = self.receber_arquivo(request, 'image')
+        item = aplicar(request.user, 'portfolio', arquivo, request.POST.get('caption', ''))
+        return Response(self.get_serializer(item).data, status=status.HTTP_201_CREATED)
+
+
+class UploadSessaoViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Upload retomável em pedaços.
+    - POST /uploads/ {finalidade, tamanho, legenda?, sha256?} cria a sessão
+    - HEAD/GET /uploads/<id>/ informa o offset já recebido (cabeçalho Upload-Offset)
+    - PATCH /uploads/<id>/ com 'Upload-Offset: <offset>' e o pedaço como corpo
+      (application/offset+octet-stream); o último pedaço conclui o upload
+    - DELETE /uploads/<id>/ cancela
+    Se a conexão cair, o cliente consulta o offset e reenvia a partir dele.
+    """
+    serializer_class = UploadSessaoSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSessao.objects.filter(user=self.request.user).select_related('arquivo')
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def _resposta(self, sessao, status_code=status.HTTP_200_OK):
+        return Response(
+            self.get_serializer(sessao).data, status=status_code,
+            headers={'Upload-Offset': str(sessao.recebido), 'Upload-Length': str(sessao.tamanho)},
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._resposta(self.get_object())
+
+    def partial_update(self, request, *args, **kwargs):
+        sessao = self.get_object()
+        if sessao.concluida:
+            return self._resposta(sessao)
+        try:
+            offset = int(request.META['HTTP_UPLOAD_OFFSET'])
+            tamanho_pedaco = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            raise ValidationError({'detail': 'Informe os cabeçalhos Upload-Offset e Content-Length.'})
+
+        if tamanho_pedaco > get_config_midia()['TAMANHO_PEDACO_MAXIMO']:
+            raise MidiaGrandeDemais('Pedaço maior que o tamanho máximo permitido.')
+        if offset < 0 or tamanho_pedaco < 0 or offset + tamanho_pedaco > sessao.tamanho:
+            raise ValidationError({'detail': 'O pedaço ultrapassa o tamanho declarado do arquivo.'})
+
+        # O corpo é lido direto do stream (em blocos), sem passar pelos parsers do DRF
+        try:
+            enviar_pedaco(sessao, offset, tamanho_pedaco, request.stream)
+        except UploadConflito as erro:
+            sessao.refresh_from_db()
+            return Response(
+                {'detail': erro.detail, 'recebido': sessao.recebido}, status=status.HTTP_409_CONFLICT,
+                headers={'Upload-Offset': str(sessao.recebido)},
+            )
+        return self._resposta(sessao)
+
+    def destroy(self, request, *args, **kwargs):
+        sessao = self.get_object()
+        # Não cancela no meio de um envio (trava ativa); travas vencidas não contam
+        livre = Q(trava__isnull=True) | Q(trava_ate__lt=timezone.now())
+        removidas, _ = UploadSessao.objects.filter(livre, pk=sessao.pk).delete()
+        if not removidas:
+            raise UploadConflito('Há um envio em andamento nesta sessão.')
+        caminho = caminho_parcial(sessao)
+        if os.path.exists(caminho):
+            os.remove(caminho)
+        return Response(status=status.HTTP_204_NO_CONTENT)
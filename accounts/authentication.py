@@ -0,0 +1,179 @@
+# accounts/authentication.py
+
+"""
+Autenticação por token com cache em memória (token -> usuário).
+
+O TokenAuthentication padrão do DRF faz um SELECT Token JOIN User em toda requisição.
+Aqui o resultado fica em um cache LRU com TTL por processo, e é invalidado por signals:
+- logout (Token excluído);
+- qualquer save do User (troca de senha, desativação, mudança de is_professional...);
+- exclusão do User.
+
+O mesmo cache guarda os usuários do modo JWT (CachedJWTAuthentication): o access
+token é verificado só pela assinatura e o usuário vem da memória.
+
+Em deploys com vários workers, a invalidação é local ao processo: os demais workers
+deixam de usar a entrada quando o TTL (TOKEN_AUTH_CACHE['TTL'], padrão 60 s) expira.
+
+O Profile NÃO entra no cache: seus contadores mudam por UPDATE ... F() (feedbacks,
+demandas, uploads) sem passar pelos signals do User, e um Profile em memória
+desatualizado serviria contadores e ETags antigos. 'request.user.profile' é sempre lido
+do banco (ou carregado junto pela própria view, ex: ProfileViewSet.get_object).
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import User
+
+
+# --- 1. Cache LRU com TTL ---
+class TTLCache:
+    """
+    LRU limitado a 'max_entries', com expiração por entrada (thread-safe).
+    Cada entrada pode pertencer a um grupo (ex: o id do usuário), e 'delete_grupo'
+    remove as entradas do grupo pelo índice, sem percorrer o cache inteiro.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._dados = OrderedDict()  # chave -> (expira_em, valor, grupo)
+        self._grupos = {}  # grupo -> {chaves}
+        self._lock = threading.Lock()
+
+    def _remover(self, chave):
+        _expira_em, _valor, grupo = self._dados.pop(chave)
+        chaves = self._grupos.get(grupo)
+        if chaves is not None:
+            chaves.discard(chave)
+            if not chaves:
+                del self._grupos[grupo]
+
+    def get(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+            expira_em, valor, _grupo = item
+            if expira_em < time.monotonic():
+                self._remover(chave)
+                return None
+            self._dados.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor, grupo=None):
+        with self._lock:
+            if chave in self._dados:
+                self._remover(chave)
+            self._dados[chave] = (time.monotonic() + self.ttl, valor, grupo)
+            if grupo is not None:
+                self._grupos.setdefault(grupo, set()).add(chave)
+            while len(self._dados) > self.max_entries:
+                self._remover(next(iter(self._dados)))
+
+    def delete(self, chave):
+        with self._lock:
+            if chave in self._dados:
+                self._remover(chave)
+
+    def delete_grupo(self, grupo):
+        with self._lock:
+            for chave in self._grupos.pop(grupo, ()):
+                self._dados.pop(chave, None)
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+            self._grupos.clear()
+
+
+_config = getattr(settings, 'TOKEN_AUTH_CACHE', {})
+token_cache = TTLCache(ttl=_config.get('TTL', 60), max_entries=_config.get('MAX_ENTRIES', 10000))
+
+
+# --- 2. Classe de Autenticação ---
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Igual ao TokenAuthentication ("Authorization: Token <chave>"), mas sem consulta ao
+    banco quando o token já está no cache. Cada requisição recebe uma cópia do usuário,
+    para que alterações em memória de uma requisição não vazem para outras.
+    """
+
+    def authenticate_credentials(self, key):
+        em_cache = token_cache.get(key)
+        if em_cache is None:
+            try:
+                token = Token.objects.select_related('user').get(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Token inválido.'))
+            em_cache = (token.user, token)
+            if token.user.is_active:
+                token_cache.set(key, em_cache, grupo=token.user_id)
+
+        user, token = copy.deepcopy(em_cache)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('Usuário inativo ou excluído.'))
+        return user, token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    "Authorization: Bearer <access>". A assinatura e a expiração são verificadas em
+    memória; o usuário é carregado do banco só na primeira requisição (por TTL).
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token sem identificação de usuário.'))
+
+        chave = ('usuario', str(user_id))
+        em_cache = token_cache.get(chave)
+        if em_cache is None:
+            user = User.objects.filter(pk=user_id).first()
+            if user is None:
+                raise exceptions.AuthenticationFailed(_('Usuário não encontrado.'), code='user_not_found')
+            em_cache = (user, None)
+            if user.is_active:
+                token_cache.set(chave, em_cache, grupo=user.pk)
+
+        user, _token = copy.deepcopy(em_cache)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('Usuário inativo ou excluído.'), code='user_inactive')
+        if (jwt_settings.CHECK_REVOKE_TOKEN
+                and validated_token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)):
+            raise exceptions.AuthenticationFailed(_('A senha do usuário foi alterada.'), code='password_changed')
+        return user
+
+
+# --- 3. Signals de Invalidação ---
+def invalidar_usuario(user_id):
+    """Remove do cache todos os tokens (e o usuário do modo JWT) do usuário."""
+    token_cache.delete_grupo(user_id)
+
+@receiver(post_delete, sender=Token)
+def invalidar_token_excluido(sender, instance, **kwargs):
+    """Logout (ou exclusão manual do token)."""
+    token_cache.delete(instance.key)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_tokens_do_usuario(sender, instance, **kwargs):
+    """Troca de senha, desativação ou qualquer alteração do User."""
+    invalidar_usuario(instance.pk)
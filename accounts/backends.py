@@ -1,24 +1,34 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
-from django.db.models import Q
 
 class EmailBackend(ModelBackend):
     """
     Backend que permite a autenticação por e-mail, em vez do username padrão.
+
+    É o único backend configurado (herda de ModelBackend as permissões do admin), então
+    cada tentativa de login faz exatamente uma busca e um cálculo de hash:
+    - aceita tanto 'email=' (serializers da API) quanto 'username=' (admin/djoser);
+    - para e-mail inexistente roda o hasher mesmo assim, para que o tempo de resposta
+      não revele quais e-mails estão cadastrados.
     """
     def authenticate(self, request, username=None, password=None, **kwargs):
         UserModel = get_user_model()
+        email = kwargs.get(UserModel.USERNAME_FIELD, username)
+        if email is None or password is None:
+            return None
+
         try:
             # 1. Tenta encontrar o usuário pelo email
-            # O 'username' aqui é, na verdade, o email que o serializer está enviando
-            user = UserModel.objects.get(email__iexact=username)
+            # Os e-mails são gravados em minúsculas, então a busca exata usa o índice único.
+            user = UserModel.objects.get(email=UserModel.objects.normalize_email(email))
         except UserModel.DoesNotExist:
-            # Usuário não existe, falha na autenticação
+            # Usuário não existe: calcula um hash descartável (mesmo custo de um login real)
+            UserModel().set_password(password)
             return None
 
-        # 2. Se o usuário existe, verifica a senha
-        if user.check_password(password):
+        # 2. Se o usuário existe, verifica a senha (e se a conta está ativa)
+        if user.check_password(password) and self.user_can_authenticate(user):
             return user
         
         # Senha incorreta
-        return None
\ No newline at end of file
+        return None
@@ -4,9 +4,15 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 from .models import User, Profile
 
+# --- 0. E-mail sempre em minúsculas (a busca de login é exata, pelo índice único) ---
+class EmailMinusculoMixin:
+    def clean_email(self):
+        return User.objects.normalize_email(self.cleaned_data.get('email'))
+
+
 # --- 1. Formulário SIMPLIFICADO para ADIÇÃO de Usuários no ADMIN ---
 # Esta classe é requerida por accounts/admin.py
-class AdminUserCreationForm(UserCreationForm):
+class AdminUserCreationForm(EmailMinusculoMixin, UserCreationForm):
     class Meta:
         model = User
         # Campos necessários para o Admin. O ProfileInline cuida do resto.
@@ -20,7 +26,7 @@ class AdminUserCreationForm(UserCreationForm):
 
 # --- 2. Formulário para EDIÇÃO de Usuários no ADMIN ---
 # Esta classe também é requerida por accounts/admin.py
-class ClientProfessionalChangeForm(UserChangeForm):
+class ClientProfessionalChangeForm(EmailMinusculoMixin, UserChangeForm):
     class Meta:
         model = User
         # Inclui todos os campos do User que o Admin precisa gerir (exceto senha)
@@ -38,7 +44,7 @@ class ClientProfessionalChangeForm(UserChangeForm):
              
 # --- 3. Formulário COMPLEXO para a API de Cadastro (Front-end) ---
 # Este formulário é usado pela sua API de cadastro (/api/v1/accounts/register/)
-class ClientProfessionalCreationForm(UserCreationForm):
+class ClientProfessionalCreationForm(EmailMinusculoMixin, UserCreationForm):
     class Meta:
         model = User
         fields = ('email', 'is_professional')
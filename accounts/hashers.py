@@ -0,0 +1,132 @@
+# accounts/hashers.py
+
+"""
+Hash de senha (PBKDF2) fora da thread da requisição, em um pool de processos limitado.
+
+Ativado por settings.PASSWORD_HASH_POOL['ATIVO']. Com o pool ativo:
+- o cálculo do PBKDF2 (login, cadastro, troca de senha, hash descartável do
+  EmailBackend) roda em até 'PROCESSOS' processos separados, sem disputar CPU sem
+  limite com as demais requisições;
+- no máximo 'FILA_MAXIMA' hashes ficam em andamento/aguardando por processo web
+  (0: sem limite); acima disso a requisição é recusada na hora com 429
+  (HashPoolSaturado), em vez de prender o worker esperando. A vaga só é liberada
+  quando o hash termina: quem desiste por TIMEOUT cancela o hash ainda na fila.
+
+O formato do hash é idêntico ao do PBKDF2PasswordHasher do Django (mesmo
+'algorithm'), então senhas já gravadas continuam válidas com o pool ligado ou não.
+"""
+
+import base64
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.utils.encoding import force_bytes
+from rest_framework.exceptions import Throttled
+
+
+CONFIG_PADRAO = {
+    'ATIVO': False,
+    'PROCESSOS': 2,
+    'FILA_MAXIMA': 16,
+    'TIMEOUT': 10,
+}
+
+
+class HashPoolSaturado(Throttled):
+    default_detail = 'Muitas autenticações simultâneas. Tente novamente em instantes.'
+    default_code = 'hash_pool_saturado'
+
+    def __init__(self, detail=None, code=None):
+        super().__init__(wait=1, detail=detail, code=code)
+
+
+def get_config():
+    return {**CONFIG_PADRAO, **getattr(settings, 'PASSWORD_HASH_POOL', {})}
+
+
+# --- 1. Pool de Processos (um por processo web, criado sob demanda) ---
+class _HashPool:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chave = None
+        self._executor = None
+        self._vagas = None
+
+    def _preparar(self, config):
+        chave = (config['PROCESSOS'], config['FILA_MAXIMA'])
+        with self._lock:
+            if self._chave != chave or self._executor is None:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                # 'spawn': não herda threads/conexões do processo web (fork + threads não é seguro)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=config['PROCESSOS'], mp_context=multiprocessing.get_context('spawn'),
+                )
+                self._vagas = threading.BoundedSemaphore(config['FILA_MAXIMA']) if config['FILA_MAXIMA'] else None
+                self._chave = chave
+            return self._executor, self._vagas
+
+    def _descartar(self, executor):
+        """Pool quebrado (um processo morreu): recriado na próxima chamada."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+    def executar(self, config, funcao, *args):
+        executor, vagas = self._preparar(config)
+        if vagas is not None and not vagas.acquire(blocking=False):
+            raise HashPoolSaturado()
+        try:
+            futuro = executor.submit(funcao, *args)
+        except RuntimeError:  # BrokenProcessPool, ou pool encerrado por fechar()
+            if vagas is not None:
+                vagas.release()
+            self._descartar(executor)
+            return funcao(*args)
+        if vagas is not None:
+            # A vaga acompanha o hash (não a requisição): a fila real nunca passa de FILA_MAXIMA
+            futuro.add_done_callback(lambda _futuro: vagas.release())
+
+        try:
+            return futuro.result(timeout=config['TIMEOUT'])
+        except FutureTimeoutError:
+            futuro.cancel()  # ainda na fila: sai dela (o hash já em execução termina e libera a vaga)
+            raise HashPoolSaturado()
+        except BrokenProcessPool:
+            # Um processo do pool morreu: calcula aqui mesmo
+            self._descartar(executor)
+            return funcao(*args)
+
+    def fechar(self):
+        """Encerra os processos do pool (o próximo hash cria um novo)."""
+        with self._lock:
+            executor, self._executor, self._chave, self._vagas = self._executor, None, None, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+hash_pool = _HashPool()
+
+
+# --- 2. Hasher ---
+class PoolPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """ PBKDF2-SHA256 do Django, calculado no pool de processos quando ativado. """
+
+    def encode(self, password, salt, iterations=None):
+        config = get_config()
+        if not config['ATIVO']:
+            return super().encode(password, salt, iterations)
+
+        self._check_encode_args(password, salt)
+        iterations = iterations or self.iterations
+        derivado = hash_pool.executar(
+            config, hashlib.pbkdf2_hmac, self.digest().name, force_bytes(password), force_bytes(salt), iterations,
+        )
+        derivado = base64.b64encode(derivado).decode('ascii').strip()
+        return '%s$%d$%s$%s' % (self.algorithm, iterations, salt, derivado)
@@ -0,0 +1,139 @@
+# accounts/management/commands/benchmark_login.py
+
+import time
+from unittest import mock
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.models import update_last_login
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+
+from accounts.models import Profile, User
+
+
+ESCRITAS = ('INSERT', 'UPDATE', 'DELETE')
+SENHA = 'senha-benchmark-123'
+
+# Configuração antiga: EmailBackend (busca iexact, sem hash para e-mail inexistente)
+# seguido do ModelBackend, que repetia a busca e o hash em toda falha.
+BACKENDS_LEGADO = [
+    'accounts.management.commands.benchmark_login.EmailBackendLegado',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+
+class EmailBackendLegado(ModelBackend):
+    """Cópia do EmailBackend antigo, só para comparação."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        try:
+            user = UserModel.objects.get(email__iexact=username)
+        except UserModel.DoesNotExist:
+            return None
+        if user.check_password(password):
+            return user
+        return None
+
+
+def _save_user_profile_legado(sender, instance, **kwargs):
+    """Comportamento antigo do signal: salva o Profile inteiro a cada save do User."""
+    try:
+        instance.profile.save()
+    except Profile.DoesNotExist:
+        Profile.objects.create(user=instance)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede as escritas no banco por login (authenticate + last_login + token), '
+        'comparando o signal antigo de User -> Profile com o atual. '
+        'Com --throughput, mede tentativas/s e hashes por tentativa (sucesso, senha errada '
+        'e e-mail inexistente) com os backends antigos e com o backend único. '
+        'Roda dentro de uma transação desfeita no final (não altera o banco).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20, help='Logins por cenário.')
+        parser.add_argument('--throughput', action='store_true', help='Mede tentativas de login por segundo.')
+
+    def handle(self, *args, **options):
+        if options['throughput']:
+            return self._throughput(options['logins'])
+
+        with transaction.atomic():
+            user = User.objects.create_user('benchmark-login@vagali.invalid', SENHA)
+
+            atual = self._medir(user, options['logins'])
+
+            post_save.connect(_save_user_profile_legado, sender=User, dispatch_uid='benchmark_login_legado')
+            try:
+                legado = self._medir(user, options['logins'])
+            finally:
+                post_save.disconnect(sender=User, dispatch_uid='benchmark_login_legado')
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'cenário':<10} {'escritas/login':>15} {'queries/login':>14} {'ms/login':>9}")
+        for nome, resultado in (('antes', legado), ('depois', atual)):
+            escritas, queries, ms = resultado
+            self.stdout.write(f'{nome:<10} {escritas:>15.1f} {queries:>14.1f} {ms:>9.1f}')
+
+    def _medir(self, user, logins):
+        escritas = queries = 0
+        inicio = time.perf_counter()
+        for _ in range(logins):
+            with CaptureQueriesContext(connection) as contexto:
+                autenticado = authenticate(email=user.email, password=SENHA)
+                # Mesmo caminho do login por sessão (signal user_logged_in)
+                update_last_login(None, autenticado)
+                Token.objects.get_or_create(user=autenticado)
+            queries += len(contexto.captured_queries)
+            escritas += sum(
+                1 for q in contexto.captured_queries if q['sql'].lstrip().upper().startswith(ESCRITAS)
+            )
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        return escritas / logins, queries / logins, duracao_ms / logins
+
+    # --- Throughput ---
+    def _throughput(self, tentativas):
+        cenarios = (
+            ('sucesso', 'benchmark-login@vagali.invalid', SENHA),
+            ('senha errada', 'benchmark-login@vagali.invalid', 'senha-errada'),
+            ('sem conta', 'ninguem@vagali.invalid', SENHA),
+        )
+        with transaction.atomic():
+            User.objects.create_user('benchmark-login@vagali.invalid', SENHA)
+
+            self.stdout.write(
+                f"{'backends':<10} {'campo':<9} {'cenário':<14} {'login/s':>9} {'hashes':>7} {'queries':>8}"
+            )
+            for nome, backends in (('antes', BACKENDS_LEGADO), ('depois', None)):
+                with override_settings(**({'AUTHENTICATION_BACKENDS': backends} if backends else {})):
+                    # O serializer da API envia 'email='; o admin e o Djoser enviam 'username='
+                    for campo in ('email', 'username'):
+                        for cenario, email, senha in cenarios:
+                            credenciais = {campo: email, 'password': senha}
+                            por_segundo, hashes, queries = self._medir_tentativas(credenciais, tentativas)
+                            self.stdout.write(
+                                f'{nome:<10} {campo:<9} {cenario:<14} '
+                                f'{por_segundo:>9.1f} {hashes:>7.1f} {queries:>8.1f}'
+                            )
+
+            transaction.set_rollback(True)
+
+    def _medir_tentativas(self, credenciais, tentativas):
+        # Conta as chamadas ao hasher padrão (tanto make_password quanto check_password passam por encode)
+        hasher = type(get_hasher())
+        with mock.patch.object(hasher, 'encode', autospec=True, side_effect=hasher.encode) as encode:
+            with CaptureQueriesContext(connection) as contexto:
+                inicio = time.perf_counter()
+                for _ in range(tentativas):
+                    authenticate(**credenciais)
+                duracao = time.perf_counter() - inicio
+        return tentativas / duracao, encode.call_count / tentativas, len(contexto.captured_queries) / tentativas
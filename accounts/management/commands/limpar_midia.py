@@ -0,0 +1,60 @@
+# accounts/management/commands/limpar_midia.py
+
+import os
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef, ProtectedError, Q
+from django.utils import timezone
+
+from accounts.midia import caminho_parcial, get_config
+from accounts.models import Arquivo, PortfolioItem, Profile, UploadSessao
+
+
+class Command(BaseCommand):
+    help = (
+        'Remove sessões de upload não concluídas que expiraram (e seus arquivos parciais) '
+        'e arquivos de mídia sem nenhuma referência (perfil ou portfólio). Rodar periodicamente (cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--carencia-horas', type=int, default=1,
+            help='Tempo mínimo sem uso de um arquivo sem referências para ser removido (upload em andamento).',
+        )
+
+    def handle(self, *args, **options):
+        agora = timezone.now()
+
+        # 1. Sessões abandonadas (sem envio recente)
+        limite_sessao = agora - timedelta(hours=get_config()['SESSAO_EXPIRA_HORAS'])
+        sessoes = 0
+        for sessao in UploadSessao.objects.filter(arquivo__isnull=True, updated_at__lt=limite_sessao).iterator():
+            caminho = caminho_parcial(sessao)
+            if os.path.exists(caminho):
+                os.remove(caminho)
+            sessoes += UploadSessao.objects.filter(pk=sessao.pk, updated_at__lt=limite_sessao).delete()[0]
+
+        # 2. Arquivos órfãos (a carência cobre o intervalo entre gravar ou reaproveitar o
+        #    arquivo e ligá-lo ao perfil)
+        limite_arquivo = agora - timedelta(hours=options['carencia_horas'])
+        orfaos = Arquivo.objects.filter(usado_em__lt=limite_arquivo).exclude(
+            Exists(Profile.objects.filter(Q(foto=OuterRef('pk')) | Q(banner=OuterRef('pk'))))
+        ).exclude(
+            Exists(PortfolioItem.objects.filter(arquivo=OuterRef('pk')))
+        )
+        arquivos = 0
+        for arquivo in orfaos.iterator():
+            try:
+                # Condicional: não apaga se foi reaproveitado (usado_em renovado) depois da consulta
+                if not Arquivo.objects.filter(pk=arquivo.pk, usado_em__lt=limite_arquivo).delete()[0]:
+                    continue
+            except ProtectedError:
+                continue  # passou a ser usado depois da consulta
+            default_storage.delete(arquivo.nome)
+            arquivos += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{sessoes} sessões de upload expiradas e {arquivos} arquivos sem referência removidos.'
+        ))
@@ -0,0 +1,30 @@
+# accounts/management/commands/limpar_tokens_revogados.py
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import TokenRevogado
+
+
+class Command(BaseCommand):
+    help = (
+        'Apaga da lista de revogação os refresh tokens JWT que já expiraram '
+        '(depois da expiração a assinatura já os rejeita). Rodar periodicamente (cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=5000, help='Linhas apagadas por DELETE.')
+
+    def handle(self, *args, **options):
+        agora = timezone.now()
+        total = 0
+        while True:
+            # DELETE em lotes pelo índice de expira_em, para não segurar locks longos
+            ids = list(
+                TokenRevogado.objects.filter(expira_em__lt=agora)
+                .values_list('id', flat=True)[:options['lote']]
+            )
+            if not ids:
+                break
+            total += TokenRevogado.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f'{total} tokens revogados expirados removidos.'))
@@ -0,0 +1,18 @@
+# accounts/management/commands/reindexar_busca.py
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import Profile
+from accounts.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca textual (FTS5/tsvector) a partir da tabela de perfis.'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        total = 0
+        for profile in Profile.objects.all().iterator(chunk_size=500):
+            backend.indexar(profile)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f'{total} perfis reindexados com {type(backend).__name__}.'))
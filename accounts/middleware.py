@@ -0,0 +1,25 @@
+# accounts/middleware.py
+
+from django.http import JsonResponse
+
+from .hashers import HashPoolSaturado
+
+
+class HashPoolSaturadoMiddleware:
+    """
+    Nas views do DRF o HashPoolSaturado já vira 429 (é um Throttled). Este middleware
+    faz o mesmo nas views comuns do Django (ex: login do admin), em vez de um 500.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, HashPoolSaturado):
+            response = JsonResponse({'detail': str(exception.detail)}, status=exception.status_code)
+            response['Retry-After'] = str(exception.wait)
+            return response
+        return None
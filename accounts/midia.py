@@ -0,0 +1,268 @@
+# accounts/midia.py
+
+"""
+Upload de mídia (foto de perfil, banner e portfólio) sem carregar arquivos inteiros
+na memória do worker.
+
+- Upload simples (multipart): ArquivoHashUploadHandler grava cada pedaço recebido
+  direto em um arquivo temporário, calculando SHA-256 e tamanho no caminho. Passou
+  de MIDIA['TAMANHO_MAXIMO'], a leitura do corpo é interrompida.
+- Upload retomável (UploadSessao): cada PATCH traz um pedaço no offset atual
+  (cabeçalho Upload-Offset), lido do corpo em blocos e gravado no arquivo parcial.
+  Se a conexão cair, o cliente consulta o offset recebido e continua dali.
+- Armazenamento endereçado por conteúdo: o nome no storage é o SHA-256. Conteúdo
+  repetido (entre usuários ou reenvios) reaproveita o mesmo Arquivo, sem gravar de novo.
+  O arquivo completo é movido (rename) para o storage, não copiado.
+
+Formatos aceitos são conferidos pela assinatura (bytes iniciais); com o Pillow
+instalado a imagem também é validada por ele.
+"""
+
+import hashlib
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import Arquivo, PortfolioItem, Profile, UploadSessao
+
+
+CONFIG_PADRAO = {
+    'TAMANHO_MAXIMO': 10 * 1024 * 1024,
+    'TAMANHO_PEDACO_MAXIMO': 5 * 1024 * 1024,
+    'DIRETORIO_PARCIAL': os.path.join(settings.BASE_DIR, 'uploads_parciais'),
+    'TRAVA_SEGUNDOS': 5 * 60,
+    'SESSAO_EXPIRA_HORAS': 24,
+}
+
+BLOCO = 64 * 1024
+
+# (assinatura, deslocamento, content_type, extensão)
+ASSINATURAS = (
+    (b'\xff\xd8\xff', 0, 'image/jpeg', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', 0, 'image/png', '.png'),
+    (b'GIF87a', 0, 'image/gif', '.gif'),
+    (b'GIF89a', 0, 'image/gif', '.gif'),
+    (b'WEBP', 8, 'image/webp', '.webp'),  # RIFF....WEBP
+)
+
+
+def get_config():
+    return {**CONFIG_PADRAO, **getattr(settings, 'MIDIA', {})}
+
+
+class MidiaInvalida(ValidationError):
+    default_detail = 'Formato de imagem não suportado (use JPEG, PNG, GIF ou WebP).'
+    default_code = 'midia_invalida'
+
+
+class MidiaGrandeDemais(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Arquivo maior que o tamanho máximo permitido.'
+    default_code = 'midia_grande_demais'
+
+
+class UploadConflito(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Offset diferente do esperado ou upload em andamento.'
+    default_code = 'upload_conflito'
+
+
+# --- 1. Upload simples (multipart) ---
+class ArquivoHashUploadHandler(TemporaryFileUploadHandler):
+    """ Grava em disco calculando o SHA-256; interrompe a leitura acima do limite. """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.tamanho = 0
+        self.maximo = get_config()['TAMANHO_MAXIMO']
+
+    def receive_data_chunk(self, raw_data, start):
+        self.tamanho += len(raw_data)
+        if self.tamanho > self.maximo:
+            self.file.close()
+            self.request.midia_grande_demais = True
+            # Não lê o restante do corpo: o arquivo já foi recusado
+            raise StopUpload(connection_reset=True)
+        self.sha256.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        arquivo = super().file_complete(file_size)
+        arquivo.sha256 = self.sha256.hexdigest()
+        return arquivo
+
+
+class ArquivoEmDisco(File):
+    """ Arquivo já completo em disco: o FileSystemStorage move (rename) em vez de copiar. """
+
+    def __init__(self, caminho):
+        super().__init__(open(caminho, 'rb'), name=caminho)
+        self.caminho = caminho
+
+    def temporary_file_path(self):
+        return self.caminho
+
+
+def detectar_tipo(caminho):
+    with open(caminho, 'rb') as arquivo:
+        cabecalho = arquivo.read(16)
+    for assinatura, deslocamento, content_type, extensao in ASSINATURAS:
+        if cabecalho[deslocamento:deslocamento + len(assinatura)] == assinatura:
+            return content_type, extensao
+    return None
+
+
+def imagem_valida(caminho):
+    try:
+        from PIL import Image
+    except ImportError:  # Pillow é opcional: sem ele vale só a assinatura
+        return True
+    try:
+        with Image.open(caminho) as imagem:
+            imagem.verify()
+    except Exception:
+        return False
+    return True
+
+
+def armazenar(arquivo, sha256):
+    """
+    Guarda o conteúdo de 'arquivo' (File com temporary_file_path(), já completo) e
+    retorna o Arquivo correspondente. Se o SHA-256 já existe, só reaproveita (renovando 'usado_em').
+    O arquivo temporário é sempre removido (movido para o storage ou apagado).
+    """
+    caminho = arquivo.temporary_file_path()
+    try:
+        existente = Arquivo.objects.filter(sha256=sha256).first()
+        # Renova 'usado_em': pode ser um órfão antigo que o 'limpar_midia' está para apagar.
+        # Se ele já foi apagado (0 linhas), segue como conteúdo novo.
+        if existente is not None and Arquivo.objects.filter(pk=existente.pk).update(usado_em=timezone.now()):
+            return existente
+
+        tipo = detectar_tipo(caminho)
+        if tipo is None or not imagem_valida(caminho):
+            raise MidiaInvalida()
+        content_type, extensao = tipo
+
+        tamanho = os.path.getsize(caminho)
+        nome = default_storage.save(f'midia/{sha256[:2]}/{sha256[2:4]}/{sha256}{extensao}', arquivo)
+        try:
+            with transaction.atomic():
+                return Arquivo.objects.create(sha256=sha256, nome=nome, tamanho=tamanho, content_type=content_type)
+        except IntegrityError:
+            # Mesmo conteúdo gravado ao mesmo tempo por outra requisição: fica o dela
+            default_storage.delete(nome)
+            return Arquivo.objects.get(sha256=sha256)
+    finally:
+        arquivo.close()
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+
+def aplicar(user, finalidade, arquivo, legenda=''):
+    """Liga o Arquivo ao perfil (foto/banner) ou cria o item de portfólio."""
+    if finalidade == 'portfolio':
+        return PortfolioItem.objects.create(profile=user.profile, arquivo=arquivo, legenda=legenda)
+    campo = 'foto' if finalidade == 'avatar' else 'banner'
+    Profile.objects.filter(user=user).update(**{campo: arquivo}, updated_at=timezone.now())
+    return None
+
+
+# --- 2. Upload retomável (sessões) ---
+def caminho_parcial(sessao):
+    return os.path.join(get_config()['DIRETORIO_PARCIAL'], f'{sessao.pk}.part')
+
+
+def enviar_pedaco(sessao, offset, tamanho_pedaco, stream):
+    """
+    Grava 'tamanho_pedaco' bytes de 'stream' no offset atual da sessão, lendo em
+    blocos. Se o pedaço completa o arquivo, finaliza (ainda com a trava).
+    Retorna (novo_offset, resultado da finalização ou None).
+
+    Levanta UploadConflito se o offset não for o esperado ou se outro envio estiver
+    com a trava da sessão. Um pedaço vazio no offset final refaz a finalização
+    (ex: se a conexão caiu enquanto o último pedaço era processado).
+    """
+    config = get_config()
+    agora = timezone.now()
+    trava = uuid.uuid4()
+    # Trava com prazo (UPDATE condicional): só um envio por vez, e só no offset esperado
+    livre = Q(trava__isnull=True) | Q(trava_ate__lt=agora)
+    travou = UploadSessao.objects.filter(livre, pk=sessao.pk, recebido=offset, arquivo__isnull=True).update(
+        trava=trava, trava_ate=agora + timedelta(seconds=config['TRAVA_SEGUNDOS']),
+    )
+    if not travou:
+        raise UploadConflito()
+
+    caminho = caminho_parcial(sessao)
+    novo_offset = offset
+    resultado = None
+    try:
+        gravado = os.path.getsize(caminho) if os.path.exists(caminho) else 0
+        if gravado < offset:
+            # Arquivo parcial perdido (ex: limpeza): volta ao que de fato existe em disco
+            novo_offset = gravado
+            raise UploadConflito()
+
+        if tamanho_pedaco:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            with open(caminho, 'r+b' if os.path.exists(caminho) else 'w+b') as parcial:
+                # Descarta o que um envio interrompido tenha deixado depois do offset confirmado
+                parcial.truncate(offset)
+                parcial.seek(offset)
+                restante = tamanho_pedaco
+                while restante:
+                    bloco = stream.read(min(BLOCO, restante))
+                    if not bloco:
+                        break
+                    parcial.write(bloco)
+                    restante -= len(bloco)
+            if restante:
+                raise ValidationError({'detail': 'Pedaço incompleto: envie novamente a partir do offset atual.'})
+            novo_offset = offset + tamanho_pedaco
+
+        if novo_offset == sessao.tamanho:
+            try:
+                resultado = _finalizar(sessao, caminho)
+            except ValidationError:
+                novo_offset = 0  # conteúdo descartado: o upload recomeça do zero
+                raise
+    finally:
+        UploadSessao.objects.filter(pk=sessao.pk, trava=trava).update(
+            recebido=novo_offset, trava=None, trava_ate=None, updated_at=timezone.now(),
+        )
+        sessao.recebido = novo_offset
+    return novo_offset, resultado
+
+
+def _finalizar(sessao, caminho):
+    """
+    Calcula o SHA-256 do arquivo completo (lendo em blocos), confere com o informado,
+    armazena (com deduplicação) e aplica à finalidade da sessão.
+    """
+    sha256 = hashlib.sha256()
+    with open(caminho, 'rb') as parcial:
+        for bloco in iter(lambda: parcial.read(BLOCO), b''):
+            sha256.update(bloco)
+    sha256 = sha256.hexdigest()
+    if sessao.sha256 and sessao.sha256.lower() != sha256:
+        os.remove(caminho)
+        raise ValidationError({'sha256': 'O conteúdo recebido não confere com o SHA-256 informado.'})
+
+    arquivo = armazenar(ArquivoEmDisco(caminho), sha256)
+    with transaction.atomic():
+        resultado = aplicar(sessao.user, sessao.finalidade, arquivo, sessao.legenda)
+        UploadSessao.objects.filter(pk=sessao.pk).update(arquivo=arquivo)
+    sessao.arquivo = arquivo
+    return resultado
@@ -0,0 +1,48 @@
+# Índice de busca textual dos perfis (FTS5 no SQLite, tsvector + GIN no PostgreSQL).
+
+from django.db import migrations
+
+
+def criar_indice(apps, schema_editor):
+    from accounts.search import FTS_COLUMNS, FTS_TABLE, get_search_backend
+
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"{', '.join(FTS_COLUMNS)}, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE accounts_profile ADD COLUMN IF NOT EXISTS search_vector tsvector')
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS accounts_profile_search_vector_gin '
+            'ON accounts_profile USING GIN (search_vector)'
+        )
+    else:
+        return
+
+    # Popula o índice com os perfis já existentes
+    Profile = apps.get_model('accounts', 'Profile')
+    get_search_backend().reindexar_todos(Profile.objects.all().iterator())
+
+
+def remover_indice(apps, schema_editor):
+    from accounts.search import FTS_TABLE
+
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS accounts_profile_search_vector_gin')
+        schema_editor.execute('ALTER TABLE accounts_profile DROP COLUMN IF EXISTS search_vector')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_profile_cidade_profile_descricao_servicos_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
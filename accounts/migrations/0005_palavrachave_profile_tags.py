@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:29
+
+from django.db import migrations, models
+
+
+def popular_tags(apps, schema_editor):
+    """Extrai as tags de todos os perfis já existentes."""
+    from accounts.search import extrair_tags
+
+    Profile = apps.get_model('accounts', 'Profile')
+    PalavraChave = apps.get_model('accounts', 'PalavraChave')
+    for profile in Profile.objects.exclude(palavras_chave='').iterator():
+        termos = extrair_tags(profile.palavras_chave)
+        PalavraChave.objects.bulk_create(
+            [PalavraChave(termo=t) for t in termos], ignore_conflicts=True
+        )
+        profile.tags.set(PalavraChave.objects.filter(termo__in=termos))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_profile_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PalavraChave',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termo', models.CharField(max_length=100, unique=True, verbose_name='Termo')),
+            ],
+            options={
+                'verbose_name': 'Palavra-Chave',
+                'verbose_name_plural': 'Palavras-Chave',
+            },
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='profiles', to='accounts.palavrachave', verbose_name='Tags'),
+        ),
+        migrations.RunPython(popular_tags, migrations.RunPython.noop),
+    ]
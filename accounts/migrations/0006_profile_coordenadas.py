@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_palavrachave_profile_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='geo_celula',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20, null=True, verbose_name='Célula Geográfica'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Latitude'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Longitude'),
+        ),
+    ]
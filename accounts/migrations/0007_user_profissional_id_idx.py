@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_profile_coordenadas'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_professional', 'id'], name='user_profissional_id_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_user_profissional_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='feedback_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Quantidade de Avaliações'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='rating_soma',
+            field=models.PositiveIntegerField(default=0, verbose_name='Soma das Avaliações'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_profile_agregados_avaliacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='demandas_concluidas',
+            field=models.PositiveIntegerField(default=0, verbose_name='Demandas Concluídas (Profissional)'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='demandas_criadas_aceitas',
+            field=models.PositiveIntegerField(default=0, verbose_name='Demandas Aceitas'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='demandas_criadas_canceladas',
+            field=models.PositiveIntegerField(default=0, verbose_name='Demandas Canceladas'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='demandas_criadas_concluidas',
+            field=models.PositiveIntegerField(default=0, verbose_name='Demandas Concluídas (Cliente)'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='demandas_criadas_em_andamento',
+            field=models.PositiveIntegerField(default=0, verbose_name='Demandas em Andamento'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='demandas_criadas_pendentes',
+            field=models.PositiveIntegerField(default=0, verbose_name='Demandas Pendentes'),
+        ),
+    ]
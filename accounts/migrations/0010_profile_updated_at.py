@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_profile_contadores_demandas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Atualizado em'),
+        ),
+    ]
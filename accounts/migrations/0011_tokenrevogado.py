@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_profile_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenRevogado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True)),
+                ('expira_em', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Token Revogado',
+                'verbose_name_plural': 'Tokens Revogados',
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:05
+
+from django.db import migrations
+
+
+def normalizar_emails(apps, schema_editor):
+    """
+    Converte os e-mails já cadastrados para minúsculas (o login passa a buscar por
+    igualdade exata). Se duas contas só diferem na caixa, nenhuma é alterada e a
+    migração é abortada com a lista dos conflitos: a conta que ficasse com o e-mail
+    antigo nunca mais conseguiria entrar, então elas precisam ser unificadas (ou uma
+    delas renomeada) antes de migrar de novo.
+    """
+    User = apps.get_model('accounts', 'User')
+    contas = {}
+    for pk, email in User.objects.order_by('id').values_list('id', 'email').iterator():
+        contas.setdefault((email or '').strip().lower(), []).append((pk, email))
+
+    conflitos = {normalizado: lista for normalizado, lista in contas.items() if len(lista) > 1}
+    if conflitos:
+        detalhes = '; '.join(
+            f"{normalizado}: " + ', '.join(f"id={pk} <{email}>" for pk, email in lista)
+            for normalizado, lista in sorted(conflitos.items())
+        )
+        raise RuntimeError(
+            f"Contas com o mesmo e-mail a menos da caixa ({len(conflitos)}): {detalhes}. "
+            "Unifique ou renomeie essas contas e rode a migração novamente."
+        )
+
+    for normalizado, [(pk, email)] in contas.items():
+        if normalizado != email:
+            User.objects.filter(pk=pk).update(email=normalizado)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_tokenrevogado'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalizar_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_normalizar_emails'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_profissional_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_professional', True)), fields=['id'], name='user_profissional_id_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:05
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_user_profissional_id_parcial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Arquivo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('nome', models.CharField(max_length=255)),
+                ('tamanho', models.PositiveBigIntegerField()),
+                ('content_type', models.CharField(max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Arquivo',
+                'verbose_name_plural': 'Arquivos',
+            },
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='banner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.arquivo', verbose_name='Banner'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='foto',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.arquivo', verbose_name='Foto de Perfil'),
+        ),
+        migrations.CreateModel(
+            name='UploadSessao',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('finalidade', models.CharField(choices=[('avatar', 'Foto de Perfil'), ('banner', 'Banner'), ('portfolio', 'Portfólio')], max_length=10)),
+                ('legenda', models.CharField(blank=True, max_length=255)),
+                ('tamanho', models.PositiveBigIntegerField()),
+                ('sha256', models.CharField(blank=True, max_length=64)),
+                ('recebido', models.PositiveBigIntegerField(default=0)),
+                ('trava', models.UUIDField(blank=True, editable=False, null=True)),
+                ('trava_ate', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('arquivo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounts.arquivo')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Sessão de Upload',
+                'verbose_name_plural': 'Sessões de Upload',
+            },
+        ),
+        migrations.CreateModel(
+            name='PortfolioItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('legenda', models.CharField(blank=True, max_length=255, verbose_name='Legenda')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('arquivo', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.arquivo')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='portfolio', to='accounts.profile')),
+            ],
+            options={
+                'verbose_name': 'Item do Portfólio',
+                'verbose_name_plural': 'Itens do Portfólio',
+                'indexes': [models.Index(fields=['profile', '-created_at', '-id'], name='portfolio_perfil_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_midia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='arquivo',
+            name='usado_em',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
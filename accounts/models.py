@@ -1,18 +1,39 @@
 # accounts/models.py
 
+import uuid
+
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.db.models import DEFERRED, F, FloatField
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.conf import settings 
+from django.core.files.storage import default_storage
+
+from localizacao.geo import aplicar_coordenadas
+
+from .search import extrair_tags, get_search_backend, FTS_COLUMNS, TAG_MAX_LENGTH
 
 
 # --- 1. Custom User Manager (Necessário para usar E-mail como login) ---
 class CustomUserManager(BaseUserManager):
     """
     Manager customizado que usa o e-mail como identificador único para autenticação.
+
+    O e-mail é sempre gravado em minúsculas (normalize_email), o que permite buscar
+    por igualdade exata usando o índice único em vez de email__iexact (UPPER() em
+    todas as linhas).
     """
+    @classmethod
+    def normalize_email(cls, email):
+        return (email or '').strip().lower()
+
+    def get_by_natural_key(self, username):
+        return self.get(**{self.model.USERNAME_FIELD: self.normalize_email(username)})
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('O endereço de e-mail deve ser definido.')
@@ -64,12 +85,42 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
 
+    def clean(self):
+        super().clean()
+        self.email = self.__class__.objects.normalize_email(self.email)
+
+    def save(self, *args, **kwargs):
+        # Qualquer caminho que grave o e-mail (admin, djoser set_email, setattr + save)
+        # passa por aqui: o login busca por igualdade exata com o e-mail em minúsculas.
+        if self.email:
+            self.email = self.__class__.objects.normalize_email(self.email)
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = _('Usuário')
         verbose_name_plural = _('Usuários')
+        indexes = [
+            # Listagem paginada de profissionais (chave estável: id)
+            # (parcial: o SQLite só troca o SCAN da tabela por este índice quando ele
+            # contém apenas os profissionais)
+            models.Index(fields=['id'], condition=models.Q(is_professional=True), name='user_profissional_id_idx'),
+        ]
+
 
+# --- 3. PalavraChave Model (Tags normalizadas extraídas de Profile.palavras_chave) ---
+class PalavraChave(models.Model):
+    """ Tag normalizada (minúsculas, sem acentos), compartilhada entre perfis. """
+    termo = models.CharField(_('Termo'), max_length=TAG_MAX_LENGTH, unique=True)
+
+    def __str__(self):
+        return self.termo
 
-# --- 3. Profile Model (Dados adicionais de Cliente/Profissional) ---
+    class Meta:
+        verbose_name = _('Palavra-Chave')
+        verbose_name_plural = _('Palavras-Chave')
+
+
+# --- 4. Profile Model (Dados adicionais de Cliente/Profissional) ---
 class Profile(models.Model):
     # Relacionamento One-to-One: todo Profile pertence a um User
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
@@ -81,6 +132,13 @@ class Profile(models.Model):
     
     # NOVO CAMPO: CEP (essencial para as demandas)
     cep = models.CharField(_('CEP'), max_length=8, blank=True, null=True)
+
+    # Coordenadas derivadas do CEP e célula da grade (índice espacial para busca por raio)
+    latitude = models.FloatField(_('Latitude'), blank=True, null=True, editable=False)
+    longitude = models.FloatField(_('Longitude'), blank=True, null=True, editable=False)
+    geo_celula = models.CharField(
+        _('Célula Geográfica'), max_length=20, blank=True, null=True, editable=False, db_index=True
+    )
     
     # Dados Adicionais (Para o Profissional)
     bio = models.TextField(_('Sobre Mim'), blank=True, null=True)
@@ -102,32 +160,310 @@ class Profile(models.Model):
         help_text="Liste todos os termos de busca (Ex: Bolo, Brigadeiro, Cimento, Tinta)"
     )
 
+    # Tags normalizadas (mantidas em sincronia com 'palavras_chave' pelo signal abaixo)
+    tags = models.ManyToManyField(
+        PalavraChave, blank=True, related_name='profiles', verbose_name=_('Tags')
+    )
+
     # Avaliação Média (Decisão de arquitetura: armazena aqui para acesso rápido)
     rating = models.DecimalField(
         _('Avaliação Média'), max_digits=3, decimal_places=2, default=0.00
     )
+    # Agregados mantidos incrementalmente pelos signals de Feedback (ver registrar_avaliacao)
+    rating_soma = models.PositiveIntegerField(_('Soma das Avaliações'), default=0)
+    feedback_count = models.PositiveIntegerField(_('Quantidade de Avaliações'), default=0)
+
+    # Contadores de demandas mantidos pelos signals de Demanda (ver ajustar_contadores)
+    # Profissional: demandas concluídas em que ele foi o profissional atribuído
+    demandas_concluidas = models.PositiveIntegerField(_('Demandas Concluídas (Profissional)'), default=0)
+    # Cliente: demandas criadas, por status
+    demandas_criadas_pendentes = models.PositiveIntegerField(_('Demandas Pendentes'), default=0)
+    demandas_criadas_aceitas = models.PositiveIntegerField(_('Demandas Aceitas'), default=0)
+    demandas_criadas_em_andamento = models.PositiveIntegerField(_('Demandas em Andamento'), default=0)
+    demandas_criadas_concluidas = models.PositiveIntegerField(_('Demandas Concluídas (Cliente)'), default=0)
+    demandas_criadas_canceladas = models.PositiveIntegerField(_('Demandas Canceladas'), default=0)
+
+    # Imagens (armazenamento endereçado por conteúdo, ver accounts/midia.py)
+    foto = models.ForeignKey(
+        'Arquivo', on_delete=models.PROTECT, null=True, blank=True, related_name='+', verbose_name=_('Foto de Perfil'),
+    )
+    banner = models.ForeignKey(
+        'Arquivo', on_delete=models.PROTECT, null=True, blank=True, related_name='+', verbose_name=_('Banner'),
+    )
+
+    # Versão da linha para ETag/Last-Modified (atualizada também nos UPDATEs com F())
+    updated_at = models.DateTimeField(_('Atualizado em'), auto_now=True)
+
+    # Mantidos só por UPDATEs atômicos com F() (registrar_avaliacao/ajustar_contadores):
+    # um save comum não os grava
+    CAMPOS_AGREGADOS = (
+        'rating', 'rating_soma', 'feedback_count', 'demandas_concluidas',
+        'demandas_criadas_pendentes', 'demandas_criadas_aceitas', 'demandas_criadas_em_andamento',
+        'demandas_criadas_concluidas', 'demandas_criadas_canceladas',
+    )
 
     def __str__(self):
         return f"Perfil de {self.user.email}"
+
+    def save(self, *args, **kwargs):
+        """
+        O save comum (sem update_fields) de um perfil existente grava todos os campos menos
+        os agregados: o valor em memória pode estar desatualizado e desfaria os UPDATEs
+        concorrentes. Para gravá-los de propósito, passe update_fields (ou use bulk_update).
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferidos = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.CAMPOS_AGREGADOS and f.attname not in deferidos
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def registrar_avaliacao(cls, user_id, delta_soma, delta_quantidade):
+        """
+        Aplica uma variação na soma/quantidade de avaliações do profissional e recalcula
+        a média no mesmo UPDATE (expressões F, sem ler-modificar-gravar em Python).
+        Ex: novo feedback de 4 estrelas -> registrar_avaliacao(pro_id, 4, 1)
+        """
+        soma = F('rating_soma') + delta_soma
+        quantidade = F('feedback_count') + delta_quantidade
+        media = Round(Cast(soma, FloatField()) / NullIf(quantidade, 0), 2)
+        cls.objects.filter(user_id=user_id).update(
+            rating_soma=soma,
+            feedback_count=quantidade,
+            rating=Coalesce(media, 0.0),
+            updated_at=timezone.now(),
+        )
+
+    @classmethod
+    def ajustar_contadores(cls, user_id, **deltas):
+        """
+        Soma/subtrai contadores do perfil com um único UPDATE atômico.
+        Ex: ajustar_contadores(cliente_id, demandas_criadas_pendentes=-1, demandas_criadas_em_andamento=1)
+        """
+        deltas = {campo: delta for campo, delta in deltas.items() if delta}
+        if user_id is None or not deltas:
+            return
+        cls.objects.filter(user_id=user_id).update(
+            updated_at=timezone.now(),
+            **{campo: F(campo) + delta for campo, delta in deltas.items()}
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valores como vieram do banco: só a referência (sem cópia nem laço por linha nas
+        # listagens); comparados apenas quando alguém pergunta 'tem_alteracoes'.
+        instance._valores_salvos = (field_names, values)
+        return instance
+
+    def marcar_como_salvo(self):
+        """Guarda o estado persistido atual (usado por 'tem_alteracoes')."""
+        # Só campos já carregados (não força a leitura de campos adiados com .only()/.defer())
+        nomes = [f.attname for f in self._meta.concrete_fields if f.attname in self.__dict__]
+        self._valores_salvos = (nomes, [getattr(self, nome) for nome in nomes])
+
+    def valor_salvo(self, attname, padrao=None):
+        """Valor de 'attname' na última leitura/save ('padrao' se não for conhecido)."""
+        nomes, valores = getattr(self, '_valores_salvos', ((), ()))
+        try:
+            valor = valores[list(nomes).index(attname)]
+        except ValueError:
+            return padrao
+        return padrao if valor is DEFERRED else valor
+
+    def tem_alteracoes(self):
+        """True se algum campo foi alterado em memória desde a leitura/último save."""
+        if self._state.adding or not hasattr(self, '_valores_salvos'):
+            return True
+        ignorados = {'updated_at', *self.CAMPOS_AGREGADOS}  # o save comum não grava os agregados
+        nomes, valores = self._valores_salvos
+        return any(
+            nome not in ignorados and valor is not DEFERRED and getattr(self, nome) != valor
+            for nome, valor in zip(nomes, valores)
+        )
+
+    def sincronizar_tags(self):
+        """Atualiza a tabela de tags a partir do texto livre de 'palavras_chave'."""
+        termos = extrair_tags(self.palavras_chave)
+        if set(termos) == set(self.tags.values_list('termo', flat=True)):
+            return
+
+        PalavraChave.objects.bulk_create(
+            [PalavraChave(termo=t) for t in termos], ignore_conflicts=True
+        )
+        self.tags.set(PalavraChave.objects.filter(termo__in=termos))
         
     class Meta:
         verbose_name = _('Perfil')
         verbose_name_plural = _('Perfis')
 
 
-# --- 4. Signals (Garante que todo User tem um Profile automaticamente) ---
+# --- 5. Signals (Garante que todo User tem um Profile automaticamente) ---
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
     """Cria um objeto Profile sempre que um novo User é criado."""
-    if created:
-        Profile.objects.create(user=instance)
+    if created and not raw:
+        Profile.objects.get_or_create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    """Salva o objeto Profile sempre que o User é salvo."""
-    # O try/except é crucial para lidar com cenários complexos de banco/migração.
-    try:
-        instance.profile.save()
-    except Profile.DoesNotExist:
-        # Se o Profile não existe, ele é criado (redundância de segurança)
-        Profile.objects.create(user=instance)
\ No newline at end of file
+def save_user_profile(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """
+    Salva o Profile junto com o User apenas quando faz sentido:
+    - saves parciais (update_fields, ex: last_login no login ou is_professional) não tocam o Profile;
+    - Profile carregado no User: só é salvo se tiver alguma alteração pendente em memória;
+    - Profile não carregado (ou inexistente): apenas garante que exista (get_or_create).
+    """
+    if created or raw or update_fields is not None:
+        return
+    profile = User.profile.related.get_cached_value(instance, None)
+    if profile is None:
+        Profile.objects.get_or_create(user=instance)
+    elif profile.tem_alteracoes():
+        profile.save()
+
+
+_DESCONHECIDO = object()
+
+@receiver(pre_save, sender=Profile)
+def geocodificar_profile(sender, instance, update_fields=None, **kwargs):
+    """Preenche as coordenadas do Profile a partir do CEP (só quando o CEP muda)."""
+    if update_fields is not None and 'cep' not in update_fields:
+        return
+    # Sem o valor salvo conhecido (ex: instância montada à mão), consulta por segurança
+    if not instance._state.adding and instance.valor_salvo('cep', _DESCONHECIDO) == instance.cep:
+        return
+    aplicar_coordenadas(instance)
+
+
+# --- 6. Signals do Índice de Busca (mantém FTS5/tsvector em sincronia com o Profile) ---
+@receiver(post_save, sender=Profile)
+def indexar_profile_busca(sender, instance, created=False, update_fields=None, **kwargs):
+    """Atualiza o documento do perfil no índice de busca textual (só se um campo indexado mudou)."""
+    if update_fields is not None and not set(update_fields) & set(FTS_COLUMNS):
+        return
+    # Roda antes de 'atualizar_estado_salvo_profile': valor_salvo ainda é o estado anterior
+    if not created and all(instance.valor_salvo(campo, _DESCONHECIDO) == getattr(instance, campo) for campo in FTS_COLUMNS):
+        return
+    get_search_backend().indexar(instance)
+
+@receiver(post_save, sender=Profile)
+def atualizar_estado_salvo_profile(sender, instance, **kwargs):
+    """Depois do save, o estado em memória passa a ser o estado persistido."""
+    instance.marcar_como_salvo()
+
+@receiver(post_save, sender=Profile)
+def sincronizar_tags_profile(sender, instance, raw=False, **kwargs):
+    """Mantém a tabela normalizada de tags em sincronia com 'palavras_chave'."""
+    if not raw:
+        instance.sincronizar_tags()
+
+@receiver(post_delete, sender=Profile)
+def remover_profile_busca(sender, instance, **kwargs):
+    """Remove o perfil excluído do índice de busca textual."""
+    get_search_backend().remover(instance.pk)
+
+
+# --- 7. Revogação de Refresh Tokens (JWT) ---
+class TokenRevogado(models.Model):
+    """
+    Lista de revogação dos refresh tokens JWT (rotação e logout).
+
+    Guarda só o jti e a expiração do token: a linha só precisa existir enquanto o
+    token ainda seria aceito pela assinatura. O comando 'limpar_tokens_revogados'
+    apaga as linhas expiradas, então a tabela fica do tamanho dos tokens revogados
+    ainda válidos (e não de todos os tokens já emitidos).
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expira_em = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = 'Token Revogado'
+        verbose_name_plural = 'Tokens Revogados'
+
+    def __str__(self):
+        return self.jti
+
+
+# --- 8. Mídia (foto de perfil, banner e portfólio) ---
+class Arquivo(models.Model):
+    """
+    Conteúdo armazenado uma única vez, identificado pelo SHA-256. Perfis e itens de
+    portfólio apontam para ele; o mesmo arquivo enviado por vários usuários reaproveita
+    a mesma linha e o mesmo arquivo no storage. Sem referências, é removido pelo
+    comando 'limpar_midia' ('usado_em' é renovado a cada reaproveitamento, para que
+    um órfão antigo reenviado agora não seja apagado antes de ser ligado ao perfil).
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    nome = models.CharField(max_length=255)  # caminho no storage (MEDIA_ROOT)
+    tamanho = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=50)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    usado_em = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = 'Arquivo'
+        verbose_name_plural = 'Arquivos'
+
+    def __str__(self):
+        return self.nome
+
+    @property
+    def url(self):
+        return default_storage.url(self.nome)
+
+
+class PortfolioItem(models.Model):
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='portfolio')
+    arquivo = models.ForeignKey(Arquivo, on_delete=models.PROTECT, related_name='+')
+    legenda = models.CharField(_('Legenda'), max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Item do Portfólio'
+        verbose_name_plural = 'Itens do Portfólio'
+        indexes = [
+            models.Index(fields=['profile', '-created_at', '-id'], name='portfolio_perfil_idx'),
+        ]
+
+    def __str__(self):
+        return f"Portfólio de {self.profile_id}: {self.legenda or self.arquivo_id}"
+
+
+class UploadSessao(models.Model):
+    """
+    Upload retomável em pedaços. 'recebido' é o offset já gravado em disco; cada
+    pedaço é aceito só no offset atual e sob uma trava temporária ('trava' +
+    'trava_ate'), então dois envios simultâneos não se misturam e uma conexão que
+    caiu no meio não bloqueia a sessão para sempre.
+    """
+    FINALIDADE_CHOICES = (
+        ('avatar', 'Foto de Perfil'),
+        ('banner', 'Banner'),
+        ('portfolio', 'Portfólio'),
+    )
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploads')
+    finalidade = models.CharField(max_length=10, choices=FINALIDADE_CHOICES)
+    legenda = models.CharField(max_length=255, blank=True)
+    tamanho = models.PositiveBigIntegerField()
+    # SHA-256 informado pelo cliente (opcional): conferido ao final
+    sha256 = models.CharField(max_length=64, blank=True)
+    recebido = models.PositiveBigIntegerField(default=0)
+    trava = models.UUIDField(null=True, blank=True, editable=False)
+    trava_ate = models.DateTimeField(null=True, blank=True, editable=False)
+    arquivo = models.ForeignKey(Arquivo, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Sessão de Upload'
+        verbose_name_plural = 'Sessões de Upload'
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.recebido}/{self.tamanho})"
+
+    @property
+    def concluida(self):
+        return self.arquivo_id is not None
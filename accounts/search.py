@@ -0,0 +1,202 @@
+# accounts/search.py
+
+"""
+Índice invertido de busca de profissionais.
+
+- SQLite: tabela virtual FTS5 (``accounts_profile_fts``), rowid = id do Profile.
+- PostgreSQL: coluna ``search_vector`` (tsvector) com índice GIN em ``accounts_profile``.
+- Outros bancos: fallback com ``icontains`` (comportamento antigo do SearchFilter).
+
+O texto é normalizado em Python (minúsculas e sem acentos) antes de ser indexado
+e antes de montar a consulta, então "Eletricista", "ELÉTRICA" e "eletrica" casam
+da mesma forma em qualquer banco.
+"""
+
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+
+FTS_TABLE = 'accounts_profile_fts'
+
+# Peso de cada coluna no ranking (ordem das colunas na tabela FTS).
+# Palavras-chave e serviço valem mais do que nome e cidade.
+FTS_COLUMNS = ('full_name', 'palavras_chave', 'servico_principal', 'cidade')
+FTS_WEIGHTS = (2.0, 4.0, 3.0, 1.0)
+
+# Stopwords do português que não fazem sentido indexar nem buscar.
+STOPWORDS_PT = frozenset({
+    'a', 'o', 'as', 'os', 'e', 'de', 'da', 'do', 'das', 'dos', 'em', 'na', 'no',
+    'nas', 'nos', 'um', 'uma', 'para', 'por', 'com', 'sem', 'ou', 'que', 'se',
+})
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Separadores aceitos no campo livre de palavras-chave (vírgula, ponto e vírgula, quebra de linha)
+_TAG_SEPARADORES_RE = re.compile(r'[,;\n]+')
+TAG_MAX_LENGTH = 100
+
+
+# --- 1. Normalização e Tokenização ---
+def normalizar_texto(texto):
+    """Converte para minúsculas e remove acentos ("Eletrônica" -> "eletronica")."""
+    if not texto:
+        return ''
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return sem_acentos.lower()
+
+
+def tokenizar(texto):
+    """Quebra o texto normalizado em termos, descartando stopwords."""
+    return [t for t in _TOKEN_RE.findall(normalizar_texto(texto)) if t not in STOPWORDS_PT]
+
+
+def extrair_tags(texto):
+    """
+    Converte o texto livre de palavras-chave em tags normalizadas e sem repetição.
+    "Bolo, Brigadeiro;  bolo , Pão de Mel" -> ['bolo', 'brigadeiro', 'pao de mel']
+    """
+    tags = []
+    for parte in _TAG_SEPARADORES_RE.split(texto or ''):
+        tag = ' '.join(normalizar_texto(parte).split())[:TAG_MAX_LENGTH]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def intervalo_de_prefixo(prefixo):
+    """
+    Transforma um prefixo em um intervalo [inicio, fim) para usar o índice da coluna
+    (LIKE 'pre%' com ESCAPE não usa índice no SQLite). "bri" -> ("bri", "brj")
+    """
+    inicio = ' '.join(normalizar_texto(prefixo).split())
+    if not inicio:
+        return None
+    return inicio, inicio[:-1] + chr(ord(inicio[-1]) + 1)
+
+
+def documento_do_perfil(profile):
+    """Retorna os textos (já normalizados) de cada coluna indexada do Profile."""
+    return [' '.join(tokenizar(getattr(profile, campo, None))) for campo in FTS_COLUMNS]
+
+
+# --- 2. Backends ---
+class BaseSearchBackend:
+    """Interface comum: indexar/remover perfis e filtrar um queryset de Users."""
+
+    def indexar(self, profile):
+        pass
+
+    def remover(self, profile_id):
+        pass
+
+    def reindexar_todos(self, profiles):
+        for profile in profiles:
+            self.indexar(profile)
+
+    def buscar(self, queryset, termo):
+        raise NotImplementedError
+
+    def nenhum(self, queryset):
+        # Termo só com stopwords/pontuação: resultado vazio, mas com a mesma anotação
+        # das buscas normais (o filtro ordena por 'search_rank').
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+
+
+class FallbackSearchBackend(BaseSearchBackend):
+    """Busca por substring (LIKE), usada quando o banco não tem índice de texto."""
+
+    def buscar(self, queryset, termo):
+        tokens = tokenizar(termo)
+        if not tokens:
+            return self.nenhum(queryset)
+        for token in tokens:
+            queryset = queryset.filter(
+                Q(profile__full_name__icontains=token)
+                | Q(profile__palavras_chave__icontains=token)
+                | Q(profile__servico_principal__icontains=token)
+                | Q(profile__cidade__icontains=token)
+            )
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """Tabela virtual FTS5 mantida em sincronia com ``accounts_profile``."""
+
+    def indexar(self, profile):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [profile.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FTS_COLUMNS)}) VALUES (%s, %s, %s, %s, %s)',
+                [profile.pk, *documento_do_perfil(profile)],
+            )
+
+    def remover(self, profile_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [profile_id])
+
+    def _expressao_match(self, termo):
+        # Cada termo vira um prefixo entre aspas ("tint"*), todos obrigatórios (AND implícito).
+        return ' '.join(f'"{token}"*' for token in tokenizar(termo))
+
+    def buscar(self, queryset, termo):
+        expressao = self._expressao_match(termo)
+        if not expressao:
+            return self.nenhum(queryset)
+        pesos = ', '.join(str(p) for p in FTS_WEIGHTS)
+        # bm25() retorna valores negativos (quanto menor, mais relevante); invertemos o sinal.
+        rank = RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, {pesos}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = accounts_profile.id',
+            [expressao],
+            output_field=FloatField(),
+        )
+        ids = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [expressao])
+        return queryset.filter(profile__id__in=ids).annotate(search_rank=rank)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Coluna tsvector (configuração 'portuguese') com índice GIN."""
+
+    PESOS = ('B', 'A', 'A', 'C')
+
+    def indexar(self, profile):
+        partes = ' || '.join(
+            f"setweight(to_tsvector('portuguese', %s), '{peso}')" for peso in self.PESOS
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE accounts_profile SET search_vector = {partes} WHERE id = %s',
+                [*documento_do_perfil(profile), profile.pk],
+            )
+
+    def _expressao_tsquery(self, termo):
+        return ' & '.join(f'{token}:*' for token in tokenizar(termo))
+
+    def buscar(self, queryset, termo):
+        expressao = self._expressao_tsquery(termo)
+        if not expressao:
+            return self.nenhum(queryset)
+        ids = RawSQL(
+            "SELECT id FROM accounts_profile WHERE search_vector @@ to_tsquery('portuguese', %s)",
+            [expressao],
+        )
+        rank = RawSQL(
+            "ts_rank_cd(accounts_profile.search_vector, to_tsquery('portuguese', %s))",
+            [expressao],
+            output_field=FloatField(),
+        )
+        return queryset.filter(profile__id__in=ids).annotate(search_rank=rank)
+
+
+def get_search_backend():
+    """Escolhe o backend de busca de acordo com o banco configurado."""
+    if connection.vendor == 'sqlite':
+        return SQLiteFTS5Backend()
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return FallbackSearchBackend()
@@ -1,3 +1,604 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from accounts.authentication import token_cache
+from accounts.models import Profile, User
+from vagali_project.throttling import throttle_store
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class CachedTokenAuthenticationTests(TestCase):
+    """ O token é resolvido pelo cache e deixa de valer no logout, troca de senha ou desativação. """
+
+    def setUp(self):
+        token_cache.clear()
+        self.api = APIClient()
+        self.user = User.objects.create_user('cache@vagali.com', 'senha-teste')
+        self.token = Token.objects.create(user=self.user)
+        self.api.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_segunda_requisicao_nao_consulta_o_token(self):
+        self.assertEqual(self.api.get('/api/v1/accounts/perfil/me/').status_code, 200)
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.api.get('/api/v1/accounts/perfil/me/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('authtoken_token' in q['sql'] for q in contexto.captured_queries))
+
+    def test_logout_invalida_o_token(self):
+        self.api.get('/api/v1/accounts/perfil/me/')
+        self.assertEqual(self.api.post('/api/v1/auth/logout/').status_code, 204)
+        self.assertEqual(self.api.get('/api/v1/accounts/perfil/me/').status_code, 401)
+
+    def test_desativacao_invalida_o_cache(self):
+        self.api.get('/api/v1/accounts/perfil/me/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.api.get('/api/v1/accounts/perfil/me/').status_code, 401)
+
+    def test_troca_de_senha_invalida_o_cache(self):
+        self.api.get('/api/v1/accounts/perfil/me/')
+        self.assertIsNotNone(token_cache.get(self.token.key))
+        self.user.set_password('outra-senha-123')
+        self.user.save()
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    def test_indice_por_usuario_acompanha_o_cache(self):
+        from accounts.authentication import TTLCache
+
+        cache = TTLCache(ttl=60, max_entries=2)
+        cache.set('a', 'token-a', grupo=1)
+        cache.set('b', 'token-b', grupo=2)
+        cache.set('c', 'token-c', grupo=1)  # descarta 'a' (LRU)
+        self.assertEqual(cache._grupos, {1: {'c'}, 2: {'b'}})
+        cache.delete_grupo(1)
+        self.assertIsNone(cache.get('c'))
+        self.assertEqual(cache.get('b'), 'token-b')
+        cache.delete('b')
+        self.assertEqual((cache._dados, cache._grupos), ({}, {}))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class JWTTests(TestCase):
+    """ Access token sem consulta de token; refresh de uso único e revogável. """
+
+    def setUp(self):
+        token_cache.clear()
+        self.api = APIClient()
+        self.user = User.objects.create_user('jwt@vagali.com', 'senha-teste')
+
+    def login(self):
+        response = self.api.post('/api/v1/auth/jwt/login/', {'email': 'jwt@vagali.com', 'password': 'senha-teste'})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_access_autentica_sem_tabela_de_tokens(self):
+        tokens = self.login()
+        self.api.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(self.api.get('/api/v1/accounts/perfil/me/').status_code, 200)
+        with CaptureQueriesContext(connection) as contexto:
+            self.assertEqual(self.api.get('/api/v1/accounts/perfil/me/').status_code, 200)
+        # Autenticação sem consulta; só a leitura do perfil (User + Profile em um JOIN), que não é cacheado
+        self.assertEqual(len(contexto.captured_queries), 1)
+        self.assertIn('accounts_profile', contexto.captured_queries[0]['sql'])
+        self.assertFalse(Token.objects.exists())
+
+    def test_refresh_e_rotacionado_e_de_uso_unico(self):
+        tokens = self.login()
+        response = self.api.post('/api/v1/auth/jwt/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['refresh'], tokens['refresh'])
+
+        reuso = self.api.post('/api/v1/auth/jwt/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(reuso.status_code, 401)
+
+    def test_logout_revoga_o_refresh(self):
+        tokens = self.login()
+        self.api.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(self.api.post('/api/v1/auth/logout/', {'refresh': tokens['refresh']}).status_code, 204)
+        self.api.credentials()
+        self.assertEqual(self.api.post('/api/v1/auth/jwt/refresh/', {'refresh': tokens['refresh']}).status_code, 401)
+
+    def test_troca_de_senha_invalida_o_access(self):
+        tokens = self.login()
+        self.user.set_password('outra-senha-123')
+        self.user.save()
+        self.api.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(self.api.get('/api/v1/accounts/perfil/me/').status_code, 401)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class EmailMinusculoTests(TestCase):
+    """ E-mails são gravados em minúsculas e o login busca por igualdade exata. """
+
+    def test_create_user_e_login_ignoram_a_caixa(self):
+        user = User.objects.create_user('  Fulano@VagaLi.com ', 'senha-teste')
+        self.assertEqual(user.email, 'fulano@vagali.com')
+
+        response = APIClient().post('/api/v1/auth/custom-login/', {'email': 'FULANO@vagali.com', 'password': 'senha-teste'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user_id'], user.pk)
+
+    def test_formulario_de_cadastro_normaliza_e_detecta_duplicado(self):
+        from accounts.forms import ClientProfessionalCreationForm
+
+        User.objects.create_user('beltrano@vagali.com', 'senha-teste')
+        form = ClientProfessionalCreationForm({
+            'email': 'Beltrano@Vagali.com', 'is_professional': False, 'full_name': 'Beltrano',
+            'cpf': '12345678901', 'password1': 'Senha-Forte-123', 'password2': 'Senha-Forte-123',
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn('email', form.errors)
+
+    def test_set_email_do_djoser_normaliza_e_detecta_duplicado(self):
+        user = User.objects.create_user('antigo@vagali.com', 'senha-teste')
+        User.objects.create_user('ocupado@vagali.com', 'senha-teste')
+        api = APIClient()
+        api.force_authenticate(user)
+
+        response = api.post('/api/v1/auth/users/set_email/', {'new_email': 'Ocupado@Vagali.com', 'current_password': 'senha-teste'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('new_email', response.data)
+
+        response = api.post('/api/v1/auth/users/set_email/', {'new_email': ' Novo@Vagali.com', 'current_password': 'senha-teste'})
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(User.objects.get(pk=user.pk).email, 'novo@vagali.com')
+        response = APIClient().post('/api/v1/auth/custom-login/', {'email': 'Novo@Vagali.com', 'password': 'senha-teste'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_save_do_user_normaliza_o_email(self):
+        user = User.objects.create_user('caixa@vagali.com', 'senha-teste')
+        user.email = 'Caixa.Nova@Vagali.com'
+        user.save()
+        self.assertEqual(User.objects.get(pk=user.pk).email, 'caixa.nova@vagali.com')
+
+    def test_migracao_aborta_com_contas_em_conflito(self):
+        from importlib import import_module
+        from django.apps import apps
+
+        normalizar_emails = import_module('accounts.migrations.0012_normalizar_emails').normalizar_emails
+        antiga = User.objects.create_user('antiga@vagali.com', 'senha-teste')
+        nova = User.objects.create_user('nova@vagali.com', 'senha-teste')
+        User.objects.filter(pk=antiga.pk).update(email='Antiga@Vagali.com')
+        User.objects.filter(pk=nova.pk).update(email='Nova@Vagali.com')
+
+        normalizar_emails(apps, None)
+        self.assertEqual(User.objects.get(pk=antiga.pk).email, 'antiga@vagali.com')
+
+        User.objects.filter(pk=nova.pk).update(email='ANTIGA@vagali.com')
+        User.objects.filter(pk=antiga.pk).update(email='Antiga@Vagali.com')
+        with self.assertRaisesMessage(RuntimeError, f'id={nova.pk} <ANTIGA@vagali.com>'):
+            normalizar_emails(apps, None)
+        self.assertEqual(User.objects.get(pk=antiga.pk).email, 'Antiga@Vagali.com')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class EmailBackendTests(TestCase):
+    """ Cada tentativa de login faz uma busca e exatamente um hash, exista a conta ou não. """
+
+    def setUp(self):
+        User.objects.create_user('login@vagali.com', 'senha-teste')
+
+    def contar_hashes(self, **credenciais):
+        from unittest import mock
+        from django.contrib.auth import authenticate
+        from django.contrib.auth.hashers import MD5PasswordHasher
+
+        with mock.patch.object(MD5PasswordHasher, 'encode', autospec=True, side_effect=MD5PasswordHasher.encode) as encode:
+            with CaptureQueriesContext(connection) as contexto:
+                user = authenticate(**credenciais)
+        return user, encode.call_count, len(contexto.captured_queries)
+
+    def test_um_hash_e_uma_busca_por_tentativa(self):
+        for campo in ('email', 'username'):
+            for email, senha, autentica in (
+                ('login@vagali.com', 'senha-teste', True),
+                ('login@vagali.com', 'senha-errada', False),
+                ('ninguem@vagali.com', 'senha-teste', False),
+            ):
+                with self.subTest(campo=campo, email=email, senha=senha):
+                    user, hashes, queries = self.contar_hashes(**{campo: email, 'password': senha})
+                    self.assertEqual(user is not None, autentica)
+                    self.assertEqual(hashes, 1)
+                    self.assertEqual(queries, 1)
+
+
+class SalvarUserProfileTests(TestCase):
+    """ O save do User só grava o Profile quando há alteração (e recria o que faltar). """
+
+    def setUp(self):
+        self.user = User.objects.create_user('perfil@vagali.com', 'senha-teste')
+
+    def test_save_do_user_sem_alteracao_no_profile_nao_grava_nada(self):
+        user = User.objects.select_related('profile').get(pk=self.user.pk)
+        user.first_name = 'Fulano'
+        with CaptureQueriesContext(connection) as contexto:
+            user.save()
+        self.assertEqual(len(contexto.captured_queries), 1)
+        self.assertNotIn('accounts_profile', contexto.captured_queries[0]['sql'])
+
+    def test_save_do_user_grava_o_profile_alterado(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.profile.full_name = 'Fulano de Tal'
+        user.save()
+        self.assertEqual(Profile.objects.get(user=self.user).full_name, 'Fulano de Tal')
+
+    def test_save_do_user_recria_profile_ausente(self):
+        Profile.objects.filter(user=self.user).delete()
+        user = User.objects.get(pk=self.user.pk)
+        user.save()
+        self.assertTrue(Profile.objects.filter(user=self.user).exists())
+
+
+class HashPoolTests(TestCase):
+    """ Com o pool ativo o hash é o mesmo do PBKDF2 padrão; com a fila cheia, 429. """
+
+    HASHERS = ['accounts.hashers.PoolPBKDF2PasswordHasher']
+
+    def tearDown(self):
+        from accounts.hashers import hash_pool
+        hash_pool.fechar()
+        self.assertIsNone(hash_pool._executor)
+
+    def test_hash_do_pool_e_compativel_com_o_pbkdf2_padrao(self):
+        from django.contrib.auth.hashers import PBKDF2PasswordHasher
+        from accounts.hashers import PoolPBKDF2PasswordHasher
+
+        esperado = PBKDF2PasswordHasher().encode('senha-teste', 'sal1234567890', iterations=1000)
+        with self.settings(PASSWORD_HASH_POOL={'ATIVO': True, 'PROCESSOS': 1}):
+            self.assertEqual(PoolPBKDF2PasswordHasher().encode('senha-teste', 'sal1234567890', iterations=1000), esperado)
+
+    def test_fila_cheia_responde_429(self):
+        from accounts.hashers import get_config, hash_pool
+
+        with self.settings(PASSWORD_HASHERS=self.HASHERS, PASSWORD_HASH_POOL={'ATIVO': True, 'FILA_MAXIMA': 1}):
+            _executor, vagas = hash_pool._preparar(get_config())
+            vagas.acquire()  # a única vaga está ocupada
+            response = APIClient().post('/api/v1/auth/custom-login/', {'email': 'x@vagali.com', 'password': 'senha-teste'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_timeout_cancela_o_hash_da_fila_e_libera_a_vaga(self):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from accounts.hashers import HashPoolSaturado, get_config, hash_pool
+
+        liberar = threading.Event()
+        with self.settings(PASSWORD_HASH_POOL={'ATIVO': True, 'PROCESSOS': 1, 'FILA_MAXIMA': 2, 'TIMEOUT': 0.05}):
+            config = get_config()
+            executor, vagas = hash_pool._preparar(config)
+            executor.shutdown()
+            hash_pool._executor = ThreadPoolExecutor(max_workers=1)  # sem processos: só a fila importa aqui
+            with self.assertRaises(HashPoolSaturado):
+                hash_pool.executar(config, liberar.wait)  # ocupa o único worker
+            with self.assertRaises(HashPoolSaturado):
+                hash_pool.executar(config, liberar.wait)  # fica na fila e é cancelado
+        self.assertTrue(vagas.acquire(blocking=False))  # a vaga do cancelado voltou
+        self.assertFalse(vagas.acquire(blocking=False))  # a do hash em execução, não
+        liberar.set()
+
+    def test_fila_maxima_zero_e_sem_limite(self):
+        from django.contrib.auth.hashers import PBKDF2PasswordHasher
+        from accounts.hashers import PoolPBKDF2PasswordHasher
+
+        esperado = PBKDF2PasswordHasher().encode('senha-teste', 'sal1234567890', iterations=1000)
+        with self.settings(PASSWORD_HASH_POOL={'ATIVO': True, 'PROCESSOS': 1, 'FILA_MAXIMA': 0}):
+            self.assertEqual(PoolPBKDF2PasswordHasher().encode('senha-teste', 'sal1234567890', iterations=1000), esperado)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ThrottleTests(TestCase):
+    """ Login e recuperação de senha recusam o excesso (429) antes de calcular hash ou enviar e-mail. """
+
+    def setUp(self):
+        throttle_store().limpar()
+        self.api = APIClient()
+        User.objects.create_user('alvo@vagali.com', 'senha-teste')
+
+    def tearDown(self):
+        throttle_store().limpar()
+
+    def test_login_limitado_por_email(self):
+        from unittest import mock
+        from django.contrib.auth.hashers import MD5PasswordHasher
+
+        taxas = {'login_ip': '100/min', 'login_email': '3/min'}
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': taxas}):
+            respostas = [
+                self.api.post('/api/v1/auth/custom-login/', {'email': 'ALVO@vagali.com', 'password': 'errada'}).status_code
+                for _ in range(3)
+            ]
+            with mock.patch.object(MD5PasswordHasher, 'encode', autospec=True, side_effect=MD5PasswordHasher.encode) as encode:
+                response = self.api.post('/api/v1/auth/custom-login/', {'email': 'alvo@vagali.com', 'password': 'errada'})
+            outro = self.api.post('/api/v1/auth/custom-login/', {'email': 'outro@vagali.com', 'password': 'errada'})
+
+        self.assertEqual(respostas, [400, 400, 400])
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(encode.call_count, 0)
+        self.assertEqual(outro.status_code, 400)
+
+    def test_reset_de_senha_limitado_por_ip(self):
+        taxas = {'reset_senha_ip': '2/hour', 'reset_senha_email': '100/hour'}
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': taxas}):
+            codigos = [
+                self.api.post('/api/v1/auth/password/reset/', {'email': f'{i}@vagali.com'}).status_code
+                for i in range(3)
+            ]
+        self.assertEqual(codigos, [204, 204, 429])
+
+
+
+class BuscaProfissionaisTests(TestCase):
+    """ Busca textual (?search=) pelo índice invertido. """
+
+    def setUp(self):
+        self.user = User.objects.create_user('pintor@vagali.com', 'senha-teste', is_professional=True)
+        self.user.profile.full_name = 'Pedro Pintor'
+        self.user.profile.servico_principal = 'Pintura'
+        self.user.profile.save()
+
+    def test_busca_por_prefixo(self):
+        response = APIClient().get('/api/v1/accounts/profissionais/', {'search': 'pint'})
+        self.assertEqual([p['id'] for p in response.json()['results']], [self.user.pk])
+
+    def test_termo_so_com_stopwords_ou_pontuacao(self):
+        for termo in ('de', '"', '!!'):
+            response = APIClient().get('/api/v1/accounts/profissionais/', {'search': termo})
+            self.assertEqual(response.status_code, 200, termo)
+            self.assertEqual(response.json()['results'], [])
+
+    def test_save_so_reindexa_quando_um_campo_indexado_muda(self):
+        from accounts.search import FTS_TABLE
+
+        def consultas_ao_indice(alterar):
+            profile = Profile.objects.get(user=self.user)
+            alterar(profile)
+            with CaptureQueriesContext(connection) as contexto:
+                profile.save()
+            return sum(FTS_TABLE in q['sql'] for q in contexto.captured_queries)
+
+        self.assertEqual(consultas_ao_indice(lambda p: setattr(p, 'phone_number', '21999990000')), 0)
+        self.assertGreater(consultas_ao_indice(lambda p: setattr(p, 'cidade', 'Niterói')), 0)
+        response = APIClient().get('/api/v1/accounts/profissionais/', {'search': 'niteroi'})
+        self.assertEqual([p['id'] for p in response.json()['results']], [self.user.pk])
+
+
+
+class TagsTests(TestCase):
+    """ Tabela normalizada de tags: sincronizada com 'palavras_chave' e usada nos filtros. """
+
+    def profissional(self, email, palavras_chave):
+        user = User.objects.create_user(email, 'senha-teste', is_professional=True)
+        user.profile.palavras_chave = palavras_chave
+        user.profile.save()
+        return user
+
+    def filtrar(self, **params):
+        response = APIClient().get('/api/v1/accounts/profissionais/', params)
+        self.assertEqual(response.status_code, 200)
+        return [p['id'] for p in response.json()['results']]
+
+    def test_save_do_perfil_reescreve_as_tags(self):
+        from accounts.models import PalavraChave
+
+        user = self.profissional('doces@vagali.com', 'Bolo, Brigadeiro;  bolo , Pão de Mel')
+        self.assertEqual(
+            sorted(user.profile.tags.values_list('termo', flat=True)), ['bolo', 'brigadeiro', 'pao de mel'],
+        )
+
+        user.profile.palavras_chave = 'BOLO, Torta'
+        user.profile.save()
+        self.assertEqual(sorted(user.profile.tags.values_list('termo', flat=True)), ['bolo', 'torta'])
+
+        # Termos são compartilhados entre perfis (uma linha por tag)
+        self.profissional('outro@vagali.com', 'bolo')
+        self.assertEqual(PalavraChave.objects.filter(termo='bolo').count(), 1)
+
+    def test_filtros_por_tag(self):
+        doces = self.profissional('doces@vagali.com', 'Bolo, Brigadeiro')
+        tortas = self.profissional('tortas@vagali.com', 'bolo, torta')
+        self.profissional('pintor@vagali.com', 'pintura')
+
+        self.assertEqual(self.filtrar(tag='bolo'), [doces.pk, tortas.pk])
+        # Várias tags (repetindo o parâmetro ou separadas por vírgula): E
+        self.assertEqual(self.filtrar(tag=['bolo', 'Torta']), [tortas.pk])
+        self.assertEqual(self.filtrar(tag='bolo, brigadeiro'), [doces.pk])
+        self.assertEqual(self.filtrar(tag=['brigadeiro', 'torta']), [])
+        # Prefixo: qualquer tag que comece com ele (OU), sem repetir o perfil
+        self.assertEqual(self.filtrar(tag_prefix='b'), [doces.pk, tortas.pk])
+        self.assertEqual(self.filtrar(tag='bolo', tag_prefix='tor'), [tortas.pk])
+
+
+
+class ProximidadeTests(TestCase):
+    """ Coordenadas do perfil pelo CEP e filtro ?raio_km= da listagem de profissionais. """
+
+    def setUp(self):
+        from localizacao.models import CepCoordenada
+
+        CepCoordenada.objects.bulk_create([
+            CepCoordenada(cep='24020000', latitude=-22.8950, longitude=-43.1230),  # Niterói
+            CepCoordenada(cep='20040000', latitude=-22.9035, longitude=-43.1780),  # Rio (~6 km)
+            CepCoordenada(cep='01001000', latitude=-23.5505, longitude=-46.6340),  # São Paulo
+        ])
+        self.niteroi, self.rio, self.sao_paulo, self.sem_cep = (
+            self.profissional(f'pro{i}@vagali.com', cep)
+            for i, cep in enumerate(('24020000', '20040000', '01001000', '99999999'))
+        )
+
+    def profissional(self, email, cep):
+        user = User.objects.create_user(email, 'senha-teste', is_professional=True)
+        user.profile.cep = cep
+        user.profile.save()
+        return user
+
+    def filtrar(self, **params):
+        return APIClient().get('/api/v1/accounts/profissionais/', params)
+
+    def test_filtro_por_raio(self):
+        resultados = self.filtrar(cep='24020000', raio_km=10).json()['results']
+        self.assertEqual([p['id'] for p in resultados], [self.niteroi.pk, self.rio.pk])
+        self.assertLess(resultados[1]['distancia_km'], 10)
+
+        resultados = self.filtrar(cep='24020-000', raio_km=1).json()['results']
+        self.assertEqual([p['id'] for p in resultados], [self.niteroi.pk])
+
+    def test_cep_desconhecido_ou_invalido(self):
+        self.sem_cep.profile.refresh_from_db()
+        self.assertIsNone(self.sem_cep.profile.geo_celula)
+        for params in ({'cep': '99999999'}, {'cep': '123'}, {'cep': '24020000', 'raio_km': 'abc'},
+                       {'cep': '24020000', 'raio_km': 500}):
+            response = self.filtrar(**{'raio_km': 10, **params})
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_save_sem_mudar_o_cep_nao_consulta_a_tabela_de_ceps(self):
+        profile = Profile.objects.get(user=self.niteroi)
+        profile.bio = 'Eletricista'
+        with CaptureQueriesContext(connection) as contexto:
+            profile.save()
+        self.assertFalse(any('localizacao_cepcoordenada' in q['sql'] for q in contexto.captured_queries))
+
+        profile.cep = '20040000'
+        profile.save()
+        self.assertEqual(profile.geo_celula, Profile.objects.get(user=self.rio).geo_celula)
+
+    def test_recalcular_coordenadas_preenche_a_celula(self):
+        from django.core.management import call_command
+
+        from localizacao.geo import celula
+        from localizacao.models import CepCoordenada
+
+        CepCoordenada.objects.create(cep='99999999', latitude=-22.9, longitude=-43.2)
+        call_command('recalcular_coordenadas', stdout=StringIO())
+        profile = Profile.objects.get(user=self.sem_cep)
+        self.assertEqual(profile.geo_celula, celula(-22.9, -43.2))
+
+
+def png(cor=0):
+    """ PNG 1x1 válido (também para o Pillow, quando instalado); 'cor' muda o conteúdo. """
+    import struct
+    import zlib
+
+    def bloco(tipo, dados):
+        return struct.pack('>I', len(dados)) + tipo + dados + struct.pack('>I', zlib.crc32(tipo + dados))
+
+    pixels = zlib.compress(bytes([0, cor, cor, cor]))
+    return (
+        b'\x89PNG\r\n\x1a\n' + bloco(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0))
+        + bloco(b'IDAT', pixels) + bloco(b'IEND', b'')
+    )
+
+
+class MidiaTests(TestCase):
+    """ Uploads gravados em disco, deduplicados pelo SHA-256 e retomáveis em pedaços. """
+
+    def setUp(self):
+        import tempfile
+
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        self.arquivo = lambda conteudo, nome='foto.png': SimpleUploadedFile(nome, conteudo, 'image/png')
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        configuracao = override_settings(
+            MEDIA_ROOT=f'{diretorio.name}/media',
+            MIDIA={'TAMANHO_MAXIMO': 4096, 'TAMANHO_PEDACO_MAXIMO': 1024, 'DIRETORIO_PARCIAL': f'{diretorio.name}/parcial'},
+        )
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        token_cache.clear()
+        self.user = User.objects.create_user('midia@vagali.com', 'senha-teste', is_professional=True)
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user).key}')
+
+    def test_foto_de_perfil(self):
+        self.api.get('/api/v1/accounts/perfil/me/')  # usuário (e Profile) no cache de autenticação
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post('/api/v1/accounts/perfil/photo/', {'photo': self.arquivo(png())}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        perfil = self.api.get('/api/v1/accounts/perfil/me/').json()
+        self.assertEqual(perfil['avatar_url'], response.json()['avatar_url'])
+        self.assertTrue(perfil['avatar_url'].startswith('/media/midia/'))
+
+    def test_mesmo_conteudo_reaproveita_o_arquivo(self):
+        from accounts.models import Arquivo
+
+        outro = APIClient()
+        token = Token.objects.create(user=User.objects.create_user('outro@vagali.com', 'senha-teste'))
+        outro.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        urls = {
+            api.post('/api/v1/accounts/upload-midia/', {'file': self.arquivo(png(7)), 'type': 'banner'},
+                     format='multipart').json()['url']
+            for api in (self.api, outro)
+        }
+        self.assertEqual(len(urls), 1)
+        self.assertEqual(Arquivo.objects.count(), 1)
+
+    def test_reaproveitar_orfao_antigo_renova_a_carencia(self):
+        import hashlib
+        import os
+        import tempfile
+        from datetime import timedelta
+
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        from accounts.midia import ArquivoEmDisco, armazenar
+        from accounts.models import Arquivo
+
+        conteudos = {cor: png(cor) for cor in (3, 4)}
+        hashes = {cor: hashlib.sha256(conteudo).hexdigest() for cor, conteudo in conteudos.items()}
+        for cor, sha256 in hashes.items():
+            Arquivo.objects.create(sha256=sha256, nome=f'midia/{sha256}.png', tamanho=len(conteudos[cor]),
+                                   content_type='image/png')
+        Arquivo.objects.update(usado_em=timezone.now() - timedelta(days=2))  # dois órfãos antigos
+
+        # O mesmo conteúdo do primeiro é reenviado antes da limpeza
+        descritor, caminho = tempfile.mkstemp()
+        with os.fdopen(descritor, 'wb') as temporario:
+            temporario.write(conteudos[3])
+        reaproveitado = armazenar(ArquivoEmDisco(caminho), hashes[3])
+
+        call_command('limpar_midia', stdout=StringIO())
+        self.assertEqual(list(Arquivo.objects.values_list('pk', flat=True)), [reaproveitado.pk])
+
+    def test_arquivo_grande_demais_e_formato_invalido(self):
+        grande = self.arquivo(png() + b'\0' * 5000)
+        response = self.api.post('/api/v1/accounts/portfolio/', {'image': grande}, format='multipart')
+        self.assertEqual(response.status_code, 413)
+
+        texto = self.arquivo(b'nao sou uma imagem', 'foto.txt')
+        response = self.api.post('/api/v1/accounts/portfolio/', {'image': texto}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+
+    def test_upload_retomavel(self):
+        conteudo = png(42) + b'\0' * 1500  # dados extras depois do IEND
+        criada = self.api.post('/api/v1/accounts/uploads/', {
+            'finalidade': 'portfolio', 'tamanho': len(conteudo), 'legenda': 'Obra',
+        }, format='json')
+        self.assertEqual(criada.status_code, 201)
+        url = f"/api/v1/accounts/uploads/{criada.json()['id']}/"
+
+        def enviar(offset, pedaco):
+            return self.api.generic(
+                'PATCH', url, pedaco, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+            )
+
+        self.assertEqual(enviar(0, conteudo[:1000]).status_code, 200)
+        # Offset errado (ex: pedaço repetido depois de uma queda): 409 com o offset certo
+        conflito = enviar(0, conteudo[:1000])
+        self.assertEqual(conflito.status_code, 409)
+        self.assertEqual(conflito['Upload-Offset'], '1000')
+        self.assertEqual(self.api.head(url)['Upload-Offset'], '1000')
+
+        final = enviar(1000, conteudo[1000:])
+        self.assertEqual(final.status_code, 200)
+        self.assertTrue(final.json()['concluida'])
+        portfolio = self.api.get('/api/v1/accounts/portfolio/', {'professional': self.user.pk}).json()['results']
+        self.assertEqual([(item['caption'], item['image_url']) for item in portfolio], [('Obra', final.json()['url'])])
@@ -0,0 +1,80 @@
+# accounts/tokens.py
+
+"""
+Tokens JWT (djangorestframework-simplejwt) com rotação de refresh e revogação.
+
+- Access token: curto (SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']) e verificado só pela
+  assinatura, sem consulta a tabela de tokens (ver CachedJWTAuthentication).
+- Refresh token: a cada uso é revogado e substituído por um novo (rotação). O jti
+  revogado vai para TokenRevogado, que é consultado apenas no refresh.
+- Troca de senha: o claim 'hash_password' (CHECK_REVOKE_TOKEN) invalida access e
+  refresh emitidos antes da troca.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import TokenRevogado, User
+
+
+class RefreshTokenRevogavel(RefreshToken):
+    """ RefreshToken que consulta e alimenta a tabela TokenRevogado. """
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if TokenRevogado.objects.filter(jti=self[api_settings.JTI_CLAIM]).exists():
+            raise TokenError(_('Token revogado.'))
+
+    def revogar(self):
+        """
+        Revoga o token. Retorna False se ele já estava revogado: o INSERT no índice
+        único é o que decide qual de duas rotações simultâneas do mesmo token vence.
+        """
+        try:
+            with transaction.atomic():
+                TokenRevogado.objects.create(
+                    jti=self[api_settings.JTI_CLAIM],
+                    expira_em=datetime.fromtimestamp(self['exp'], tz=dt_timezone.utc),
+                )
+        except IntegrityError:
+            return False
+        return True
+
+
+def emitir_tokens(user):
+    """Par (refresh, access) para um usuário recém-autenticado."""
+    refresh = RefreshTokenRevogavel.for_user(user)
+    return str(refresh), str(refresh.access_token)
+
+
+class RefreshRotativoSerializer(serializers.Serializer):
+    """ Troca um refresh válido por um novo par access/refresh, revogando o anterior. """
+    refresh = serializers.CharField()
+    access = serializers.CharField(read_only=True)
+
+    def validate(self, attrs):
+        try:
+            refresh = RefreshTokenRevogavel(attrs['refresh'])
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        user = User.objects.filter(pk=refresh.payload.get(api_settings.USER_ID_CLAIM)).first()
+        if not user or not user.is_active:
+            raise AuthenticationFailed(_('Usuário inativo ou excluído.'), code='no_active_account')
+        if (api_settings.CHECK_REVOKE_TOKEN
+                and refresh.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)):
+            raise AuthenticationFailed(_('A senha do usuário foi alterada.'), code='password_changed')
+
+        if not refresh.revogar():
+            raise InvalidToken(_('Token revogado.'))
+
+        novo = RefreshTokenRevogavel.for_user(user)
+        return {'refresh': str(novo), 'access': str(novo.access_token)}
@@ -2,16 +2,20 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions
 from rest_framework import status
+from rest_framework.exceptions import APIException
 from django.views.decorators.csrf import csrf_exempt 
 from django.utils.decorators import method_decorator
 # Importamos o Form correto
 from .forms import ClientProfessionalCreationForm
+from vagali_project.throttling import CADASTRO_THROTTLES
 
 # A view de API agora se chama RegisterAPIView
 @method_decorator(csrf_exempt, name='dispatch')
 class RegisterAPIView(APIView):
 
     permission_classes = [permissions.AllowAny]
+    # Limite por IP antes de validar o form (o save calcula o hash da senha)
+    throttle_classes = CADASTRO_THROTTLES
     """
     View de registro que aceita JSON do React, usa ClientProfessionalCreationForm para validação
     e cria o usuário e perfil.
@@ -40,6 +44,9 @@ class RegisterAPIView(APIView):
                     {"message": "Cadastro realizado com sucesso!", "user_id": user.id},
                     status=status.HTTP_201_CREATED
                 )
+            except APIException:
+                # Ex: pool de hash saturado (429) - o DRF monta a resposta
+                raise
             except Exception as e:
                 # Caso ocorra um erro de banco de dados ou outro erro ao salvar
                 return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
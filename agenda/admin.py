@@ -0,0 +1,24 @@
+from django.contrib import admin
+
+from .models import Agendamento, ExcecaoDisponibilidade, RegraDisponibilidade
+
+
+@admin.register(RegraDisponibilidade)
+class RegraDisponibilidadeAdmin(admin.ModelAdmin):
+    list_display = ('professional', 'dia_semana', 'inicio', 'fim')
+    list_filter = ('dia_semana',)
+    raw_id_fields = ('professional',)
+
+
+@admin.register(ExcecaoDisponibilidade)
+class ExcecaoDisponibilidadeAdmin(admin.ModelAdmin):
+    list_display = ('professional', 'data', 'tipo', 'inicio', 'fim')
+    list_filter = ('tipo',)
+    raw_id_fields = ('professional',)
+
+
+@admin.register(Agendamento)
+class AgendamentoAdmin(admin.ModelAdmin):
+    list_display = ('id', 'professional', 'client', 'data', 'inicio', 'status')
+    list_filter = ('status',)
+    raw_id_fields = ('demanda', 'professional', 'client')
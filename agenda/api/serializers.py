@@ -0,0 +1,48 @@
+# agenda/api/serializers.py
+
+from rest_framework import serializers
+
+from agenda.models import Agendamento, ExcecaoDisponibilidade, RegraDisponibilidade
+
+
+# --- Regras e Exceções (gerenciadas pelo próprio profissional) ---
+class RegraDisponibilidadeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RegraDisponibilidade
+        fields = ('id', 'dia_semana', 'inicio', 'fim')
+
+    def validate(self, attrs):
+        inicio = attrs.get('inicio', getattr(self.instance, 'inicio', None))
+        fim = attrs.get('fim', getattr(self.instance, 'fim', None))
+        if inicio and fim and inicio >= fim:
+            raise serializers.ValidationError({'fim': 'O fim deve ser depois do início.'})
+        return attrs
+
+
+class ExcecaoDisponibilidadeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExcecaoDisponibilidade
+        fields = ('id', 'data', 'tipo', 'inicio', 'fim', 'motivo')
+
+    def validate(self, attrs):
+        tipo = attrs.get('tipo', getattr(self.instance, 'tipo', 'bloqueio'))
+        inicio = attrs.get('inicio', getattr(self.instance, 'inicio', None))
+        fim = attrs.get('fim', getattr(self.instance, 'fim', None))
+        if inicio is None and fim is None:
+            if tipo != 'bloqueio':
+                raise serializers.ValidationError({'inicio': 'Horário extra precisa de início e fim.'})
+        elif inicio is None or fim is None or inicio >= fim:
+            raise serializers.ValidationError({'fim': 'Informe início e fim (fim depois do início).'})
+        return attrs
+
+
+# --- Agendamento ---
+class AgendamentoSerializer(serializers.ModelSerializer):
+    """ Na criação: demanda, professional, data e inicio. O fim vem da duração do horário. """
+
+    class Meta:
+        model = Agendamento
+        fields = ('id', 'demanda', 'professional', 'client', 'data', 'inicio', 'fim', 'status', 'created_at')
+        read_only_fields = ('client', 'fim', 'status', 'created_at')
+        # Unicidade do horário é verificada em Agendamento.reservar (com trava)
+        validators = []
@@ -0,0 +1,21 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from .views import (
+    AgendamentoViewSet,
+    DisponibilidadeView,
+    ExcecaoDisponibilidadeViewSet,
+    RegraDisponibilidadeViewSet,
+)
+
+router = DefaultRouter()
+
+# Rotas da agenda
+router.register(r'regras', RegraDisponibilidadeViewSet, basename='regra-disponibilidade')
+router.register(r'excecoes', ExcecaoDisponibilidadeViewSet, basename='excecao-disponibilidade')
+router.register(r'agendamentos', AgendamentoViewSet, basename='agendamento')
+
+urlpatterns = [
+    path('disponibilidade/<int:professional_id>/<str:data>/', DisponibilidadeView.as_view(), name='agenda-disponibilidade'),
+    path('', include(router.urls)),
+]
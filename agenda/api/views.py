@@ -0,0 +1,121 @@
+# agenda/api/views.py
+
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import exceptions, mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.models import User
+from agenda.disponibilidade import duracao_slot, horarios_disponiveis
+from agenda.models import Agendamento, ExcecaoDisponibilidade, RegraDisponibilidade
+from app_servicos.models import Offer
+from vagali_project.pagination import KeysetPagination, ListagemPorRamosMixin
+
+from .serializers import AgendamentoSerializer, ExcecaoDisponibilidadeSerializer, RegraDisponibilidadeSerializer
+
+
+# --- 1. Disponibilidade de um Profissional em uma Data (usada pelo ProfessionalSchedule.jsx) ---
+class DisponibilidadeView(APIView):
+    """ GET /api/v1/agenda/disponibilidade/<professional_id>/<AAAA-MM-DD>/ """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def get(self, request, professional_id, data):
+        try:
+            dia = parse_date(data) if len(data) == 10 else None
+        except ValueError:  # formato certo, data inexistente (ex: 2025-13-01)
+            dia = None
+        if dia is None:
+            raise exceptions.ValidationError({'data': 'Use o formato AAAA-MM-DD.'})
+        get_object_or_404(User.objects.filter(is_professional=True), pk=professional_id)
+
+        return Response({
+            'professional': professional_id,
+            'data': dia.isoformat(),
+            'duracao_minutos': duracao_slot(),
+            'available_slots': horarios_disponiveis(professional_id, dia),
+        })
+
+
+class AgendaDoProfissionalMixin:
+    """ Regras/exceções: cada profissional só vê e altera as suas. """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return self.model.objects.filter(professional=self.request.user).order_by('id')
+
+    def perform_create(self, serializer):
+        if not self.request.user.is_professional:
+            raise exceptions.PermissionDenied("Apenas profissionais têm agenda.")
+        serializer.save(professional=self.request.user)
+
+
+# --- 2. Regras semanais e exceções do profissional logado ---
+class RegraDisponibilidadeViewSet(AgendaDoProfissionalMixin, viewsets.ModelViewSet):
+    model = RegraDisponibilidade
+    serializer_class = RegraDisponibilidadeSerializer
+
+
+class ExcecaoDisponibilidadeViewSet(AgendaDoProfissionalMixin, viewsets.ModelViewSet):
+    model = ExcecaoDisponibilidade
+    serializer_class = ExcecaoDisponibilidadeSerializer
+
+
+# --- 3. Agendamentos ---
+class AgendamentoViewSet(ListagemPorRamosMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                         mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Cliente reserva um horário livre de um profissional para uma das suas demandas
+    (o profissional precisa ter ofertado nela ou estar atribuído). Cliente e
+    profissional listam os seus agendamentos e podem cancelá-los.
+    """
+    serializer_class = AgendamentoSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination # Cursor por (created_at, id)
+
+    def get_queryset(self):
+        # Pela participação, não pelo papel atual (is_professional pode ser trocado em /perfil/me/)
+        user = self.request.user
+        return Agendamento.objects.filter(Q(client=user) | Q(professional=user)).order_by('-created_at', '-id')
+
+    def get_ramos(self):
+        # Listagem: um ramo por índice (client, -created_at, -id) e (professional, -created_at, -id)
+        user = self.request.user
+        return [
+            Agendamento.objects.filter(client=user).order_by('-created_at', '-id'),
+            Agendamento.objects.filter(professional=user).order_by('-created_at', '-id'),
+        ]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dados = serializer.validated_data
+        demanda, professional = dados['demanda'], dados['professional']
+        user = request.user
+
+        if demanda.client_id != user.pk:
+            raise exceptions.PermissionDenied("Você só pode agendar para suas próprias demandas.")
+        if demanda.professional_id != professional.pk and not Offer.objects.filter(
+            demanda=demanda, professional=professional,
+        ).exists():
+            raise exceptions.PermissionDenied("Este profissional não ofertou nem foi atribuído a esta demanda.")
+
+        agora = timezone.localtime()
+        if (dados['data'], dados['inicio']) <= (agora.date(), agora.time()):
+            raise exceptions.ValidationError({'inicio': 'Escolha um horário futuro.'})
+
+        agendamento = Agendamento.reservar(demanda, professional.pk, user.pk, dados['data'], dados['inicio'])
+        if agendamento is None:
+            return Response({'detail': 'Horário indisponível.'}, status=status.HTTP_409_CONFLICT)
+        return Response(self.get_serializer(agendamento).data, status=status.HTTP_201_CREATED)
+
+    # Ação customizada para cancelar (libera o horário)
+    @action(detail=True, methods=['post'])
+    def cancelar(self, request, pk=None):
+        agendamento = self.get_object()
+        if not agendamento.cancelar():
+            return Response({'detail': 'O agendamento já está cancelado.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(agendamento).data, status=status.HTTP_200_OK)
@@ -0,0 +1,70 @@
+# agenda/cache.py
+
+"""
+Cache dos horários livres por (profissional, dia), no cache do Django configurado em
+AGENDA['CACHE_ALIAS'] (compartilhado entre workers se o backend for Redis/Memcached).
+
+A chave de cada dia inclui duas versões:
+- versão do profissional: trocada quando regras ou exceções mudam (afetam muitas datas);
+- versão do dia: trocada a cada agendamento/cancelamento naquela data.
+
+Invalidar é só trocar a versão (nada é apagado). Um leitor que calculou os horários
+antes de uma reserva grava o resultado na versão antiga, que ninguém lê mais: não há
+janela em que um horário já reservado volte a aparecer como livre. As versões são
+time.time_ns() (nunca repetem), e não um contador: um contador que expirasse voltaria
+a 0 e a próxima reserva reutilizaria o valor de uma entrada anterior ainda válida.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+CONFIG_PADRAO = {
+    'DURACAO_SLOT_MINUTOS': 60,
+    'CACHE_ALIAS': 'default',
+    'CACHE_TIMEOUT': 10 * 60,
+}
+
+
+def get_config():
+    return {**CONFIG_PADRAO, **getattr(settings, 'AGENDA', {})}
+
+
+def _backend(config):
+    return caches[config['CACHE_ALIAS']]
+
+
+def _chave_profissional(professional_id):
+    return f'agenda:versao:{professional_id}'
+
+
+def _chave_dia(professional_id, data):
+    return f'agenda:versao:{professional_id}:{data.isoformat()}'
+
+
+def obter_horarios(professional_id, data, calcular):
+    """Horários do dia pelo cache; em caso de falta chama calcular() e guarda."""
+    config = get_config()
+    backend = _backend(config)
+    chave_prof, chave_dia = _chave_profissional(professional_id), _chave_dia(professional_id, data)
+    versoes = backend.get_many([chave_prof, chave_dia])
+    chave = f'agenda:horarios:{professional_id}:{data.isoformat()}:{versoes.get(chave_prof, 0)}:{versoes.get(chave_dia, 0)}'
+
+    horarios = backend.get(chave)
+    if horarios is None:
+        horarios = calcular()
+        backend.set(chave, horarios, config['CACHE_TIMEOUT'])
+    return horarios
+
+
+def invalidar_dia(professional_id, data):
+    config = get_config()
+    # A versão dura mais que as entradas: quando expira, as entradas antigas já expiraram
+    _backend(config).set(_chave_dia(professional_id, data), time.time_ns(), config['CACHE_TIMEOUT'] * 2)
+
+
+def invalidar_profissional(professional_id):
+    config = get_config()
+    _backend(config).set(_chave_profissional(professional_id), time.time_ns(), config['CACHE_TIMEOUT'] * 2)
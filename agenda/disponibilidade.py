@@ -0,0 +1,102 @@
+# agenda/disponibilidade.py
+
+"""
+Disponibilidade de um profissional em uma data:
+
+    livres = unir(regras do dia da semana + horários extras) - unir(bloqueios + agendamentos)
+
+Três consultas indexadas (regras por dia da semana, exceções e agendamentos da data)
+e o merge de intervalos em memória; os horários são o fatiamento dos intervalos
+livres em blocos de AGENDA['DURACAO_SLOT_MINUTOS'].
+
+Para muitos profissionais de uma vez (ex: "quem está livre sábado de manhã"), as
+mesmas três consultas trazem os dados de todos os candidatos e uma única varredura
+(intervalos.varrer) responde para todos.
+"""
+
+from django.utils import timezone
+
+from . import cache
+from .intervalos import fatiar, formatar, minutos, subtrair, unir, varrer
+from .models import Agendamento, ExcecaoDisponibilidade, RegraDisponibilidade
+
+
+DIA_INTEIRO = (0, 24 * 60)
+
+
+def duracao_slot():
+    return cache.get_config()['DURACAO_SLOT_MINUTOS']
+
+
+def intervalos_livres(professional_id, data):
+    """Intervalos livres (em minutos) calculados direto do banco, sem cache."""
+    disponiveis = [
+        (minutos(inicio), minutos(fim))
+        for inicio, fim in RegraDisponibilidade.objects.filter(
+            professional_id=professional_id, dia_semana=data.weekday(),
+        ).values_list('inicio', 'fim')
+    ]
+    ocupados = [
+        (minutos(inicio), minutos(fim))
+        for inicio, fim in Agendamento.objects.filter(
+            professional_id=professional_id, data=data, status='confirmado',
+        ).values_list('inicio', 'fim')
+    ]
+    for tipo, inicio, fim in ExcecaoDisponibilidade.objects.filter(
+        professional_id=professional_id, data=data,
+    ).values_list('tipo', 'inicio', 'fim'):
+        intervalo = DIA_INTEIRO if inicio is None else (minutos(inicio), minutos(fim))
+        (disponiveis if tipo == 'extra' else ocupados).append(intervalo)
+
+    return subtrair(unir(disponiveis), unir(ocupados))
+
+
+def horarios_disponiveis(professional_id, data):
+    """
+    Inícios dos horários livres ('HH:MM') da data, pelo cache por (profissional, dia).
+    Datas passadas não têm horários; hoje, só os que ainda não começaram.
+    """
+    hoje = timezone.localdate()
+    if data < hoje:
+        return []
+
+    duracao = duracao_slot()
+    horarios = cache.obter_horarios(
+        professional_id, data, lambda: fatiar(intervalos_livres(professional_id, data), duracao),
+    )
+    if data == hoje:
+        # Filtra depois do cache: a entrada do dia continua válida ao longo do dia
+        agora = minutos(timezone.localtime())
+        horarios = [inicio for inicio in horarios if inicio > agora]
+    return [formatar(inicio) for inicio in horarios]
+
+
+def profissionais_livres(profissionais, data, inicio, fim):
+    """
+    Horários livres entre 'inicio' e 'fim' (minutos) da data para vários profissionais.
+    'profissionais' é um queryset de ids (ex: a listagem já filtrada por busca/tags/raio),
+    usado como subconsulta: três consultas no total, qualquer que seja o número de
+    candidatos. Retorna {professional_id: [inícios em minutos]}, só com quem tem horário.
+    """
+    hoje = timezone.localdate()
+    if data < hoje:
+        return {}
+    if data == hoje:
+        inicio = max(inicio, minutos(timezone.localtime()) + 1)
+
+    def intervalos():
+        for professional_id, regra_inicio, regra_fim in RegraDisponibilidade.objects.filter(
+            dia_semana=data.weekday(), professional_id__in=profissionais,
+        ).values_list('professional_id', 'inicio', 'fim'):
+            yield professional_id, minutos(regra_inicio), minutos(regra_fim), True
+        for professional_id, ag_inicio, ag_fim in Agendamento.objects.filter(
+            data=data, status='confirmado', professional_id__in=profissionais,
+        ).values_list('professional_id', 'inicio', 'fim'):
+            yield professional_id, minutos(ag_inicio), minutos(ag_fim), False
+        for professional_id, tipo, exc_inicio, exc_fim in ExcecaoDisponibilidade.objects.filter(
+            data=data, professional_id__in=profissionais,
+        ).values_list('professional_id', 'tipo', 'inicio', 'fim'):
+            intervalo = DIA_INTEIRO if exc_inicio is None else (minutos(exc_inicio), minutos(exc_fim))
+            yield professional_id, intervalo[0], intervalo[1], tipo == 'extra'
+
+    return varrer(intervalos(), duracao_slot(), (inicio, fim))
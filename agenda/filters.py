@@ -0,0 +1,52 @@
+# agenda/filters.py
+
+from rest_framework import exceptions
+from rest_framework.filters import BaseFilterBackend
+from django.utils.dateparse import parse_date, parse_time
+
+from .disponibilidade import profissionais_livres
+from .intervalos import minutos
+
+
+class DisponibilidadeFilter(BaseFilterBackend):
+    """
+    Profissionais com algum horário livre em uma janela de tempo.
+    Uso: ?livre_em=2026-10-24&livre_de=08:00&livre_ate=12:00
+    - Sem 'livre_em', o queryset não é alterado. Sem 'livre_de'/'livre_ate', vale o dia todo.
+    - Deve ser o último filtro da view: os candidatos são o queryset já filtrado
+      (busca, tags, raio), usado como subconsulta pelo cálculo em lote.
+    - Os horários encontrados ficam em view.horarios_livres ({id: [inícios]}) para o serializer.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        data = request.query_params.get('livre_em')
+        if not data:
+            return queryset
+
+        try:
+            dia = parse_date(data)
+        except ValueError:
+            dia = None
+        if dia is None:
+            raise exceptions.ValidationError({'livre_em': 'Use o formato AAAA-MM-DD.'})
+
+        inicio = self._minutos(request, 'livre_de', 0)
+        fim = self._minutos(request, 'livre_ate', 24 * 60)
+        if inicio >= fim:
+            raise exceptions.ValidationError({'livre_ate': 'O fim da janela deve ser depois do início.'})
+
+        livres = profissionais_livres(queryset.order_by().values('pk'), dia, inicio, fim)
+        view.horarios_livres = livres
+        return queryset.filter(pk__in=list(livres))
+
+    def _minutos(self, request, parametro, padrao):
+        valor = request.query_params.get(parametro)
+        if not valor:
+            return padrao
+        try:
+            hora = parse_time(valor)
+        except ValueError:
+            hora = None
+        if hora is None:
+            raise exceptions.ValidationError({parametro: 'Use o formato HH:MM.'})
+        return minutos(hora)
@@ -0,0 +1,129 @@
+# agenda/intervalos.py
+
+"""
+Aritmética de intervalos do dia, em minutos desde a meia-noite: [inicio, fim).
+
+A disponibilidade não é guardada como uma linha por horário: as regras semanais,
+exceções e agendamentos viram listas de intervalos, que são unidos (merge) e
+subtraídos em tempo linear depois da ordenação. Os horários oferecidos só são
+gerados no fim, fatiando os intervalos livres.
+"""
+
+from datetime import time
+
+
+def minutos(hora):
+    return hora.hour * 60 + hora.minute
+
+
+def hora(total):
+    return time(total // 60, total % 60)
+
+
+def formatar(total):
+    return f'{total // 60:02d}:{total % 60:02d}'
+
+
+def unir(intervalos):
+    """Ordena e funde intervalos sobrepostos ou encostados. O(n log n)."""
+    unidos = []
+    for inicio, fim in sorted(intervalos):
+        if fim <= inicio:
+            continue
+        if unidos and inicio <= unidos[-1][1]:
+            if fim > unidos[-1][1]:
+                unidos[-1][1] = fim
+        else:
+            unidos.append([inicio, fim])
+    return [tuple(intervalo) for intervalo in unidos]
+
+
+def subtrair(base, remover):
+    """
+    base - remover, ambas já unidas (ordenadas e sem sobreposição). Dois ponteiros:
+    O(len(base) + len(remover)).
+    """
+    resultado = []
+    j = 0
+    for inicio, fim in base:
+        atual = inicio
+        while j < len(remover) and remover[j][1] <= atual:
+            j += 1
+        k = j
+        while k < len(remover) and remover[k][0] < fim:
+            if remover[k][0] > atual:
+                resultado.append((atual, remover[k][0]))
+            atual = max(atual, remover[k][1])
+            k += 1
+        if atual < fim:
+            resultado.append((atual, fim))
+    return resultado
+
+
+def contem(intervalos, inicio, fim):
+    """[inicio, fim) cabe inteiro em algum dos intervalos (unidos)?"""
+    return any(a <= inicio and fim <= b for a, b in intervalos)
+
+
+def fatiar(intervalos, duracao, a_partir_de=0):
+    """Inícios dos horários de 'duracao' minutos dentro dos intervalos livres."""
+    inicios = []
+    for inicio, fim in intervalos:
+        atual = inicio
+        while atual + duracao <= fim:
+            if atual >= a_partir_de:
+                inicios.append(atual)
+            atual += duracao
+    return inicios
+
+
+def varrer(intervalos, duracao, janela):
+    """
+    Varredura (sweep line) única para muitos profissionais de uma vez.
+
+    'intervalos': iterável de (chave, inicio, fim, disponivel) — regras e horários
+    extras com disponivel=True; bloqueios e agendamentos com disponivel=False.
+    Os pontos de início/fim são ordenados por (chave, minuto) e percorridos uma vez;
+    em cada chave, um trecho está livre quando há ao menos um intervalo disponível
+    aberto e nenhum ocupado. O(n log n) no total de intervalos, sem laço por
+    profissional nem por horário.
+
+    Retorna {chave: [inícios dos horários de 'duracao' minutos contidos em 'janela']},
+    só com as chaves que têm algum horário (mesmo fatiamento de 'fatiar').
+    """
+    pontos = []
+    for chave, inicio, fim, disponivel in intervalos:
+        if fim > inicio:
+            pontos.append((chave, inicio, 1, disponivel))
+            pontos.append((chave, fim, -1, disponivel))
+    pontos.sort(key=lambda ponto: (ponto[0], ponto[1]))
+
+    janela_inicio, janela_fim = janela
+    resultado = {}
+    chave_atual, disponiveis, ocupados, livre_desde = None, 0, 0, None
+    i = 0
+    while i < len(pontos):
+        chave, minuto = pontos[i][0], pontos[i][1]
+        if chave != chave_atual:
+            chave_atual, disponiveis, ocupados, livre_desde = chave, 0, 0, None
+        # Aplica todos os pontos do mesmo minuto antes de avaliar o estado
+        while i < len(pontos) and pontos[i][0] == chave and pontos[i][1] == minuto:
+            _, _, delta, disponivel = pontos[i]
+            if disponivel:
+                disponiveis += delta
+            else:
+                ocupados += delta
+            i += 1
+
+        livre = disponiveis > 0 and ocupados == 0
+        if livre and livre_desde is None:
+            livre_desde = minuto
+        elif not livre and livre_desde is not None:
+            inicios = [
+                inicio for inicio in fatiar([(livre_desde, minuto)], duracao, a_partir_de=janela_inicio)
+                if inicio + duracao <= janela_fim
+            ]
+            if inicios:
+                resultado.setdefault(chave, []).extend(inicios)
+            livre_desde = None
+    return resultado
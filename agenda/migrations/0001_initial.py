@@ -0,0 +1,76 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('app_servicos', '0008_indices_consultas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Agendamento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField(verbose_name='Data')),
+                ('inicio', models.TimeField(verbose_name='Início')),
+                ('fim', models.TimeField(verbose_name='Fim')),
+                ('status', models.CharField(choices=[('confirmado', 'Confirmado'), ('cancelado', 'Cancelado')], default='confirmado', max_length=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agendamentos', to=settings.AUTH_USER_MODEL)),
+                ('demanda', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agendamentos', to='app_servicos.demanda')),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agendamentos_recebidos', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Agendamento',
+                'verbose_name_plural': 'Agendamentos',
+                'indexes': [models.Index(condition=models.Q(('status', 'confirmado')), fields=['professional', 'data'], name='agendamento_prof_data_idx'), models.Index(fields=['client', '-created_at', '-id'], name='agendamento_cliente_idx'), models.Index(fields=['professional', '-created_at', '-id'], name='agendamento_prof_criacao_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('inicio__lt', models.F('fim'))), name='agendamento_inicio_antes_do_fim'), models.UniqueConstraint(condition=models.Q(('status', 'confirmado')), fields=('professional', 'data', 'inicio'), name='agendamento_unico_por_horario')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExcecaoDisponibilidade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField(verbose_name='Data')),
+                ('tipo', models.CharField(choices=[('bloqueio', 'Bloqueio'), ('extra', 'Horário extra')], default='bloqueio', max_length=10)),
+                ('inicio', models.TimeField(blank=True, null=True, verbose_name='Início')),
+                ('fim', models.TimeField(blank=True, null=True, verbose_name='Fim')),
+                ('motivo', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='excecoes_disponibilidade', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Exceção de Disponibilidade',
+                'verbose_name_plural': 'Exceções de Disponibilidade',
+                'indexes': [models.Index(fields=['professional', 'data'], name='excecao_prof_data_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('fim__isnull', True), ('inicio__isnull', True), ('tipo', 'bloqueio')), models.Q(('fim__isnull', False), ('inicio__isnull', False), ('inicio__lt', models.F('fim'))), _connector='OR'), name='excecao_horario_valido')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RegraDisponibilidade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia_semana', models.PositiveSmallIntegerField(choices=[(0, 'Segunda-feira'), (1, 'Terça-feira'), (2, 'Quarta-feira'), (3, 'Quinta-feira'), (4, 'Sexta-feira'), (5, 'Sábado'), (6, 'Domingo')], verbose_name='Dia da semana')),
+                ('inicio', models.TimeField(verbose_name='Início')),
+                ('fim', models.TimeField(verbose_name='Fim')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='regras_disponibilidade', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Regra de Disponibilidade',
+                'verbose_name_plural': 'Regras de Disponibilidade',
+                'indexes': [models.Index(fields=['professional', 'dia_semana'], name='regra_prof_dia_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('inicio__lt', models.F('fim'))), name='regra_inicio_antes_do_fim')],
+            },
+        ),
+    ]
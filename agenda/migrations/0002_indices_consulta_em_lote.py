@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agenda', '0001_initial'),
+        ('app_servicos', '0008_indices_consultas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agendamento',
+            index=models.Index(condition=models.Q(('status', 'confirmado')), fields=['data', 'professional'], name='agendamento_data_prof_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='excecaodisponibilidade',
+            index=models.Index(fields=['data', 'professional'], name='excecao_data_prof_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='regradisponibilidade',
+            index=models.Index(fields=['dia_semana', 'professional'], name='regra_dia_prof_idx'),
+        ),
+    ]
@@ -0,0 +1,197 @@
+# agenda/models.py
+
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+
+from accounts.models import User
+from app_servicos.models import Demanda
+
+from . import cache
+
+
+DIAS_SEMANA = (
+    (0, _('Segunda-feira')),
+    (1, _('Terça-feira')),
+    (2, _('Quarta-feira')),
+    (3, _('Quinta-feira')),
+    (4, _('Sexta-feira')),
+    (5, _('Sábado')),
+    (6, _('Domingo')),
+)
+
+
+# --- 1. Regra Semanal (ex: toda segunda das 08:00 às 12:00) ---
+class RegraDisponibilidade(models.Model):
+    professional = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='regras_disponibilidade',
+    )
+    dia_semana = models.PositiveSmallIntegerField(_('Dia da semana'), choices=DIAS_SEMANA)
+    inicio = models.TimeField(_('Início'))
+    fim = models.TimeField(_('Fim'))
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.get_dia_semana_display()} {self.inicio:%H:%M}-{self.fim:%H:%M} ({self.professional_id})"
+
+    class Meta:
+        verbose_name = _('Regra de Disponibilidade')
+        verbose_name_plural = _('Regras de Disponibilidade')
+        constraints = [
+            models.CheckConstraint(condition=Q(inicio__lt=F('fim')), name='regra_inicio_antes_do_fim'),
+        ]
+        indexes = [
+            models.Index(fields=['professional', 'dia_semana'], name='regra_prof_dia_idx'),
+            # Consulta em lote ("quem atende sábado?"): todas as regras de um dia da semana
+            models.Index(fields=['dia_semana', 'professional'], name='regra_dia_prof_idx'),
+        ]
+
+
+# --- 2. Exceção em uma Data (folga/bloqueio ou horário extra) ---
+class ExcecaoDisponibilidade(models.Model):
+    TIPO_CHOICES = (
+        ('bloqueio', 'Bloqueio'),
+        ('extra', 'Horário extra'),
+    )
+    professional = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='excecoes_disponibilidade',
+    )
+    data = models.DateField(_('Data'))
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES, default='bloqueio')
+    # Sem horário = o dia inteiro (só para bloqueio)
+    inicio = models.TimeField(_('Início'), null=True, blank=True)
+    fim = models.TimeField(_('Fim'), null=True, blank=True)
+    motivo = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} em {self.data} ({self.professional_id})"
+
+    class Meta:
+        verbose_name = _('Exceção de Disponibilidade')
+        verbose_name_plural = _('Exceções de Disponibilidade')
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    Q(inicio__isnull=True, fim__isnull=True, tipo='bloqueio')
+                    | Q(inicio__isnull=False, fim__isnull=False, inicio__lt=F('fim'))
+                ),
+                name='excecao_horario_valido',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['professional', 'data'], name='excecao_prof_data_idx'),
+            models.Index(fields=['data', 'professional'], name='excecao_data_prof_idx'),
+        ]
+
+
+# --- 3. Agendamento (horário reservado para uma Demanda) ---
+class Agendamento(models.Model):
+    STATUS_CHOICES = (
+        ('confirmado', 'Confirmado'),
+        ('cancelado', 'Cancelado'),
+    )
+    demanda = models.ForeignKey(Demanda, on_delete=models.CASCADE, related_name='agendamentos')
+    professional = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='agendamentos_recebidos',
+    )
+    client = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='agendamentos')
+    data = models.DateField(_('Data'))
+    inicio = models.TimeField(_('Início'))
+    fim = models.TimeField(_('Fim'))
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='confirmado')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Agendamento #{self.id} - {self.data} {self.inicio:%H:%M} ({self.professional_id})"
+
+    @classmethod
+    def reservar(cls, demanda, professional_id, client_id, data, inicio):
+        """
+        Reserva um horário livre (de acordo com as regras, exceções e agendamentos
+        atuais, sem cache). Retorna o Agendamento ou None se o horário não estiver livre.
+
+        Sem corrida entre reservas simultâneas do mesmo profissional:
+        - PostgreSQL/MySQL: a linha do profissional fica travada (FOR UPDATE) durante
+          a verificação + INSERT;
+        - SQLite: transações de escrita já são serializadas (BEGIN IMMEDIATE);
+        - em qualquer banco, o índice único parcial (profissional, data, início) dos
+          agendamentos confirmados recusa o segundo INSERT do mesmo horário.
+        """
+        from .disponibilidade import duracao_slot, intervalos_livres
+        from .intervalos import contem, minutos
+
+        duracao = duracao_slot()
+        fim = (datetime.combine(data, inicio) + timedelta(minutes=duracao)).time()
+        with transaction.atomic():
+            User.objects.select_for_update().filter(pk=professional_id).exists()
+            livres = intervalos_livres(professional_id, data)
+            if not contem(livres, minutos(inicio), minutos(inicio) + duracao):
+                return None
+            try:
+                with transaction.atomic():
+                    return cls.objects.create(
+                        demanda=demanda, professional_id=professional_id, client_id=client_id,
+                        data=data, inicio=inicio, fim=fim,
+                    )
+            except IntegrityError:
+                return None
+
+    def cancelar(self):
+        """UPDATE condicional: só cancela o que ainda está confirmado. Retorna True se cancelou."""
+        with transaction.atomic():
+            alterado = Agendamento.objects.filter(pk=self.pk, status='confirmado').update(status='cancelado')
+            if alterado:
+                self.status = 'cancelado'
+                dados = (self.professional_id, self.data)
+                transaction.on_commit(lambda: cache.invalidar_dia(*dados))
+        return bool(alterado)
+
+    class Meta:
+        verbose_name = _('Agendamento')
+        verbose_name_plural = _('Agendamentos')
+        constraints = [
+            models.CheckConstraint(condition=Q(inicio__lt=F('fim')), name='agendamento_inicio_antes_do_fim'),
+            models.UniqueConstraint(
+                fields=['professional', 'data', 'inicio'], condition=Q(status='confirmado'),
+                name='agendamento_unico_por_horario',
+            ),
+        ]
+        indexes = [
+            # Agendamentos do dia na conta da disponibilidade (só os confirmados)
+            models.Index(
+                fields=['professional', 'data'], condition=Q(status='confirmado'), name='agendamento_prof_data_idx',
+            ),
+            # Consulta em lote: agendamentos confirmados de uma data, de todos os profissionais
+            models.Index(
+                fields=['data', 'professional'], condition=Q(status='confirmado'), name='agendamento_data_prof_idx',
+            ),
+            # Listagens ("meus agendamentos") por chave (created_at, id)
+            models.Index(fields=['client', '-created_at', '-id'], name='agendamento_cliente_idx'),
+            models.Index(fields=['professional', '-created_at', '-id'], name='agendamento_prof_criacao_idx'),
+        ]
+
+
+# --- 4. Signals (invalidação do cache de horários) ---
+@receiver(post_save, sender=RegraDisponibilidade)
+@receiver(post_delete, sender=RegraDisponibilidade)
+@receiver(post_save, sender=ExcecaoDisponibilidade)
+@receiver(post_delete, sender=ExcecaoDisponibilidade)
+def invalidar_agenda_do_profissional(sender, instance, **kwargs):
+    """ Regras valem para todas as semanas: troca a versão do profissional inteiro. """
+    professional_id = instance.professional_id
+    transaction.on_commit(lambda: cache.invalidar_profissional(professional_id))
+
+
+@receiver(post_save, sender=Agendamento)
+@receiver(post_delete, sender=Agendamento)
+def invalidar_dia_do_agendamento(sender, instance, **kwargs):
+    dados = (instance.professional_id, instance.data)
+    transaction.on_commit(lambda: cache.invalidar_dia(*dados))
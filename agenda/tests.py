@@ -0,0 +1,238 @@
+import threading
+from datetime import time, timedelta
+
+from django.core.cache import cache as cache_padrao
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from agenda.disponibilidade import intervalos_livres
+from agenda.intervalos import fatiar, subtrair, unir, varrer
+from agenda.models import Agendamento, ExcecaoDisponibilidade, RegraDisponibilidade
+from app_servicos.models import Service, Demanda, Offer
+
+
+def proxima_segunda():
+    hoje = timezone.localdate()
+    return hoje + timedelta(days=7 - hoje.weekday())
+
+
+class IntervalosTests(SimpleTestCase):
+
+    def test_unir_funde_sobrepostos_e_encostados(self):
+        self.assertEqual(unir([(600, 720), (480, 540), (540, 600), (700, 800)]), [(480, 800)])
+
+    def test_subtrair(self):
+        base = unir([(480, 720), (840, 1080)])
+        self.assertEqual(subtrair(base, [(0, 500), (600, 660), (1000, 1440)]), [(500, 600), (660, 720), (840, 1000)])
+
+    def test_fatiar(self):
+        self.assertEqual(fatiar([(480, 630), (700, 760)], 60), [480, 540, 700])
+
+    def test_varredura_equivale_a_unir_e_subtrair(self):
+        disponiveis = {1: [(480, 600), (600, 720), (840, 900)], 2: [(420, 540)], 3: [(480, 720)]}
+        ocupados = {1: [(540, 600)], 2: [(0, 1440)], 3: [(500, 530), (610, 700)]}
+        intervalos = [(k, a, b, True) for k, lista in disponiveis.items() for a, b in lista]
+        intervalos += [(k, a, b, False) for k, lista in ocupados.items() for a, b in lista]
+
+        esperado = {}
+        for chave in disponiveis:
+            livres = subtrair(unir(disponiveis[chave]), unir(ocupados[chave]))
+            inicios = [i for i in fatiar(livres, 60, a_partir_de=500) if i + 60 <= 800]
+            if inicios:
+                esperado[chave] = inicios
+        self.assertEqual(varrer(intervalos, 60, (500, 800)), esperado)
+
+
+class DadosAgendaMixin:
+    """ Profissional que atende segunda de 08:00 às 12:00 e um cliente com demanda ofertada. """
+
+    def setUp(self):
+        cache_padrao.clear()
+        self.api = APIClient()
+        self.cliente = User.objects.create_user('cliente@vagali.com', 'senha-teste', is_professional=False)
+        self.profissional = User.objects.create_user('pro@vagali.com', 'senha-teste', is_professional=True)
+        servico = Service.objects.create(name='Eletricista', description='Serviços elétricos')
+        self.demanda = Demanda.objects.create(
+            client=self.cliente, service=servico, titulo='Trocar fiação', descricao='Apartamento', cep='24020000',
+        )
+        Offer.objects.create(
+            demanda=self.demanda, professional=self.profissional, proposta_valor='150.00', proposta_prazo='2 dias',
+        )
+        RegraDisponibilidade.objects.create(professional=self.profissional, dia_semana=0, inicio=time(8), fim=time(12))
+        self.data = proxima_segunda()
+        self.url = f'/api/v1/agenda/disponibilidade/{self.profissional.pk}/{self.data.isoformat()}/'
+
+    def reservar(self, inicio='09:00'):
+        self.api.force_authenticate(self.cliente)
+        return self.api.post('/api/v1/agenda/agendamentos/', {
+            'demanda': self.demanda.pk, 'professional': self.profissional.pk,
+            'data': self.data.isoformat(), 'inicio': inicio,
+        })
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class DisponibilidadeTests(DadosAgendaMixin, TestCase):
+
+    def test_horarios_descontam_excecoes_e_agendamentos(self):
+        ExcecaoDisponibilidade.objects.create(
+            professional=self.profissional, data=self.data, tipo='bloqueio', inicio=time(11), fim=time(12),
+        )
+        ExcecaoDisponibilidade.objects.create(
+            professional=self.profissional, data=self.data, tipo='extra', inicio=time(14), fim=time(15),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.reservar('09:00').status_code, 201)
+
+        response = self.api.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['available_slots'], ['08:00', '10:00', '14:00'])
+
+    def test_reserva_invalida_o_cache_do_dia(self):
+        self.assertEqual(self.api.get(self.url).data['available_slots'], ['08:00', '09:00', '10:00', '11:00'])
+        with CaptureQueriesContext(connection) as contexto:
+            self.api.get(self.url)
+        # Só a verificação do profissional: os horários vêm do cache
+        self.assertEqual(len(contexto.captured_queries), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reservar('10:00')
+        self.assertEqual(self.api.get(self.url).data['available_slots'], ['08:00', '09:00', '11:00'])
+
+        agendamento = Agendamento.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api.post(f'/api/v1/agenda/agendamentos/{agendamento.pk}/cancelar/')
+        self.assertEqual(self.api.get(self.url).data['available_slots'], ['08:00', '09:00', '10:00', '11:00'])
+
+    def test_versao_do_dia_expirada_nao_reaproveita_entrada_antiga(self):
+        from agenda.cache import _chave_dia
+
+        self.api.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reservar('10:00')
+        self.assertEqual(self.api.get(self.url).data['available_slots'], ['08:00', '09:00', '11:00'])
+
+        cache_padrao.delete(_chave_dia(self.profissional.pk, self.data))  # a versão do dia expirou
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.reservar('08:00').status_code, 201)
+        self.assertEqual(self.api.get(self.url).data['available_slots'], ['09:00', '11:00'])
+
+    def test_trocar_de_papel_nao_esconde_os_agendamentos(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            agendamento_id = self.reservar('09:00').data['id']
+        self.cliente.is_professional = True
+        self.cliente.save(update_fields=['is_professional'])
+
+        response = self.api.get('/api/v1/agenda/agendamentos/')
+        self.assertEqual([a['id'] for a in response.data['results']], [agendamento_id])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post(f'/api/v1/agenda/agendamentos/{agendamento_id}/cancelar/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_nova_regra_invalida_o_cache(self):
+        self.api.get(self.url)
+        self.api.force_authenticate(self.profissional)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post('/api/v1/agenda/regras/', {'dia_semana': 0, 'inicio': '14:00', 'fim': '16:00'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.api.get(self.url).data['available_slots'], ['08:00', '09:00', '10:00', '11:00', '14:00', '15:00'])
+
+    def test_horario_ocupado_ou_fora_da_agenda(self):
+        self.assertEqual(self.reservar('09:00').status_code, 201)
+        self.assertEqual(self.reservar('09:00').status_code, 409)
+        self.assertEqual(self.reservar('11:30').status_code, 409)
+        self.assertEqual(self.reservar('13:00').status_code, 409)
+
+    def test_data_invalida(self):
+        response = self.api.get(f'/api/v1/agenda/disponibilidade/{self.profissional.pk}/2025-13-01/')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProfissionaisLivresTests(DadosAgendaMixin, TestCase):
+    """ ?livre_em= na listagem de profissionais: cálculo em lote, combinado com os demais filtros. """
+
+    def criar_profissional(self, email, nome, inicio, fim):
+        profissional = User.objects.create_user(email, 'senha-teste', is_professional=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            profissional.profile.full_name = nome
+            profissional.profile.save()
+        RegraDisponibilidade.objects.create(professional=profissional, dia_semana=0, inicio=time(inicio), fim=time(fim))
+        return profissional
+
+    def buscar(self, parametros):
+        response = self.api.get(f'/api/v1/accounts/profissionais/?livre_em={self.data.isoformat()}&{parametros}')
+        self.assertEqual(response.status_code, 200)
+        return {item['id']: item['horarios_livres'] for item in response.data['results']}
+
+    def test_janela_da_manha(self):
+        tarde = self.criar_profissional('tarde@vagali.com', 'Ana Tarde', 13, 18)
+        cedo = self.criar_profissional('cedo@vagali.com', 'Bruno Cedo', 7, 10)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.reservar('08:00').status_code, 201)
+
+        resultado = self.buscar('livre_de=08:00&livre_ate=10:00')
+        self.assertEqual(resultado, {self.profissional.pk: ['09:00'], cedo.pk: ['08:00', '09:00']})
+        self.assertNotIn(tarde.pk, resultado)
+        # Mesmo cálculo da agenda de um profissional
+        self.assertEqual(intervalos_livres(self.profissional.pk, self.data), [(540, 720)])
+
+    def test_bloqueio_do_dia_inteiro(self):
+        ExcecaoDisponibilidade.objects.create(professional=self.profissional, data=self.data, tipo='bloqueio')
+        self.assertEqual(self.buscar('livre_de=08:00&livre_ate=12:00'), {})
+
+    def test_combina_com_a_busca(self):
+        self.criar_profissional('cedo@vagali.com', 'Bruno Cedo', 7, 10)
+        carla = self.criar_profissional('carla@vagali.com', 'Carla Eletricista', 8, 12)
+        self.assertEqual(list(self.buscar('livre_de=08:00&livre_ate=10:00&search=carla')), [carla.pk])
+
+    def test_consultas_nao_crescem_com_o_numero_de_profissionais(self):
+        def contar():
+            with CaptureQueriesContext(connection) as contexto:
+                self.buscar('livre_de=08:00&livre_ate=12:00')
+            return len(contexto.captured_queries)
+
+        poucas = contar()
+        for i in range(10):
+            self.criar_profissional(f'pro{i}@vagali.com', f'Profissional {i}', 8, 12)
+        self.assertEqual(contar(), poucas)
+        self.assertEqual(len(self.buscar('livre_de=08:00&livre_ate=12:00')), 11)
+
+    def test_janela_invalida(self):
+        response = self.api.get(f'/api/v1/accounts/profissionais/?livre_em={self.data.isoformat()}&livre_de=12:00&livre_ate=08:00')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ReservaConcorrenteTests(DadosAgendaMixin, TransactionTestCase):
+    """ Várias reservas simultâneas do mesmo horário: só uma vence. """
+
+    THREADS = 8
+
+    def test_apenas_uma_reserva_vence(self):
+        barreira = threading.Barrier(self.THREADS)
+        resultados = []
+
+        def reservar():
+            api = APIClient()
+            api.force_authenticate(self.cliente)
+            try:
+                barreira.wait()
+                resultados.append(api.post('/api/v1/agenda/agendamentos/', {
+                    'demanda': self.demanda.pk, 'professional': self.profissional.pk,
+                    'data': self.data.isoformat(), 'inicio': '10:00',
+                }).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reservar) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(resultados), [201] + [409] * (self.THREADS - 1))
+        self.assertEqual(Agendamento.objects.filter(status='confirmado').count(), 1)
@@ -31,6 +31,7 @@ class DemandaSerializer(serializers.ModelSerializer):
     professional_name = serializers.SerializerMethodField()
     service_icon = serializers.SerializerMethodField()
     accepted_offer_value = serializers.SerializerMethodField() # Para o valor, se houver oferta aceita
+    distancia_km = serializers.SerializerMethodField() # Só preenchido no feed filtrado por ?raio_km=
 
     class Meta:
         model = Demanda
@@ -49,6 +50,7 @@ class DemandaSerializer(serializers.ModelSerializer):
             'created_at',
             'service_icon', 
             'accepted_offer_value',
+            'distancia_km',
         )
         read_only_fields = ('client', 'professional', 'status', 'created_at')
 
@@ -72,16 +74,17 @@ class DemandaSerializer(serializers.ModelSerializer):
     # Método para buscar o valor da Oferta ACEITA
     def get_accepted_offer_value(self, obj):
         # O valor só é relevante se a demanda tiver um profissional atribuído
-        if obj.status in ['em_andamento', 'concluida']:
-            try:
-                # Busca a oferta que foi aceita (só deve existir uma)
-                accepted_offer = obj.offers.get(status='aceita')
-                # Retorna o valor como float para facilitar o uso no frontend
-                return float(accepted_offer.proposta_valor) 
-            except Offer.DoesNotExist:
-                return None
+        if obj.status in ['em_andamento', 'concluida'] and obj.accepted_offer_id:
+            # FK preenchida no aceite (o DemandaViewSet já a traz no select_related)
+            # Retorna o valor como float para facilitar o uso no frontend
+            return float(obj.accepted_offer.proposta_valor)
         return None
 
+    # Distância anotada pelo filtro de proximidade (None fora dele)
+    def get_distancia_km(self, obj):
+        distancia = getattr(obj, 'distancia_km', None)
+        return round(distancia, 1) if distancia is not None else None
+
 
 # --- Serializer de Oferta ---
 class OfferSerializer(serializers.ModelSerializer):
@@ -4,8 +4,13 @@ from rest_framework import filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
-# REMOVIDO: from django.db.models import Q # Importação não utilizada
+from django.db import transaction
+from django.utils import timezone
 from app_servicos.models import Service, Demanda, Feedback, Offer 
+from localizacao.filters import PerfilDoUsuarioProximidadeFilter
+from app_servicos.cache import catalogo_servicos
+from vagali_project.conditional import ConditionalGetMixin, resposta_condicional
+from vagali_project.pagination import KeysetPagination
 from .serializers import ( 
     ServiceSerializer, 
     DemandaSerializer, 
@@ -21,13 +26,29 @@ class ServiceViewSet(viewsets.ModelViewSet):
     serializer_class = ServiceSerializer
     permission_classes = [permissions.AllowAny]
 
+    def list(self, request, *args, **kwargs):
+        """
+        Catálogo pré-serializado em cache (invalidado pelos signals de Service),
+        com ETag/Last-Modified: navegadores atualizados recebem 304.
+        """
+        entrada = catalogo_servicos.obter()
+        return resposta_condicional(
+            request, lambda: entrada.dados, etag=entrada.etag, last_modified=entrada.last_modified
+        )
+
 
 # --- 2. ViewSet para Demandas (Restrito a Usuários Logados) ---
-class DemandaViewSet(viewsets.ModelViewSet):
+class DemandaViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ Permite a clientes criar/editar demandas e a profissionais listar demandas pendentes. """
     serializer_class = DemandaSerializer
+    # ETag/Last-Modified: a demanda e os perfis cujos nomes aparecem no serializer
+    etag_campos = ('updated_at', 'client__profile__updated_at', 'professional__profile__updated_at')
+    # Exibidos no serializer sem data própria (e-mail é o nome na falta de full_name)
+    etag_campos_extras = ('service__name', 'service__icon', 'client__email', 'professional__email')
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
+    pagination_class = KeysetPagination # Cursor por (created_at, id)
+    # ?raio_km=N limita o feed às demandas a até N km do CEP do profissional (ou de ?cep=)
+    filter_backends = [filters.SearchFilter, PerfilDoUsuarioProximidadeFilter]
     search_fields = ['titulo', 'descricao', 'cep', 'service__name']
 
     def get_queryset(self):
@@ -39,11 +60,21 @@ class DemandaViewSet(viewsets.ModelViewSet):
         user = self.request.user
         
         if not user.is_professional:
-            return Demanda.objects.filter(client=user).order_by('-created_at')
+            queryset = Demanda.objects.filter(client=user)
+        elif self.action == 'concluir':
+            # A demanda a concluir já saiu de 'pendente': busca entre as atribuídas ao profissional
+            queryset = Demanda.objects.filter(professional=user)
         else:
             # CORRIGIDO: Status 'aberto' para 'pendente'
-            return Demanda.objects.filter(status='pendente').order_by('-created_at')
+            queryset = Demanda.objects.filter(status='pendente')
 
+        # Evita N+1 no DemandaSerializer: perfis, serviço e a oferta aceita
+        # (FK denormalizada no aceite) vêm no mesmo JOIN.
+        return queryset.select_related(
+            'service', 'client__profile', 'professional__profile', 'accepted_offer'
+        ).order_by('-created_at', '-id')
+
+    @transaction.atomic
     def perform_create(self, serializer):
         """ Garante que SÓ O CLIENTE PODE CRIAR e preenche o campo 'client'. """
         user = self.request.user
@@ -53,6 +84,7 @@ class DemandaViewSet(viewsets.ModelViewSet):
             
         serializer.save(client=user)
         
+    @transaction.atomic
     def perform_update(self, serializer):
         """
         CORREÇÃO CRÍTICA: Permite que o Cliente edite a Demanda APENAS se estiver 'pendente'.
@@ -75,6 +107,7 @@ class DemandaViewSet(viewsets.ModelViewSet):
         # 4. Salva a atualização
         serializer.save()
 
+    @transaction.atomic
     def perform_destroy(self, instance):
         """ Permite o Cliente excluir a demanda APENAS se estiver pendente. """
         user = self.request.user
@@ -106,21 +139,30 @@ class DemandaViewSet(viewsets.ModelViewSet):
         if demanda.status != 'em_andamento':
             return Response({'detail': 'A demanda não está em andamento.'}, status=status.HTTP_400_BAD_REQUEST)
         
-        demanda.status = 'concluida'
-        demanda.save()
+        # UPDATE condicional (status ainda 'em_andamento') + contadores dos perfis na mesma
+        # transação: conclusões simultâneas contam uma vez só
+        with transaction.atomic():
+            if not demanda.transicao_condicional('em_andamento', 'concluida'):
+                return Response({'detail': 'A demanda não está em andamento.'}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = self.get_serializer(demanda)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 # --- 3. ViewSet para Feedback (Restrito a Clientes) ---
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ Permite ao cliente deixar feedback para um profissional após a conclusão da demanda. """
     serializer_class = FeedbackSerializer
+    etag_campos = ('updated_at', 'client__profile__updated_at', 'professional__profile__updated_at')
+    etag_campos_extras = ('client__email', 'professional__email')
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination # Cursor por (created_at, id)
 
     def get_queryset(self):
-        return Feedback.objects.filter(client=self.request.user).order_by('-created_at')
+        # Nomes de cliente e profissional vêm no mesmo JOIN (sem query por linha no serializer)
+        return Feedback.objects.filter(client=self.request.user).select_related(
+            'client__profile', 'professional__profile'
+        ).order_by('-created_at', '-id')
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -136,22 +178,41 @@ class FeedbackViewSet(viewsets.ModelViewSet):
         if demanda.status != 'concluida':
             raise exceptions.PermissionDenied("O feedback só pode ser deixado após a conclusão do serviço.")
             
-        serializer.save(client=user)
+        # O signal de Feedback atualiza a média do profissional na mesma transação
+        with transaction.atomic():
+            serializer.save(client=user)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
 
 
 # --- 4. ViewSet para Ofertas (Restrito a Profissionais Criarem) ---
-class OfferViewSet(viewsets.ModelViewSet):
+class OfferViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ Permite a Profissionais criar ofertas para demandas abertas. """
     serializer_class = OfferSerializer
+    etag_campos = ('updated_at', 'professional__profile__updated_at', 'demanda__client__profile__updated_at')
+    etag_campos_extras = ('professional__email', 'demanda__client__email')
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination # Cursor por (created_at, id)
 
     def get_queryset(self):
         user = self.request.user
         
         if user.is_professional:
-            return Offer.objects.filter(professional=user).order_by('-created_at')
-        
-        return Offer.objects.filter(demanda__client=user).order_by('-created_at')
+            queryset = Offer.objects.filter(professional=user)
+        else:
+            # 'client' é copiado da demanda: um único índice (client, -created_at, -id)
+            queryset = Offer.objects.filter(client=user)
+
+        # OfferSerializer lê o perfil do profissional e o perfil do cliente da demanda
+        return queryset.select_related(
+            'professional__profile', 'demanda__client__profile'
+        ).order_by('-created_at', '-id')
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -179,24 +240,27 @@ class OfferViewSet(viewsets.ModelViewSet):
             return Response({'detail': 'Oferta não encontrada.'}, status=status.HTTP_404_NOT_FOUND)
 
         user = request.user
-        
-        if user != oferta.demanda.client:
-            raise exceptions.PermissionDenied("Você não é o cliente desta demanda e não pode aceitar esta oferta.")
 
-        # CORRIGIDO: Status 'aberto' para 'pendente'
-        if oferta.demanda.status != 'pendente':
-            return Response({'detail': 'A demanda não está aberta para aceitação.'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        oferta.status = 'aceita'
-        oferta.save()
-        
-        # CORRIGIDO: Status 'em_progresso' para 'em_andamento'
-        demanda = oferta.demanda
-        demanda.status = 'em_andamento'
-        demanda.professional = oferta.professional 
-        demanda.save()
+        with transaction.atomic():
+            # Trava a linha da demanda (PostgreSQL/MySQL): aceites simultâneos esperam aqui
+            demanda = Demanda.objects.select_for_update().get(pk=oferta.demanda_id)
+
+            if user.pk != demanda.client_id:
+                raise exceptions.PermissionDenied("Você não é o cliente desta demanda e não pode aceitar esta oferta.")
+
+            # UPDATE condicional (status ainda 'pendente'): no SQLite, que ignora o
+            # FOR UPDATE, é ele que garante um único vencedor.
+            if not demanda.transicao_condicional(
+                'pendente', 'em_andamento', professional_id=oferta.professional_id, accepted_offer_id=oferta.pk,
+            ):
+                return Response({'detail': 'A demanda não está aberta para aceitação.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        Offer.objects.filter(demanda=demanda).exclude(pk=oferta.pk).update(status='rejeitada')
+            agora = timezone.now()
+            Offer.objects.filter(pk=oferta.pk).update(status='aceita', updated_at=agora)
+            Offer.objects.filter(demanda=demanda).exclude(pk=oferta.pk).update(status='rejeitada', updated_at=agora)
 
+        oferta.status, oferta.updated_at = 'aceita', agora
+        oferta.demanda.status, oferta.demanda.professional_id = demanda.status, demanda.professional_id
+        oferta.demanda.accepted_offer_id = oferta.pk
         serializer = self.get_serializer(oferta)
         return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AppServicosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_servicos'
+
+    def ready(self):
+        from . import checks  # noqa: F401 (registra as verificações de deploy)
@@ -0,0 +1,106 @@
+# app_servicos/cache.py
+
+"""
+Cache do catálogo público de serviços (/api/v1/servicos/).
+
+Dois níveis:
+1. Cache compartilhado (backend do Django configurado em CATALOGO_CACHE_ALIAS: locmem,
+   arquivo, Redis/Memcached...) guarda a VERSÃO atual e a representação serializada.
+2. LRU em memória do processo guarda as últimas versões já lidas, evitando até a
+   desserialização do cache compartilhado.
+
+A cada save/delete de Service a versão é trocada (signals em models.py); todos os
+workers enxergam a nova versão na próxima leitura, desde que CATALOGO_CACHE_ALIAS seja
+um cache compartilhado. Com um cache local ao processo (locmem, padrão) isso só vale
+para um único worker (ver o aviso app_servicos.W001 do 'check --deploy'). A versão
+também é o ETag e o Last-Modified da resposta.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+Entrada = namedtuple('Entrada', ['dados', 'etag', 'last_modified'])
+
+
+class CacheVersionado:
+    """ Representação pré-serializada, versionada no cache compartilhado + LRU local. """
+
+    def __init__(self, nome, construir, tamanho_lru=8, timeout=24 * 60 * 60):
+        self.nome = nome
+        self.construir = construir
+        self.tamanho_lru = tamanho_lru
+        self.timeout = timeout
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[getattr(settings, 'CATALOGO_CACHE_ALIAS', 'default')]
+
+    def _chave_versao(self):
+        return f'{self.nome}:versao'
+
+    def _chave_entrada(self, versao):
+        return f'{self.nome}:{versao}'
+
+    def versao_atual(self):
+        versao = self.backend.get(self._chave_versao())
+        if versao is None:
+            versao = time.time_ns() // 1_000_000
+            # add() não sobrescreve a versão criada por outro worker ao mesmo tempo
+            if not self.backend.add(self._chave_versao(), versao, None):
+                versao = self.backend.get(self._chave_versao(), versao)
+        return versao
+
+    def obter(self):
+        """Retorna a Entrada da versão atual (LRU local -> cache compartilhado -> banco)."""
+        versao = self.versao_atual()
+
+        with self._lock:
+            entrada = self._lru.get(versao)
+            if entrada is not None:
+                self._lru.move_to_end(versao)
+                return entrada
+
+        entrada = self.backend.get(self._chave_entrada(versao))
+        if entrada is None:
+            dados = self.construir()
+            conteudo = json.dumps(dados, sort_keys=True, default=str).encode('utf-8')
+            entrada = Entrada(
+                dados=dados,
+                etag=f'{self.nome}-{versao}-{hashlib.sha1(conteudo).hexdigest()[:16]}',
+                last_modified=versao // 1000,
+            )
+            self.backend.set(self._chave_entrada(versao), entrada, self.timeout)
+
+        with self._lock:
+            self._lru[versao] = entrada
+            self._lru.move_to_end(versao)
+            while len(self._lru) > self.tamanho_lru:
+                self._lru.popitem(last=False)
+        return entrada
+
+    def invalidar(self):
+        """Publica uma nova versão (os demais workers a enxergam na próxima leitura)."""
+        nova = max(time.time_ns() // 1_000_000, (self.backend.get(self._chave_versao()) or 0) + 1)
+        self.backend.set(self._chave_versao(), nova, None)
+        with self._lock:
+            self._lru.clear()
+
+
+def _construir_catalogo():
+    from .api.serializers import ServiceSerializer
+    from .models import Service
+
+    servicos = Service.objects.all().order_by('name')
+    return [dict(item) for item in ServiceSerializer(servicos, many=True).data]
+
+
+catalogo_servicos = CacheVersionado('catalogo_servicos', construir=_construir_catalogo)
@@ -0,0 +1,31 @@
+# app_servicos/checks.py
+
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Backends cujo conteúdo é local a cada processo
+CACHES_POR_PROCESSO = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(deploy=True)
+def verificar_cache_do_catalogo(app_configs, **kwargs):
+    """
+    A versão do catálogo de serviços fica no cache CATALOGO_CACHE_ALIAS. Se ele for
+    local ao processo, a invalidação feita por um worker não chega aos outros, que
+    continuam servindo (e validando com 304) o catálogo antigo. A chave de versão não
+    expira (timeout=None): o catálogo antigo fica até o processo reiniciar ou o backend
+    descartar a chave por falta de espaço, não apenas por alguns minutos.
+    """
+    alias = getattr(settings, 'CATALOGO_CACHE_ALIAS', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND', '')
+    if backend not in CACHES_POR_PROCESSO:
+        return []
+    return [Warning(
+        f"CATALOGO_CACHE_ALIAS ('{alias}') usa {backend.rsplit('.', 1)[-1]}, que é local a cada processo.",
+        hint='Com mais de um worker, aponte CATALOGO_CACHE_ALIAS para um cache compartilhado '
+             '(Redis, Memcached, FileBasedCache ou DatabaseCache).',
+        id='app_servicos.W001',
+    )]
@@ -0,0 +1,55 @@
+# app_servicos/management/commands/recalcular_avaliacoes.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from accounts.models import Profile
+from app_servicos.models import Feedback
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula rating, rating_soma e feedback_count de todos os perfis a partir da tabela '
+        'de feedbacks, em lotes (backfill/correção dos agregados mantidos pelos signals).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Perfis por lote.')
+
+    def handle(self, *args, **options):
+        tamanho_lote = options['lote']
+        total = 0
+        ultimo_id = 0
+
+        while True:
+            perfis = list(
+                Profile.objects.filter(id__gt=ultimo_id).order_by('id')
+                .only('id', 'user_id', 'rating', 'rating_soma', 'feedback_count', 'updated_at')[:tamanho_lote]
+            )
+            if not perfis:
+                break
+            ultimo_id = perfis[-1].id
+            total += self._recalcular_lote(perfis)
+
+        self.stdout.write(self.style.SUCCESS(f'{total} perfis recalculados.'))
+
+    @transaction.atomic
+    def _recalcular_lote(self, perfis):
+        # Uma única agregação (GROUP BY) por lote
+        agregados = {
+            linha['professional_id']: (linha['soma'], linha['quantidade'])
+            for linha in Feedback.objects.filter(professional_id__in=[p.user_id for p in perfis])
+            .values('professional_id')
+            .annotate(soma=Sum('rating'), quantidade=Count('id'))
+        }
+        agora = timezone.now()
+        for perfil in perfis:
+            soma, quantidade = agregados.get(perfil.user_id, (0, 0))
+            perfil.rating_soma = soma
+            perfil.feedback_count = quantidade
+            perfil.rating = round(soma / quantidade, 2) if quantidade else 0
+            perfil.updated_at = agora
+        Profile.objects.bulk_update(perfis, ['rating', 'rating_soma', 'feedback_count', 'updated_at'])
+        return len(perfis)
@@ -0,0 +1,64 @@
+# app_servicos/management/commands/recalcular_contadores_demandas.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from accounts.models import Profile
+from app_servicos.models import CONTADOR_CLIENTE_POR_STATUS, Demanda
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula os contadores de demandas dos perfis (por status para clientes e '
+        'concluídas para profissionais) a partir da tabela de demandas, em lotes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Perfis por lote.')
+
+    def handle(self, *args, **options):
+        campos = ['demandas_concluidas', *CONTADOR_CLIENTE_POR_STATUS.values(), 'updated_at']
+        total = 0
+        ultimo_id = 0
+
+        while True:
+            perfis = list(
+                Profile.objects.filter(id__gt=ultimo_id).order_by('id')
+                .only('id', 'user_id', *campos)[:options['lote']]
+            )
+            if not perfis:
+                break
+            ultimo_id = perfis[-1].id
+            total += self._recalcular_lote(perfis, campos)
+
+        self.stdout.write(self.style.SUCCESS(f'{total} perfis recalculados.'))
+
+    @transaction.atomic
+    def _recalcular_lote(self, perfis, campos):
+        user_ids = [p.user_id for p in perfis]
+
+        por_cliente = {}
+        for linha in (
+            Demanda.objects.filter(client_id__in=user_ids)
+            .values('client_id', 'status').annotate(total=Count('id'))
+        ):
+            por_cliente.setdefault(linha['client_id'], {})[linha['status']] = linha['total']
+
+        concluidas = dict(
+            Demanda.objects.filter(professional_id__in=user_ids, status='concluida')
+            .values('professional_id').annotate(total=Count('id'))
+            .values_list('professional_id', 'total')
+        )
+
+        agora = timezone.now()
+        for perfil in perfis:
+            perfil.updated_at = agora
+            contagem = por_cliente.get(perfil.user_id, {})
+            for status, campo in CONTADOR_CLIENTE_POR_STATUS.items():
+                setattr(perfil, campo, contagem.get(status, 0))
+            perfil.demandas_concluidas = concluidas.get(perfil.user_id, 0)
+
+        Profile.objects.bulk_update(perfis, campos)
+        return len(perfis)
@@ -0,0 +1,112 @@
+# app_servicos/management/commands/verificar_planos_consulta.py
+
+import re
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models.fields import DateField, DateTimeField
+from django.utils import timezone
+
+from accounts.api.views import ProfessionalViewSet
+from accounts.models import User
+from app_servicos.api.views import DemandaViewSet, FeedbackViewSet, OfferViewSet
+from chat.api.views import ConversaViewSet
+
+
+CLIENTE = User(pk=1, email='cliente@vagali.invalid', is_professional=False)
+PROFISSIONAL = User(pk=2, email='pro@vagali.invalid', is_professional=True)
+
+# (descrição, viewset, usuário da requisição)
+CASOS = (
+    ('demandas do cliente', DemandaViewSet, CLIENTE),
+    ('feed de demandas pendentes', DemandaViewSet, PROFISSIONAL),
+    ('ofertas recebidas (cliente)', OfferViewSet, CLIENTE),
+    ('ofertas feitas (profissional)', OfferViewSet, PROFISSIONAL),
+    ('feedbacks do cliente', FeedbackViewSet, CLIENTE),
+    ('profissionais', ProfessionalViewSet, CLIENTE),
+    ('conversas do cliente', ConversaViewSet, CLIENTE),
+    ('conversas do profissional', ConversaViewSet, PROFISSIONAL),
+)
+
+# Padrões de plano ruim por banco: leitura da tabela inteira e ordenação em arquivo temporário
+PROBLEMAS = {
+    'sqlite': (
+        (re.compile(r'\bSCAN (\w+)(?! USING)(?!\w)'), 'full scan'),
+        (re.compile(r'USE TEMP B-TREE'), 'ordenação temporária'),
+    ),
+    'postgresql': (
+        (re.compile(r'Seq Scan on (\w+)'), 'full scan'),
+        (re.compile(r'(?:^|->\s*)Sort\b', re.MULTILINE), 'ordenação temporária'),
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Roda EXPLAIN nas consultas de listagem de cada viewset (primeira página e página '
+        'seguinte pelo cursor) e falha se alguma fizer full scan ou ordenação temporária. '
+        'Não depende de dados: no PostgreSQL desliga o seq scan na transação para verificar '
+        'se existe índice utilizável mesmo com tabelas pequenas.'
+    )
+
+    def handle(self, *args, **options):
+        padroes = PROBLEMAS.get(connection.vendor)
+        if padroes is None:
+            raise CommandError(f'Banco não suportado: {connection.vendor}.')
+
+        falhas = 0
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for descricao, viewset, user in CASOS:
+                for pagina, queryset in self._consultas(viewset, user):
+                    plano = queryset.explain()
+                    problemas = [
+                        f'{motivo} ({match.group(1)})' if match.groups() else motivo
+                        for regex, motivo in padroes for match in regex.finditer(plano)
+                    ]
+                    if problemas:
+                        falhas += 1
+                        self.stdout.write(self.style.ERROR(f'FALHA {descricao} [{pagina}]: {", ".join(problemas)}'))
+                        self.stdout.write(plano)
+                    else:
+                        self.stdout.write(f'ok    {descricao} [{pagina}]')
+
+            transaction.set_rollback(True)
+
+        if falhas:
+            raise CommandError(f'{falhas} consulta(s) sem índice adequado.')
+        self.stdout.write(self.style.SUCCESS('Todas as consultas usam índice (sem full scan nem ordenação temporária).'))
+
+    def _consultas(self, viewset, user):
+        """Reproduz get_queryset + paginação por chave da listagem do viewset."""
+        view = viewset()
+        view.request = SimpleNamespace(user=user, query_params={}, method='GET')
+        view.action = 'list'
+        view.kwargs = {}
+        view.format_kwarg = None
+
+        # Listagens por ramos (ListagemPorRamosMixin): cada ramo é uma consulta separada
+        ramos = view.get_ramos() if hasattr(view, 'get_ramos') else [view.get_queryset()]
+        for indice, queryset in enumerate(ramos, 1):
+            sufixo = f', ramo {indice}' if len(ramos) > 1 else ''
+            paginador = view.pagination_class()
+            paginador.ordering = paginador.get_ordering(queryset)
+            queryset = queryset.order_by(*paginador.ordering)
+            limite = paginador.page_size + 1
+
+            yield f'página 1{sufixo}', queryset[:limite]
+
+            valores = [self._valor_exemplo(queryset.model, campo.lstrip('-')) for campo in paginador.ordering]
+            yield f'cursor{sufixo}', queryset.filter(paginador._filtro_apos(valores))[:limite]
+
+    def _valor_exemplo(self, model, campo):
+        field = model._meta.get_field('id' if campo == 'pk' else campo)
+        if isinstance(field, DateTimeField):
+            return timezone.now()
+        if isinstance(field, DateField):
+            return timezone.localdate()
+        return 1
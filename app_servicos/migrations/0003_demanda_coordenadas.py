@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0002_service_icon'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='demanda',
+            name='geo_celula',
+            field=models.CharField(blank=True, editable=False, max_length=20, null=True, verbose_name='Célula Geográfica'),
+        ),
+        migrations.AddField(
+            model_name='demanda',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Latitude'),
+        ),
+        migrations.AddField(
+            model_name='demanda',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Longitude'),
+        ),
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(fields=['status', 'geo_celula'], name='demanda_status_celula_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0003_demanda_coordenadas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='demanda_status_criacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(fields=['client', '-created_at', '-id'], name='demanda_cliente_criacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['client', '-created_at', '-id'], name='feedback_cliente_criacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['professional', '-created_at', '-id'], name='oferta_prof_criacao_idx'),
+        ),
+    ]
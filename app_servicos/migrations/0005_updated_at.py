@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0004_indices_paginacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='demanda',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def resolver_aceites_duplicados(apps, schema_editor):
+    """
+    Antes do índice único: se alguma demanda tiver mais de uma oferta 'aceita', mantém a
+    do profissional atribuído à demanda (ou a mais antiga) e marca as outras como 'rejeitada'.
+    """
+    Offer = apps.get_model('app_servicos', 'Offer')
+    duplicadas = (
+        Offer.objects.filter(status='aceita').values('demanda_id')
+        .annotate(total=models.Count('id')).filter(total__gt=1).values_list('demanda_id', flat=True)
+    )
+    for demanda_id in list(duplicadas):
+        ofertas = list(Offer.objects.filter(demanda_id=demanda_id, status='aceita').select_related('demanda').order_by('id'))
+        vencedora = next((o for o in ofertas if o.professional_id == o.demanda.professional_id), ofertas[0])
+        Offer.objects.filter(pk__in=[o.pk for o in ofertas if o.pk != vencedora.pk]).update(status='rejeitada')
+
+
+def preencher_oferta_aceita(apps, schema_editor):
+    """
+    Preenche Demanda.accepted_offer a partir da oferta aceita de cada demanda, em um único
+    UPDATE com subconsulta (o índice único garante no máximo uma oferta aceita por demanda).
+    """
+    Demanda = apps.get_model('app_servicos', 'Demanda')
+    Offer = apps.get_model('app_servicos', 'Offer')
+    aceitas = Offer.objects.filter(demanda_id=models.OuterRef('pk'), status='aceita')
+    Demanda.objects.filter(models.Exists(aceitas)).update(
+        accepted_offer_id=models.Subquery(aceitas.values('id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0005_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(resolver_aceites_duplicados, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='demanda',
+            name='accepted_offer',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app_servicos.offer', verbose_name='Oferta Aceita'),
+        ),
+        migrations.AddConstraint(
+            model_name='offer',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'aceita')), fields=('demanda',), name='oferta_aceita_unica_por_demanda'),
+        ),
+        migrations.RunPython(preencher_oferta_aceita, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def preencher_cliente_das_ofertas(apps, schema_editor):
+    """Copia demanda.client_id para as ofertas existentes."""
+    Demanda = apps.get_model('app_servicos', 'Demanda')
+    Offer = apps.get_model('app_servicos', 'Offer')
+    Offer.objects.update(
+        client_id=models.Subquery(Demanda.objects.filter(pk=models.OuterRef('demanda_id')).values('client_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0006_oferta_aceita_unica'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='client',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ofertas_recebidas', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(preencher_cliente_das_ofertas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# NOT NULL de Offer.client separado do preenchimento (0007): no PostgreSQL, o ALTER TABLE
+# na mesma transação do UPDATE falha com "pending trigger events" (FK DEFERRABLE).
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0007_offer_client'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='demanda',
+            name='demanda_status_criacao_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='demanda',
+            name='demanda_status_celula_idx',
+        ),
+        migrations.AlterField(
+            model_name='offer',
+            name='client',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='ofertas_recebidas', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(condition=models.Q(('status', 'pendente')), fields=['-created_at', '-id'], name='demanda_pendente_criacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(condition=models.Q(('status', 'pendente')), fields=['geo_celula'], name='demanda_pendente_celula_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['client', '-created_at', '-id'], name='oferta_cliente_criacao_idx'),
+        ),
+    ]
@@ -1,8 +1,16 @@
 # app_servicos/models.py
 
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from accounts.models import Profile
+from localizacao.geo import aplicar_coordenadas
+
+from .cache import catalogo_servicos
 
 # --- Opções de Status ---
 DEMANDA_STATUS_CHOICES = [
@@ -13,6 +21,15 @@ DEMANDA_STATUS_CHOICES = [
     ('cancelada', 'Cancelada'),
 ]
 
+# Contador do Profile do cliente correspondente a cada status de Demanda
+CONTADOR_CLIENTE_POR_STATUS = {
+    'pendente': 'demandas_criadas_pendentes',
+    'aceita': 'demandas_criadas_aceitas',
+    'em_andamento': 'demandas_criadas_em_andamento',
+    'concluida': 'demandas_criadas_concluidas',
+    'cancelada': 'demandas_criadas_canceladas',
+}
+
 OFFER_STATUS_CHOICES = [
     ('pendente', 'Pendente'),
     ('aceita', 'Aceita'),
@@ -67,21 +84,89 @@ class Demanda(models.Model):
     titulo = models.CharField(_('Título da Demanda'), max_length=255)
     descricao = models.TextField(_('Descrição Detalhada'))
     cep = models.CharField(_('CEP do Serviço'), max_length=8)
+
+    # Coordenadas derivadas do CEP (tabela offline do app 'localizacao') e célula da grade
+    # usada como índice espacial no feed de demandas próximas.
+    latitude = models.FloatField(_('Latitude'), blank=True, null=True, editable=False)
+    longitude = models.FloatField(_('Longitude'), blank=True, null=True, editable=False)
+    geo_celula = models.CharField(_('Célula Geográfica'), max_length=20, blank=True, null=True, editable=False)
     status = models.CharField(
         _('Status'),
         max_length=20,
         choices=DEMANDA_STATUS_CHOICES,
         default='pendente'
     )
+    # Oferta aceita (denormalizada no aceite): o valor vem em um JOIN, sem subquery por linha
+    accepted_offer = models.ForeignKey(
+        'Offer',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name=_('Oferta Aceita'),
+    )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Demanda #{self.id} - {self.titulo} ({self.status})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # CEP como veio do banco (se carregado): o pre_save só geocodifica quando ele muda
+        if 'cep' in instance.__dict__:
+            instance._cep_salvo = instance.cep
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Leitura do estado anterior (pre_save, com a linha travada), UPDATE e ajuste dos
+        # contadores (post_save) na mesma transação: dois saves concorrentes da mesma
+        # demanda não aplicam a mesma transição duas vezes.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def transicao_condicional(self, de_status, para_status, **valores):
+        """
+        Muda o status com UPDATE ... WHERE status = de_status. Retorna False se outra
+        transação já tirou a demanda de 'de_status' (só uma transição concorrente vence,
+        mesmo em bancos sem SELECT ... FOR UPDATE, como o SQLite).
+        Como o UPDATE não dispara signals, ajusta os contadores dos perfis aqui.
+        """
+        atualizadas = Demanda.objects.filter(pk=self.pk, status=de_status).update(
+            status=para_status, updated_at=timezone.now(), **valores
+        )
+        if not atualizadas:
+            return False
+
+        anterior = (de_status, self.client_id, self.professional_id)
+        self.status = para_status
+        for campo, valor in valores.items():
+            setattr(self, campo, valor)
+        atual = (self.status, self.client_id, self.professional_id)
+        if anterior != atual:
+            _ajustar_contadores_demanda(anterior, -1)
+            _ajustar_contadores_demanda(atual, 1)
+        return True
+
     class Meta:
         verbose_name = _('Demanda')
         verbose_name_plural = _('Demandas')
         ordering = ['-created_at']
+        indexes = [
+            # Feed "demandas pendentes perto de mim": célula da grade, só as pendentes
+            models.Index(
+                fields=['geo_celula'], condition=models.Q(status='pendente'), name='demanda_pendente_celula_idx',
+            ),
+            # Paginação por chave (created_at, id): feed do profissional (índice parcial, só as
+            # pendentes - as demais nunca são listadas por status) e lista do cliente
+            models.Index(
+                fields=['-created_at', '-id'], condition=models.Q(status='pendente'),
+                name='demanda_pendente_criacao_idx',
+            ),
+            models.Index(fields=['client', '-created_at', '-id'], name='demanda_cliente_criacao_idx'),
+        ]
 
 
 # --- 3. Offer Model (Proposta do Profissional para a Demanda) ---
@@ -101,6 +186,15 @@ class Offer(models.Model):
         related_name='offers_feitas',
         limit_choices_to={'is_professional': True} 
     )
+
+    # Cliente dono da demanda (copiado de demanda.client no save): a lista "ofertas que
+    # recebi" filtra e ordena por um único índice, sem JOIN com Demanda nem ordenação temporária.
+    client = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='ofertas_recebidas',
+        editable=False,
+    )
     
     proposta_valor = models.DecimalField(_('Valor Proposto'), max_digits=10, decimal_places=2)
     proposta_prazo = models.CharField(_('Prazo Sugerido'), max_length=50) # Ex: "3 dias", "1 semana"
@@ -112,6 +206,7 @@ class Offer(models.Model):
         default='pendente'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Oferta de {self.professional.email} para Demanda #{self.demanda.id}"
@@ -120,6 +215,17 @@ class Offer(models.Model):
         verbose_name = _('Oferta')
         verbose_name_plural = _('Ofertas')
         unique_together = ('demanda', 'professional')
+        constraints = [
+            # No máximo uma oferta aceita por demanda (índice único parcial)
+            models.UniqueConstraint(
+                fields=['demanda'], condition=models.Q(status='aceita'), name='oferta_aceita_unica_por_demanda',
+            ),
+        ]
+        indexes = [
+            # Paginação por chave (created_at, id) das ofertas do profissional e do cliente
+            models.Index(fields=['professional', '-created_at', '-id'], name='oferta_prof_criacao_idx'),
+            models.Index(fields=['client', '-created_at', '-id'], name='oferta_cliente_criacao_idx'),
+        ]
 
 
 # --- 4. Feedback Model (Avaliação de um Serviço) ---
@@ -152,10 +258,139 @@ class Feedback(models.Model):
     rating = models.PositiveSmallIntegerField(_('Avaliação'), choices=[(i, str(i)) for i in range(1, 6)])
     comentario = models.TextField(_('Comentário'), blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Feedback {self.rating} estrelas para {self.professional.email}"
 
+    def save(self, *args, **kwargs):
+        # Nota anterior lida com a linha travada (pre_save) e ajuste do Profile (post_save)
+        # na mesma transação: edições concorrentes não aplicam a diferença sobre o mesmo valor.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = _('Feedback')
-        verbose_name_plural = _('Feedbacks')
\ No newline at end of file
+        verbose_name_plural = _('Feedbacks')
+        indexes = [
+            # Paginação por chave (created_at, id) dos feedbacks do cliente
+            models.Index(fields=['client', '-created_at', '-id'], name='feedback_cliente_criacao_idx'),
+        ]
+
+
+# --- 5. Signals ---
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidar_catalogo_servicos(sender, **kwargs):
+    """Publica uma nova versão do catálogo em cache depois do commit."""
+    transaction.on_commit(catalogo_servicos.invalidar)
+
+_DESCONHECIDO = object()
+
+@receiver(pre_save, sender=Demanda)
+def geocodificar_demanda(sender, instance, update_fields=None, **kwargs):
+    """Preenche as coordenadas da Demanda a partir do CEP (só quando o CEP muda)."""
+    if update_fields is not None and 'cep' not in update_fields:
+        return
+    # Sem o valor salvo conhecido (ex: instância montada à mão), consulta por segurança
+    if not instance._state.adding and getattr(instance, '_cep_salvo', _DESCONHECIDO) == instance.cep:
+        return
+    aplicar_coordenadas(instance)
+
+@receiver(post_save, sender=Demanda)
+def atualizar_cep_salvo_demanda(sender, instance, **kwargs):
+    """Depois do save, o CEP em memória passa a ser o CEP persistido."""
+    if 'cep' in instance.__dict__:
+        instance._cep_salvo = instance.cep
+
+
+def _estado_travado(pk):
+    """(status, client_id, professional_id) gravados no banco, com a linha travada até o commit."""
+    return Demanda.objects.select_for_update().filter(pk=pk).values_list(
+        'status', 'client_id', 'professional_id'
+    ).first()
+
+@receiver(pre_save, sender=Demanda)
+def guardar_estado_anterior_demanda(sender, instance, raw=False, **kwargs):
+    """Guarda status/cliente/profissional atuais para ajustar os contadores no post_save."""
+    instance._estado_anterior = None
+    if instance.pk and not raw:
+        instance._estado_anterior = _estado_travado(instance.pk)
+
+def _ajustar_contadores_demanda(estado, sinal):
+    """Aplica (sinal=+1) ou desfaz (sinal=-1) a contribuição de um estado de Demanda."""
+    status, client_id, professional_id = estado
+    Profile.ajustar_contadores(client_id, **{CONTADOR_CLIENTE_POR_STATUS[status]: sinal})
+    if status == 'concluida':
+        Profile.ajustar_contadores(professional_id, demandas_concluidas=sinal)
+
+@receiver(post_save, sender=Demanda)
+def atualizar_contadores_demanda(sender, instance, raw=False, **kwargs):
+    """Mantém os contadores de demandas dos perfis (cliente e profissional) a cada transição."""
+    if raw:
+        return
+    atual = (instance.status, instance.client_id, instance.professional_id)
+    anterior = getattr(instance, '_estado_anterior', None)
+    if anterior == atual:
+        return
+    if anterior is not None:
+        _ajustar_contadores_demanda(anterior, -1)
+    _ajustar_contadores_demanda(atual, 1)
+
+@receiver(pre_delete, sender=Demanda)
+def guardar_estado_excluido_demanda(sender, instance, **kwargs):
+    """O estado descontado é o do banco (a instância em memória pode estar desatualizada)."""
+    instance._estado_anterior = _estado_travado(instance.pk)
+
+@receiver(post_delete, sender=Demanda)
+def remover_contadores_demanda(sender, instance, **kwargs):
+    """Desconta a demanda excluída dos contadores."""
+    estado = getattr(instance, '_estado_anterior', None)
+    if estado is not None:  # None: já excluída por outra transação
+        _ajustar_contadores_demanda(estado, -1)
+
+
+@receiver(pre_save, sender=Offer)
+def preencher_cliente_oferta(sender, instance, **kwargs):
+    """Copia o cliente da demanda para a oferta (o cliente de uma demanda não muda)."""
+    if instance.client_id is None:
+        instance.client_id = instance.demanda.client_id
+
+
+def _avaliacao_travada(pk):
+    """(professional_id, rating) gravados no banco, com a linha travada até o commit."""
+    return Feedback.objects.select_for_update().filter(pk=pk).values_list('professional_id', 'rating').first()
+
+@receiver(pre_save, sender=Feedback)
+def guardar_avaliacao_anterior(sender, instance, raw=False, **kwargs):
+    """Guarda nota/profissional atuais para calcular a diferença em caso de edição."""
+    instance._avaliacao_anterior = None
+    if instance.pk and not raw:
+        instance._avaliacao_anterior = _avaliacao_travada(instance.pk)
+
+@receiver(post_save, sender=Feedback)
+def atualizar_avaliacao_profissional(sender, instance, created, raw=False, **kwargs):
+    """Mantém rating/rating_soma/feedback_count do Profile do profissional (sem agregar)."""
+    if raw:
+        return
+    anterior = getattr(instance, '_avaliacao_anterior', None)
+    if anterior is None:
+        Profile.registrar_avaliacao(instance.professional_id, instance.rating, 1)
+    elif anterior[0] == instance.professional_id:
+        # Edição da nota: só a diferença, a quantidade não muda
+        Profile.registrar_avaliacao(instance.professional_id, instance.rating - anterior[1], 0)
+    else:
+        Profile.registrar_avaliacao(anterior[0], -anterior[1], -1)
+        Profile.registrar_avaliacao(instance.professional_id, instance.rating, 1)
+
+@receiver(pre_delete, sender=Feedback)
+def guardar_avaliacao_excluida(sender, instance, **kwargs):
+    """A nota descontada é a do banco (a instância em memória pode estar desatualizada)."""
+    instance._avaliacao_anterior = _avaliacao_travada(instance.pk)
+
+@receiver(post_delete, sender=Feedback)
+def remover_avaliacao_profissional(sender, instance, **kwargs):
+    """Desconta a avaliação excluída do Profile do profissional."""
+    avaliacao = getattr(instance, '_avaliacao_anterior', None)
+    if avaliacao is not None:  # None: já excluída por outra transação
+        Profile.registrar_avaliacao(avaliacao[0], -avaliacao[1], -1)
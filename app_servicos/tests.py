@@ -1,3 +1,574 @@
-from django.test import TestCase
+import threading
 
-# Create your tests here.
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from accounts.authentication import token_cache
+from accounts.models import Profile, User
+from app_servicos.models import Service, Demanda, Offer, Feedback
+from vagali_project.pagination import KeysetPagination
+
+
+# Hasher rápido: os testes criam muitos usuários e não medem o custo do PBKDF2
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BaseAPITestCase(TestCase):
+    """ Dados básicos compartilhados: um cliente, um profissional e um serviço. """
+
+    def setUp(self):
+        self.api = APIClient()
+        self.cliente = User.objects.create_user('cliente@vagali.com', 'senha-teste', is_professional=False)
+        self.profissional = User.objects.create_user('pro@vagali.com', 'senha-teste', is_professional=True)
+        self.cliente.profile.full_name = 'Cliente Teste'
+        self.cliente.profile.save()
+        self.profissional.profile.full_name = 'Profissional Teste'
+        self.profissional.profile.save()
+        self.servico = Service.objects.create(name='Eletricista', description='Serviços elétricos', icon='⚡')
+
+    def criar_demandas(self, quantidade, status='pendente', com_oferta_aceita=False):
+        for i in range(quantidade):
+            demanda = Demanda.objects.create(
+                client=self.cliente, service=self.servico, titulo=f'Demanda {i}',
+                descricao='Trocar fiação', cep='24020000', status=status,
+                professional=self.profissional if com_oferta_aceita else None,
+            )
+            if com_oferta_aceita:
+                demanda.accepted_offer = Offer.objects.create(
+                    demanda=demanda, professional=self.profissional,
+                    proposta_valor='150.00', proposta_prazo='2 dias', status='aceita',
+                )
+                demanda.save(update_fields=['accepted_offer'])
+
+    def contar_queries(self, url):
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.api.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(contexto.captured_queries), response
+
+
+class DemandaQueryCountTests(BaseAPITestCase):
+    """ A listagem de demandas deve usar um número fixo de queries, independente do tamanho. """
+
+    def test_listagem_do_cliente_nao_cresce_com_o_numero_de_demandas(self):
+        self.api.force_authenticate(self.cliente)
+
+        self.criar_demandas(22, status='em_andamento', com_oferta_aceita=True)
+        queries_poucas, _ = self.contar_queries('/api/v1/demandas/?page_size=2')
+        queries_muitas, response = self.contar_queries('/api/v1/demandas/?page_size=50')
+
+        self.assertEqual(queries_poucas, queries_muitas)
+        self.assertEqual(len(response.data['results']), 22)
+        self.assertEqual(response.data['results'][0]['accepted_offer_value'], 150.0)
+        self.assertEqual(response.data['results'][0]['client_name'], 'Cliente Teste')
+        self.assertEqual(response.data['results'][0]['professional_name'], 'Profissional Teste')
+        self.assertEqual(response.data['results'][0]['service_icon'], '⚡')
+
+    def test_feed_do_profissional_nao_cresce_com_o_numero_de_demandas(self):
+        self.api.force_authenticate(self.profissional)
+
+        self.criar_demandas(22)
+        queries_poucas, _ = self.contar_queries('/api/v1/demandas/?page_size=2')
+        queries_muitas, response = self.contar_queries('/api/v1/demandas/?page_size=50')
+
+        self.assertEqual(queries_poucas, queries_muitas)
+        self.assertEqual(len(response.data['results']), 22)
+        self.assertIsNone(response.data['results'][0]['professional_name'])
+
+    def test_detalhe_usa_o_valor_anotado(self):
+        self.api.force_authenticate(self.cliente)
+        self.criar_demandas(1, status='concluida', com_oferta_aceita=True)
+        demanda = Demanda.objects.get()
+
+        queries, response = self.contar_queries(f'/api/v1/demandas/{demanda.pk}/')
+
+        self.assertEqual(response.data['accepted_offer_value'], 150.0)
+        self.assertEqual(queries, 1)
+
+
+class OfertaFeedbackQueryCountTests(BaseAPITestCase):
+    """ Ofertas e feedbacks também devem ser listados com um número fixo de queries. """
+
+    def criar_profissionais(self, quantidade, inicio=0):
+        profissionais = []
+        for i in range(inicio, inicio + quantidade):
+            profissional = User.objects.create_user(f'pro{i}@vagali.com', 'senha-teste', is_professional=True)
+            profissional.profile.full_name = f'Profissional {i}'
+            profissional.profile.save()
+            profissionais.append(profissional)
+        return profissionais
+
+    def criar_ofertas(self, quantidade, inicio=0):
+        demanda = Demanda.objects.create(
+            client=self.cliente, service=self.servico, titulo='Demanda com ofertas',
+            descricao='Pintura', cep='24020000',
+        )
+        for profissional in self.criar_profissionais(quantidade, inicio):
+            Offer.objects.create(
+                demanda=demanda, professional=profissional,
+                proposta_valor='99.90', proposta_prazo='1 semana',
+            )
+
+    def criar_feedbacks(self, quantidade, inicio=0):
+        for profissional in self.criar_profissionais(quantidade, inicio):
+            demanda = Demanda.objects.create(
+                client=self.cliente, professional=profissional, service=self.servico,
+                titulo='Demanda concluída', descricao='Pintura', cep='24020000', status='concluida',
+            )
+            Feedback.objects.create(demanda=demanda, client=self.cliente, professional=profissional, rating=5)
+
+    def test_listagem_de_ofertas_do_cliente(self):
+        self.api.force_authenticate(self.cliente)
+
+        self.criar_ofertas(2)
+        queries_poucas, _ = self.contar_queries('/api/v1/ofertas/')
+
+        self.criar_ofertas(15, inicio=2)
+        queries_muitas, response = self.contar_queries('/api/v1/ofertas/')
+
+        self.assertEqual(queries_poucas, queries_muitas)
+        self.assertEqual(len(response.data['results']), 17)
+        self.assertEqual(response.data['results'][0]['demanda_client_name'], 'Cliente Teste')
+        self.assertTrue(response.data['results'][0]['professional_name'].startswith('Profissional '))
+
+    def criar_ofertas_do_profissional(self, quantidade):
+        for i in range(quantidade):
+            demanda = Demanda.objects.create(
+                client=self.cliente, service=self.servico, titulo=f'Demanda {i}',
+                descricao='Reparo', cep='24020000',
+            )
+            Offer.objects.create(
+                demanda=demanda, professional=self.profissional,
+                proposta_valor='50.00', proposta_prazo='1 dia',
+            )
+
+    def test_listagem_de_ofertas_do_profissional(self):
+        self.api.force_authenticate(self.profissional)
+
+        self.criar_ofertas_do_profissional(2)
+        queries_poucas, _ = self.contar_queries('/api/v1/ofertas/')
+
+        self.criar_ofertas_do_profissional(8)
+        queries_muitas, response = self.contar_queries('/api/v1/ofertas/')
+
+        self.assertEqual(queries_poucas, queries_muitas)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(response.data['results'][0]['professional_name'], 'Profissional Teste')
+
+    def test_listagem_de_feedbacks(self):
+        self.api.force_authenticate(self.cliente)
+
+        self.criar_feedbacks(2)
+        queries_poucas, _ = self.contar_queries('/api/v1/feedbacks/')
+
+        self.criar_feedbacks(15, inicio=2)
+        queries_muitas, response = self.contar_queries('/api/v1/feedbacks/')
+
+        self.assertEqual(queries_poucas, queries_muitas)
+        self.assertEqual(len(response.data['results']), 17)
+        self.assertEqual(response.data['results'][0]['client_name'], 'Cliente Teste')
+
+
+class OfertaAceitaUnicaTests(BaseAPITestCase):
+    """ O banco recusa uma segunda oferta aceita na mesma demanda; o aceite preenche accepted_offer. """
+
+    def test_indice_unico_parcial(self):
+        self.criar_demandas(1, status='em_andamento', com_oferta_aceita=True)
+        outro = User.objects.create_user('pro2@vagali.com', 'senha-teste', is_professional=True)
+        oferta = Offer.objects.create(
+            demanda=Demanda.objects.get(), professional=outro, proposta_valor='90.00', proposta_prazo='1 dia',
+        )
+        oferta.status = 'aceita'
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            oferta.save()
+
+    def test_aceite_preenche_a_oferta_aceita(self):
+        self.criar_demandas(1)
+        demanda = Demanda.objects.get()
+        oferta = Offer.objects.create(
+            demanda=demanda, professional=self.profissional, proposta_valor='80.00', proposta_prazo='1 dia',
+        )
+        self.api.force_authenticate(self.cliente)
+        self.assertEqual(self.api.post(f'/api/v1/ofertas/{oferta.pk}/aceitar/').status_code, 200)
+
+        demanda.refresh_from_db()
+        self.assertEqual(demanda.accepted_offer_id, oferta.pk)
+        self.assertEqual(self.api.get(f'/api/v1/demandas/{demanda.pk}/').data['accepted_offer_value'], 80.0)
+
+
+class AvaliacaoAgregadaTests(BaseAPITestCase):
+    """ rating/rating_soma/feedback_count mantidos pelos signals de Feedback, sem agregação. """
+
+    def avaliar(self, rating, profissional=None):
+        profissional = profissional or self.profissional
+        demanda = Demanda.objects.create(
+            client=self.cliente, professional=profissional, service=self.servico,
+            titulo='Demanda concluída', descricao='Pintura', cep='24020000', status='concluida',
+        )
+        return Feedback.objects.create(demanda=demanda, client=self.cliente, professional=profissional, rating=rating)
+
+    def agregados(self, user=None):
+        profile = Profile.objects.get(user=user or self.profissional)
+        return float(profile.rating), profile.rating_soma, profile.feedback_count
+
+    def test_criacao_edicao_e_exclusao(self):
+        feedback = self.avaliar(4)
+        self.avaliar(1)
+        self.assertEqual(self.agregados(), (2.5, 5, 2))
+
+        feedback.rating = 5
+        feedback.save()
+        self.assertEqual(self.agregados(), (3.0, 6, 2))
+
+        outro = User.objects.create_user('outro@vagali.com', 'senha-teste', is_professional=True)
+        feedback.professional = outro
+        feedback.save()
+        self.assertEqual(self.agregados(), (1.0, 1, 1))
+        self.assertEqual(self.agregados(outro), (5.0, 5, 1))
+
+        feedback.delete()
+        self.assertEqual(self.agregados(outro), (0.0, 0, 0))
+
+    def test_edicao_e_exclusao_usam_a_nota_gravada(self):
+        feedback = self.avaliar(4)
+        desatualizado = Feedback.objects.get(pk=feedback.pk)
+        feedback.rating = 2
+        feedback.save()
+
+        desatualizado.rating = 5  # a diferença é calculada sobre o 2 gravado, não sobre o 4 lido
+        desatualizado.save()
+        self.assertEqual(self.agregados(), (5.0, 5, 1))
+
+        feedback.delete()
+        desatualizado.delete()  # a linha já não existe: não desconta de novo
+        self.assertEqual(self.agregados(), (0.0, 0, 0))
+
+    def test_save_de_perfil_desatualizado_nao_desfaz_os_agregados(self):
+        desatualizado = Profile.objects.get(user=self.profissional)
+        self.avaliar(5)
+        desatualizado.full_name = 'Novo Nome'
+        desatualizado.save()
+        self.assertEqual(self.agregados(), (5.0, 5, 1))
+        self.assertEqual(Profile.objects.get(user=self.profissional).full_name, 'Novo Nome')
+
+    def test_patch_depois_de_um_feedback_mantem_os_contadores(self):
+        # O usuário do token fica no cache de autenticação; o Profile não pode ficar junto
+        token_cache.clear()
+        self.api.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.profissional).key}')
+        antes = self.api.get('/api/v1/accounts/perfil/me/')
+        self.avaliar(4)
+
+        response = self.api.get('/api/v1/accounts/perfil/me/', HTTP_IF_NONE_MATCH=antes['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['feedback_count'], 1)
+
+        response = self.api.patch('/api/v1/accounts/perfil/me/', {'profile': {'full_name': 'Novo Nome'}}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['feedback_count'], 1)
+        self.assertEqual(self.agregados(), (4.0, 4, 1))
+        self.assertEqual(Profile.objects.get(user=self.profissional).full_name, 'Novo Nome')
+
+    def test_recalcular_avaliacoes(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        self.avaliar(5)
+        self.avaliar(2)
+        Profile.objects.filter(user=self.profissional).update(rating=1, rating_soma=99, feedback_count=7)
+        call_command('recalcular_avaliacoes', lote=1, stdout=StringIO())
+        self.assertEqual(self.agregados(), (3.5, 7, 2))
+        self.assertEqual(self.agregados(self.cliente), (0.0, 0, 0))
+
+
+class ContadoresDemandaTests(BaseAPITestCase):
+    """ Contadores de demandas dos perfis mantidos pelos signals/transições de Demanda. """
+
+    CAMPOS = ('demandas_criadas_pendentes', 'demandas_criadas_em_andamento', 'demandas_criadas_concluidas',
+              'demandas_criadas_canceladas')
+
+    def contadores(self):
+        cliente = Profile.objects.filter(user=self.cliente).values_list(*self.CAMPOS).get()
+        return cliente, Profile.objects.get(user=self.profissional).demandas_concluidas
+
+    def test_criacao_aceite_conclusao_e_exclusao(self):
+        demanda = Demanda.objects.create(
+            client=self.cliente, service=self.servico, titulo='Fiação', descricao='Trocar fiação', cep='24020000',
+        )
+        Demanda.objects.create(
+            client=self.cliente, service=self.servico, titulo='Tomada', descricao='Instalar', cep='24020000',
+        )
+        self.assertEqual(self.contadores(), ((2, 0, 0, 0), 0))
+
+        oferta = Offer.objects.create(
+            demanda=demanda, professional=self.profissional, proposta_valor='150.00', proposta_prazo='2 dias',
+        )
+        self.api.force_authenticate(self.cliente)
+        self.assertEqual(self.api.post(f'/api/v1/ofertas/{oferta.pk}/aceitar/').status_code, 200)
+        self.assertEqual(self.contadores(), ((1, 1, 0, 0), 0))
+
+        self.api.force_authenticate(self.profissional)
+        self.assertEqual(self.api.post(f'/api/v1/demandas/{demanda.pk}/concluir/').status_code, 200)
+        self.assertEqual(self.contadores(), ((1, 0, 1, 0), 1))
+        # Segunda conclusão (ex: clique duplo) não conta de novo
+        self.assertEqual(self.api.post(f'/api/v1/demandas/{demanda.pk}/concluir/').status_code, 400)
+        self.assertEqual(self.contadores(), ((1, 0, 1, 0), 1))
+
+        demanda.delete()
+        self.assertEqual(self.contadores(), ((1, 0, 0, 0), 0))
+
+    def test_instancias_desatualizadas_usam_o_estado_do_banco(self):
+        demanda = Demanda.objects.create(
+            client=self.cliente, service=self.servico, titulo='Fiação', descricao='Trocar fiação', cep='24020000',
+        )
+        desatualizada = Demanda.objects.get(pk=demanda.pk)
+        perfil_desatualizado = Profile.objects.get(user=self.cliente)
+
+        demanda.status = 'cancelada'
+        demanda.save()
+        perfil_desatualizado.full_name = 'Novo Nome'
+        perfil_desatualizado.save()
+        self.assertEqual(self.contadores(), ((0, 0, 0, 1), 0))
+
+        # A cópia em memória ainda diz 'pendente', mas quem sai do contador é 'cancelada'
+        desatualizada.delete()
+        self.assertEqual(self.contadores(), ((0, 0, 0, 0), 0))
+
+
+class GeocodificacaoDemandaTests(BaseAPITestCase):
+    """ Coordenadas da Demanda recalculadas pelo CEP só quando ele muda. """
+
+    def test_save_sem_mudar_o_cep_nao_consulta_a_tabela_de_ceps(self):
+        from localizacao.geo import celula
+        from localizacao.models import CepCoordenada
+
+        CepCoordenada.objects.create(cep='20040000', latitude=-22.9035, longitude=-43.1780)
+        Demanda.objects.create(
+            client=self.cliente, service=self.servico, titulo='Fiação', descricao='Trocar fiação', cep='24020000',
+        )
+        demanda = Demanda.objects.get()
+        demanda.titulo = 'Fiação nova'
+        with CaptureQueriesContext(connection) as contexto:
+            demanda.save()
+        self.assertFalse(any('localizacao_cepcoordenada' in q['sql'] for q in contexto.captured_queries))
+
+        demanda.cep = '20040000'
+        demanda.save()
+        demanda.titulo = 'Fiação e tomadas'
+        demanda.save()  # o CEP novo passou a ser o salvo: não desfaz as coordenadas
+        self.assertEqual(Demanda.objects.get().geo_celula, celula(-22.9035, -43.1780))
+
+
+class PlanosDeConsultaTests(TestCase):
+    """ As listagens dos viewsets usam índice: sem full scan nem ordenação temporária. """
+
+    def test_verificar_planos_consulta(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        saida = StringIO()
+        call_command('verificar_planos_consulta', stdout=saida)
+        self.assertNotIn('FALHA', saida.getvalue())
+
+
+class KeysetPaginationTests(BaseAPITestCase):
+    """ O cursor (created_at, id) percorre todas as linhas sem repetir nem pular. """
+
+    def test_percorre_todas_as_paginas_mesmo_com_created_at_empatado(self):
+        self.api.force_authenticate(self.profissional)
+        self.criar_demandas(7)
+        # Metade das demandas com o mesmo created_at: o desempate por id tem que funcionar
+        primeira = Demanda.objects.order_by('id').first()
+        Demanda.objects.filter(id__lte=primeira.id + 3).update(created_at=primeira.created_at)
+
+        vistos = []
+        url = '/api/v1/demandas/?page_size=3'
+        while url:
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 3)
+            vistos.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+
+        esperados = list(Demanda.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(vistos, esperados)
+
+    def test_cursor_invalido(self):
+        self.api.force_authenticate(self.profissional)
+        response = self.api.get('/api/v1/demandas/?cursor=nao-e-um-cursor')
+        self.assertEqual(response.status_code, 404)
+
+        # Cursores bem formados, mas adulterados: valores que não convertem para o campo
+        paginacao = KeysetPagination()
+        paginacao.ordering = ('-created_at', '-id')
+        for valores in (
+            ['2024-01-01T00:00:00', 'abc'],
+            ['2024-13-45T00:00:00', 1],
+            [20240101, 1],
+            ['2024-01-01T00:00:00', None],
+        ):
+            with self.subTest(valores=valores):
+                response = self.api.get(f'/api/v1/demandas/?cursor={paginacao.encode_cursor(valores)}')
+                self.assertEqual(response.status_code, 404)
+
+
+class CatalogoServicosCacheTests(TestCase):
+    """ O catálogo público é servido do cache, invalidado por save/delete e responde 304. """
+
+    def setUp(self):
+        self.api = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(name='Pintor', description='Pintura')
+
+    def test_segunda_leitura_nao_consulta_o_banco(self):
+        self.api.get('/api/v1/servicos/')
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.api.get('/api/v1/servicos/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(contexto.captured_queries), 0)
+        self.assertEqual([s['name'] for s in response.data], ['Pintor'])
+
+    def test_etag_devolve_304_e_muda_apos_alteracao(self):
+        etag = self.api.get('/api/v1/servicos/')['ETag']
+        self.assertEqual(self.api.get('/api/v1/servicos/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(name='Eletricista', description='Elétrica')
+
+        response = self.api.get('/api/v1/servicos/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([s['name'] for s in response.data], ['Eletricista', 'Pintor'])
+
+    def test_last_modified(self):
+        last_modified = self.api.get('/api/v1/servicos/')['Last-Modified']
+        response = self.api.get('/api/v1/servicos/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_check_de_deploy_exige_cache_compartilhado(self):
+        from app_servicos.checks import verificar_cache_do_catalogo
+
+        self.assertEqual([m.id for m in verificar_cache_do_catalogo(None)], ['app_servicos.W001'])
+        compartilhado = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/vagali'}
+        with override_settings(CACHES={**settings.CACHES, 'catalogo': compartilhado}, CATALOGO_CACHE_ALIAS='catalogo'):
+            self.assertEqual(verificar_cache_do_catalogo(None), [])
+
+
+class ConditionalGetTests(BaseAPITestCase):
+    """ Listagens e detalhes respondem 304 enquanto nada mudou e 200 depois de uma alteração. """
+
+    def test_lista_de_demandas_304_ate_a_demanda_mudar(self):
+        self.api.force_authenticate(self.cliente)
+        self.criar_demandas(3)
+
+        etag = self.api.get('/api/v1/demandas/')['ETag']
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.api.get('/api/v1/demandas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Só a consulta da página (LIMIT), sem agregação sobre todas as demandas
+        [consulta] = [q['sql'] for q in contexto.captured_queries]
+        self.assertIn('LIMIT', consulta)
+        self.assertNotIn('COUNT(', consulta.upper())
+
+        demanda = Demanda.objects.first()
+        demanda.titulo = 'Título alterado'
+        demanda.save()
+        self.assertEqual(self.api.get('/api/v1/demandas/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_lista_sem_last_modified_muda_quando_uma_linha_sai(self):
+        self.api.force_authenticate(self.cliente)
+        self.criar_demandas(2)
+        response = self.api.get('/api/v1/demandas/')
+        self.assertNotIn('Last-Modified', response)
+
+        # Só If-Modified-Since (sem ETag): a exclusão não muda a maior data das linhas restantes
+        desde = http_date(timezone.now().timestamp() + 60)
+        Demanda.objects.order_by('created_at').first().delete()
+        response = self.api.get('/api/v1/demandas/', HTTP_IF_MODIFIED_SINCE=desde)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_lista_muda_com_dados_exibidos_sem_data_propria(self):
+        self.api.force_authenticate(self.cliente)
+        self.criar_demandas(1)
+
+        etag = self.api.get('/api/v1/demandas/')['ETag']
+        self.servico.icon = '🔌'
+        self.servico.save()
+        response = self.api.get('/api/v1/demandas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['service_icon'], '🔌')
+
+        etag = response['ETag']
+        User.objects.filter(pk=self.cliente.pk).update(email='novo@vagali.com')
+        self.assertEqual(self.api.get('/api/v1/demandas/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detalhe_muda_quando_o_perfil_do_cliente_muda(self):
+        self.api.force_authenticate(self.cliente)
+        self.criar_demandas(1)
+        url = f'/api/v1/demandas/{Demanda.objects.get().pk}/'
+
+        etag = self.api.get(url)['ETag']
+        self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.cliente.profile.full_name = 'Outro Nome'
+        self.cliente.profile.save()
+        response = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['client_name'], 'Outro Nome')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AceiteConcorrenteTests(TransactionTestCase):
+    """ Vários aceites simultâneos da mesma demanda (ofertas diferentes): só um vence. """
+
+    THREADS = 8
+
+    def setUp(self):
+        self.cliente = User.objects.create_user('cliente@vagali.com', 'senha-teste')
+        servico = Service.objects.create(name='Pintor', description='Pintura')
+        self.demanda = Demanda.objects.create(
+            client=self.cliente, service=servico, titulo='Pintar sala', descricao='Sala', cep='24020000',
+        )
+        self.ofertas = [
+            Offer.objects.create(
+                demanda=self.demanda, professional=User.objects.create_user(f'pro{i}@vagali.com', 'senha-teste', is_professional=True),
+                proposta_valor='100.00', proposta_prazo='1 dia',
+            )
+            for i in range(self.THREADS)
+        ]
+
+    def test_apenas_um_aceite_vence(self):
+        barreira = threading.Barrier(self.THREADS)
+        resultados = []
+
+        def aceitar(oferta):
+            api = APIClient()
+            api.force_authenticate(self.cliente)
+            try:
+                barreira.wait()
+                resultados.append(api.post(f'/api/v1/ofertas/{oferta.pk}/aceitar/').status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=aceitar, args=(oferta,)) for oferta in self.ofertas]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(resultados), [200] + [400] * (self.THREADS - 1))
+        self.assertEqual(Offer.objects.filter(demanda=self.demanda, status='aceita').count(), 1)
+        self.assertEqual(Offer.objects.filter(demanda=self.demanda, status='rejeitada').count(), self.THREADS - 1)
+
+        self.demanda.refresh_from_db()
+        vencedora = Offer.objects.get(demanda=self.demanda, status='aceita')
+        self.assertEqual(self.demanda.status, 'em_andamento')
+        self.assertEqual(self.demanda.professional_id, vencedora.professional_id)
+        self.cliente.profile.refresh_from_db()
+        self.assertEqual(self.cliente.profile.demandas_criadas_pendentes, 0)
+        self.assertEqual(self.cliente.profile.demandas_criadas_em_andamento, 1)
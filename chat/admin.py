@@ -0,0 +1,15 @@
+from django.contrib import admin
+
+from .models import Conversa, Mensagem
+
+
+@admin.register(Conversa)
+class ConversaAdmin(admin.ModelAdmin):
+    list_display = ('id', 'demanda', 'client', 'professional', 'updated_at')
+    raw_id_fields = ('demanda', 'client', 'professional')
+
+
+@admin.register(Mensagem)
+class MensagemAdmin(admin.ModelAdmin):
+    list_display = ('id', 'conversa', 'sender', 'created_at')
+    raw_id_fields = ('conversa', 'sender')
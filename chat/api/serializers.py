@@ -0,0 +1,86 @@
+# chat/api/serializers.py
+
+from rest_framework import serializers
+
+from chat.models import Conversa, LeituraConversa, Mensagem
+
+
+# --- Serializer de Conversa ---
+class ConversaSerializer(serializers.ModelSerializer):
+    """
+    Conversa de uma Demanda. Na criação basta informar 'demanda' e 'professional':
+    o cliente vem da própria demanda.
+    """
+    demanda_titulo = serializers.CharField(source='demanda.titulo', read_only=True)
+    client_name = serializers.SerializerMethodField()
+    professional_name = serializers.SerializerMethodField()
+    last_message = serializers.SerializerMethodField()
+    unread_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Conversa
+        fields = (
+            'id',
+            'demanda',
+            'demanda_titulo',
+            'client',
+            'client_name',
+            'professional',
+            'professional_name',
+            'created_at',
+            'updated_at',
+            'last_message',
+            'unread_count',
+        )
+        read_only_fields = ('client', 'created_at', 'updated_at')
+        # A unicidade (demanda, profissional) é tratada na view (devolve a conversa existente)
+        validators = []
+
+    def _nome(self, user):
+        profile = getattr(user, 'profile', None)
+        return profile.full_name if profile and profile.full_name else user.email
+
+    def get_client_name(self, obj):
+        return self._nome(obj.client)
+
+    def get_professional_name(self, obj):
+        return self._nome(obj.professional)
+
+    # Campos denormalizados: a prévia vem do select_related e as não lidas da anotação do viewset
+    def get_last_message(self, obj):
+        mensagem = obj.ultima_mensagem
+        if mensagem is None:
+            return None
+        return {
+            'id': mensagem.id,
+            'sender_id': mensagem.sender_id,
+            'text': mensagem.texto,
+            'timestamp': mensagem.created_at,
+        }
+
+    def get_unread_count(self, obj):
+        return getattr(obj, 'nao_lidas_usuario', None) or 0
+
+
+# --- Serializer de Mensagem (formato usado pelo ChatWrapper.jsx) ---
+class MensagemSerializer(serializers.ModelSerializer):
+    sender_id = serializers.IntegerField(read_only=True)
+    text = serializers.CharField(source='texto')
+    timestamp = serializers.DateTimeField(source='created_at', read_only=True)
+    is_read = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Mensagem
+        fields = ('id', 'conversa', 'sender_id', 'text', 'timestamp', 'is_read')
+
+    def get_is_read(self, obj):
+        """ Lida = o cursor do destinatário já passou desta mensagem. """
+        # {user_id: ultima_lida} da conversa, montado uma vez pela listagem
+        leituras = self.context.get('leituras')
+        if leituras is None:
+            leituras = dict(
+                LeituraConversa.objects.filter(conversa_id=obj.conversa_id).values_list('user_id', 'ultima_lida')
+            )
+        return any(
+            user_id != obj.sender_id and ultima_lida >= obj.id for user_id, ultima_lida in leituras.items()
+        )
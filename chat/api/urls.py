@@ -0,0 +1,14 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from .views import ConversaViewSet, MensagemViewSet
+
+router = DefaultRouter()
+
+# Rotas do chat
+router.register(r'conversas', ConversaViewSet, basename='conversa')
+router.register(r'messages', MensagemViewSet, basename='mensagem')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
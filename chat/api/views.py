@@ -0,0 +1,158 @@
+# chat/api/views.py
+
+from django.db import transaction
+from django.db.models import F, FilteredRelation, Q
+from rest_framework import exceptions, mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from chat.models import Conversa, LeituraConversa, Mensagem
+from vagali_project.pagination import KeysetPagination, ListagemPorRamosMixin
+
+from .serializers import ConversaSerializer, MensagemSerializer
+
+
+class ConversaPagination(KeysetPagination):
+    """ Conversas com mensagem mais recente primeiro (índice participante, -updated_at, -id). """
+    ordering = ('-updated_at', '-id')
+
+
+class MensagemPagination(KeysetPagination):
+    """ Mensagens da mais nova para a mais antiga; o cursor carrega as anteriores. """
+    ordering = ('-id',)
+    page_size = 50
+
+
+def ramos_do_usuario(user):
+    # Pela participação, não pelo papel atual: is_professional pode ser trocado em
+    # /perfil/me/ e as conversas de antes da troca continuam do usuário.
+    # Um ramo por índice (client, ...) e (professional, ...).
+    return [Conversa.objects.filter(client=user), Conversa.objects.filter(professional=user)]
+
+
+def conversas_do_usuario(user):
+    return Conversa.objects.filter(Q(client=user) | Q(professional=user))
+
+
+# --- 1. ViewSet de Conversas ---
+class ConversaViewSet(ListagemPorRamosMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                      mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Lista as conversas do usuário logado e abre (ou reabre) a conversa de uma
+    demanda entre o cliente e um profissional que ofertou nela.
+    """
+    serializer_class = ConversaSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ConversaPagination
+
+    def get_queryset(self):
+        return self._anotar(conversas_do_usuario(self.request.user))
+
+    def get_ramos(self):
+        """
+        Uma consulta por índice (participante, -updated_at, -id): a prévia é a FK
+        'ultima_mensagem' e as não lidas vêm do cursor de leitura do usuário (JOIN pela
+        chave única conversa+usuário), sem COUNT/MAX sobre as mensagens.
+        """
+        return [self._anotar(ramo) for ramo in ramos_do_usuario(self.request.user)]
+
+    def _anotar(self, queryset):
+        user = self.request.user
+        return queryset.annotate(
+            leitura_usuario=FilteredRelation('leituras', condition=Q(leituras__user=user)),
+        ).annotate(
+            nao_lidas_usuario=F('leitura_usuario__nao_lidas'),
+        ).select_related(
+            'demanda', 'client__profile', 'professional__profile', 'ultima_mensagem'
+        ).order_by('-updated_at', '-id')
+
+    def create(self, request, *args, **kwargs):
+        """ Idempotente: se a conversa já existe, devolve a existente (200). """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        demanda = serializer.validated_data['demanda']
+        professional = serializer.validated_data['professional']
+        user = request.user
+
+        if user.pk not in (demanda.client_id, professional.pk):
+            raise exceptions.PermissionDenied("Você só pode abrir conversas das suas demandas ou ofertas.")
+        if not professional.is_professional or not Conversa.pode_conversar(demanda, professional):
+            raise exceptions.PermissionDenied("Este profissional não ofertou nem foi atribuído a esta demanda.")
+
+        with transaction.atomic():
+            conversa, criada = Conversa.objects.get_or_create(
+                demanda=demanda, professional=professional, defaults={'client_id': demanda.client_id},
+            )
+        # Relê pelo queryset da listagem para devolver prévia e não lidas do usuário
+        conversa = self.get_queryset().get(pk=conversa.pk)
+        return Response(
+            self.get_serializer(conversa).data,
+            status=status.HTTP_201_CREATED if criada else status.HTTP_200_OK,
+        )
+
+    # Ação customizada para marcar a conversa como lida
+    @action(detail=True, methods=['post'])
+    def ler(self, request, pk=None):
+        """
+        Avança o cursor de leitura do usuário até a mensagem 'ate' (padrão: a última)
+        e avisa o outro participante pelo WebSocket (confirmação de leitura).
+        """
+        conversa = self.get_object()
+        ate = request.data.get('ate')
+        if ate is not None:
+            try:
+                ate = int(ate)
+            except (TypeError, ValueError):
+                raise exceptions.ValidationError({'ate': 'Informe o id de uma mensagem.'})
+
+        with transaction.atomic():
+            leitura = LeituraConversa.marcar_como_lida(conversa, request.user, ate)
+        return Response(
+            {'conversa': conversa.pk, 'ultima_lida': leitura.ultima_lida, 'unread_count': leitura.nao_lidas},
+            status=status.HTTP_200_OK,
+        )
+
+
+# --- 2. ViewSet de Mensagens ---
+class MensagemViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                      mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Histórico de uma conversa (?conversa=<id>, obrigatório na listagem) e envio de
+    mensagens. As novas mensagens também chegam pelo WebSocket (/ws/chat/).
+    """
+    serializer_class = MensagemSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MensagemPagination
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = Mensagem.objects.filter(Q(conversa__client=user) | Q(conversa__professional=user))
+        if self.action == 'list':
+            conversa_id = self.request.query_params.get('conversa')
+            if not conversa_id or not conversa_id.isdigit():
+                raise exceptions.ValidationError({'conversa': 'Informe o id da conversa.'})
+            # Filtra pela conversa (índice conversa, -id) depois de checar a participação
+            if not conversas_do_usuario(user).filter(pk=conversa_id).exists():
+                raise exceptions.NotFound('Conversa não encontrada.')
+            queryset = Mensagem.objects.filter(conversa_id=conversa_id)
+        return queryset.order_by('-id')
+
+    def get_serializer_context(self):
+        contexto = super().get_serializer_context()
+        if self.action == 'list':
+            # Cursores dos dois participantes, lidos uma vez para calcular 'is_read' da página
+            contexto['leituras'] = dict(LeituraConversa.objects.filter(
+                conversa_id=self.request.query_params.get('conversa'),
+            ).values_list('user_id', 'ultima_lida'))
+        return contexto
+
+    def perform_create(self, serializer):
+        user = self.request.user
+        conversa = serializer.validated_data['conversa']
+        if user.pk not in conversa.participantes():
+            raise exceptions.PermissionDenied("Você não participa desta conversa.")
+
+        # O signal de Mensagem atualiza prévia, não lidas e cursores na mesma transação
+        # e publica no channel layer após o commit
+        with transaction.atomic():
+            serializer.save(sender=user)
@@ -0,0 +1,157 @@
+# chat/layers.py
+
+"""
+Channel layer do chat: entrega eventos (nova mensagem, leitura...) aos WebSockets
+conectados, agrupados por usuário ("usuario.<id>").
+
+- InMemoryChannelLayer (padrão): dicionário de grupos -> filas asyncio no próprio
+  processo. Serve para um único nó (HTTP e WebSocket no mesmo servidor ASGI).
+- PostgresNotifyChannelLayer: fan-out entre processos/nós com LISTEN/NOTIFY do
+  PostgreSQL (psycopg2, já nas dependências). Cada processo mantém uma conexão em
+  LISTEN e repassa os eventos às suas filas locais.
+
+Configuração: CHAT_CHANNEL_LAYER = {'BACKEND': 'chat.layers.InMemoryChannelLayer', ...}
+As demais chaves viram argumentos do construtor (em minúsculas).
+"""
+
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+
+def grupo_do_usuario(user_id):
+    return f'usuario.{user_id}'
+
+
+# --- 1. Em memória (um nó) ---
+class InMemoryChannelLayer:
+    """
+    Cada WebSocket assina o grupo do seu usuário com (event loop, asyncio.Queue).
+    'publicar' pode ser chamado de qualquer thread (views síncronas, on_commit): a
+    entrega é agendada no loop de cada assinante com call_soon_threadsafe.
+    """
+
+    def __init__(self, capacidade=100, **kwargs):
+        # Tamanho máximo da fila por conexão: consumidor lento perde os eventos mais antigos
+        self.capacidade = capacidade
+        self._grupos = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def assinar(self, grupo, loop, fila):
+        with self._lock:
+            self._grupos[grupo].add((loop, fila))
+
+    def cancelar(self, grupo, loop, fila):
+        with self._lock:
+            assinantes = self._grupos.get(grupo)
+            if assinantes is not None:
+                assinantes.discard((loop, fila))
+                if not assinantes:
+                    del self._grupos[grupo]
+
+    def publicar(self, grupos, evento):
+        self._entregar_local(grupos, evento)
+
+    def _entregar_local(self, grupos, evento):
+        for grupo in grupos:
+            with self._lock:
+                assinantes = list(self._grupos.get(grupo, ()))
+            for loop, fila in assinantes:
+                try:
+                    loop.call_soon_threadsafe(self._enfileirar, fila, evento)
+                except RuntimeError:  # loop já encerrado (conexão caiu sem cancelar)
+                    self.cancelar(grupo, loop, fila)
+
+    @staticmethod
+    def _enfileirar(fila, evento):
+        if fila.full():
+            fila.get_nowait()
+        fila.put_nowait(evento)
+
+
+# --- 2. PostgreSQL LISTEN/NOTIFY (vários nós) ---
+class PostgresNotifyChannelLayer(InMemoryChannelLayer):
+    """
+    'publicar' faz NOTIFY (pela conexão do Django; chamado no on_commit, então só
+    eventos de transações confirmadas saem). Uma thread por processo fica em LISTEN
+    e entrega às filas locais - inclusive as do próprio processo.
+    """
+
+    # Limite do payload do NOTIFY é 8000 bytes; acima disso manda só um aviso para recarregar
+    PAYLOAD_MAXIMO = 7500
+
+    def __init__(self, canal='vagali_chat', database='default', **kwargs):
+        super().__init__(**kwargs)
+        self.canal = canal
+        self.database = database
+        self._ouvinte = None
+
+    def assinar(self, grupo, loop, fila):
+        self._iniciar_ouvinte()
+        super().assinar(grupo, loop, fila)
+
+    def publicar(self, grupos, evento):
+        payload = json.dumps({'grupos': grupos, 'evento': evento}, default=str)
+        if len(payload.encode('utf-8')) > self.PAYLOAD_MAXIMO:
+            resumo = {'tipo': evento.get('tipo'), 'conversa': evento.get('conversa'), 'recarregar': True}
+            payload = json.dumps({'grupos': grupos, 'evento': resumo})
+        with connections[self.database].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.canal, payload])
+
+    def _iniciar_ouvinte(self):
+        with self._lock:
+            if self._ouvinte is None or not self._ouvinte.is_alive():
+                self._ouvinte = threading.Thread(target=self._ouvir, name='chat-pg-listen', daemon=True)
+                self._ouvinte.start()
+
+    def _ouvir(self):
+        import psycopg2
+
+        while True:
+            conexao = None
+            try:
+                params = connections[self.database].get_connection_params()
+                conexao = psycopg2.connect(**params)
+                conexao.autocommit = True
+                with conexao.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.canal}"')
+                while True:
+                    if select.select([conexao], [], [], 5) == ([], [], []):
+                        continue
+                    conexao.poll()
+                    while conexao.notifies:
+                        notificacao = conexao.notifies.pop(0)
+                        dados = json.loads(notificacao.payload)
+                        self._entregar_local(dados['grupos'], dados['evento'])
+            except Exception:
+                logger.exception('Conexão LISTEN do chat caiu; reconectando em 1 s.')
+                time.sleep(1)
+            finally:
+                if conexao is not None:
+                    conexao.close()
+
+
+_layer = None
+_layer_lock = threading.Lock()
+
+
+def get_channel_layer():
+    """Instância (por processo) do layer configurado em CHAT_CHANNEL_LAYER."""
+    global _layer
+    if _layer is None:
+        with _layer_lock:
+            if _layer is None:
+                config = dict(getattr(settings, 'CHAT_CHANNEL_LAYER', {}))
+                classe = import_string(config.pop('BACKEND', 'chat.layers.InMemoryChannelLayer'))
+                _layer = classe(**{k.lower(): v for k, v in config.items()})
+    return _layer
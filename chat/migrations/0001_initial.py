@@ -0,0 +1,63 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('app_servicos', '0008_indices_consultas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversas_como_cliente', to=settings.AUTH_USER_MODEL)),
+                ('demanda', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversas', to='app_servicos.demanda')),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversas_como_profissional', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Conversa',
+                'verbose_name_plural': 'Conversas',
+            },
+        ),
+        migrations.CreateModel(
+            name='Mensagem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('texto', models.TextField(verbose_name='Texto')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('conversa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mensagens', to='chat.conversa')),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mensagens_enviadas', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Mensagem',
+                'verbose_name_plural': 'Mensagens',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='conversa',
+            index=models.Index(fields=['client', '-updated_at', '-id'], name='conversa_cliente_recente_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversa',
+            index=models.Index(fields=['professional', '-updated_at', '-id'], name='conversa_prof_recente_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='conversa',
+            constraint=models.UniqueConstraint(fields=('demanda', 'professional'), name='conversa_unica_por_profissional'),
+        ),
+        migrations.AddIndex(
+            model_name='mensagem',
+            index=models.Index(fields=['conversa', '-id'], name='mensagem_conversa_id_idx'),
+        ),
+    ]
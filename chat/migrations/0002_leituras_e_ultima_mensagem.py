@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def preencher_leituras(apps, schema_editor):
+    """
+    Conversas já existentes: prévia = última mensagem, e um cursor por participante
+    começando do zero (todas as mensagens do outro participante contam como não lidas).
+    """
+    Conversa = apps.get_model('chat', 'Conversa')
+    Mensagem = apps.get_model('chat', 'Mensagem')
+    LeituraConversa = apps.get_model('chat', 'LeituraConversa')
+    for conversa in Conversa.objects.iterator():
+        ultima = Mensagem.objects.filter(conversa=conversa).order_by('-id').values_list('id', flat=True).first()
+        Conversa.objects.filter(pk=conversa.pk).update(ultima_mensagem_id=ultima)
+        LeituraConversa.objects.bulk_create([
+            LeituraConversa(
+                conversa=conversa, user_id=user_id,
+                nao_lidas=Mensagem.objects.filter(conversa=conversa).exclude(sender_id=user_id).count(),
+            )
+            for user_id in (conversa.client_id, conversa.professional_id)
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversa',
+            name='ultima_mensagem',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.mensagem'),
+        ),
+        migrations.CreateModel(
+            name='LeituraConversa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ultima_lida', models.PositiveBigIntegerField(default=0)),
+                ('nao_lidas', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('conversa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leituras', to='chat.conversa')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leituras_conversa', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Leitura da conversa',
+                'verbose_name_plural': 'Leituras das conversas',
+                'constraints': [models.UniqueConstraint(fields=('conversa', 'user'), name='leitura_unica_por_participante')],
+            },
+        ),
+        migrations.RunPython(preencher_leituras, migrations.RunPython.noop),
+    ]
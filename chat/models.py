@@ -0,0 +1,182 @@
+# chat/models.py
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from app_servicos.models import Demanda, Offer
+
+from .layers import get_channel_layer, grupo_do_usuario
+
+
+# --- 1. Conversa (Cliente x Profissional sobre uma Demanda) ---
+class Conversa(models.Model):
+    """
+    Conversa entre o cliente de uma Demanda e um profissional que fez oferta nela
+    (ou que foi atribuído a ela). Uma única conversa por (demanda, profissional).
+    """
+    demanda = models.ForeignKey(Demanda, on_delete=models.CASCADE, related_name='conversas')
+    client = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='conversas_como_cliente',
+    )
+    professional = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='conversas_como_profissional',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Atualizado a cada nova mensagem: a lista de conversas é ordenada por ele
+    updated_at = models.DateTimeField(auto_now=True)
+    # Prévia da lista de conversas, gravada junto com cada nova mensagem
+    ultima_mensagem = models.ForeignKey(
+        'Mensagem', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+',
+    )
+
+    def __str__(self):
+        return f"Conversa #{self.id} - Demanda #{self.demanda_id}"
+
+    def participantes(self):
+        return (self.client_id, self.professional_id)
+
+    @staticmethod
+    def pode_conversar(demanda, professional):
+        """O profissional só conversa sobre demandas em que ofertou ou foi atribuído."""
+        return (
+            demanda.professional_id == professional.pk
+            or Offer.objects.filter(demanda=demanda, professional=professional).exists()
+        )
+
+    class Meta:
+        verbose_name = _('Conversa')
+        verbose_name_plural = _('Conversas')
+        constraints = [
+            models.UniqueConstraint(fields=['demanda', 'professional'], name='conversa_unica_por_profissional'),
+        ]
+        indexes = [
+            # Lista de conversas de cada participante, mais recentes primeiro (paginação por chave)
+            models.Index(fields=['client', '-updated_at', '-id'], name='conversa_cliente_recente_idx'),
+            models.Index(fields=['professional', '-updated_at', '-id'], name='conversa_prof_recente_idx'),
+        ]
+
+
+# --- 2. Mensagem ---
+class Mensagem(models.Model):
+    conversa = models.ForeignKey(Conversa, on_delete=models.CASCADE, related_name='mensagens')
+    sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='mensagens_enviadas')
+    texto = models.TextField(_('Texto'))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Mensagem #{self.id} ({self.sender_id} -> conversa #{self.conversa_id})"
+
+    def evento(self):
+        """Payload enviado pelo WebSocket (mesmo formato do MensagemSerializer)."""
+        return {
+            'tipo': 'mensagem',
+            'conversa': self.conversa_id,
+            'mensagem': {
+                'id': self.id,
+                'conversa': self.conversa_id,
+                'sender_id': self.sender_id,
+                'text': self.texto,
+                'timestamp': self.created_at.isoformat(),
+            },
+        }
+
+    class Meta:
+        verbose_name = _('Mensagem')
+        verbose_name_plural = _('Mensagens')
+        indexes = [
+            # "Últimas N mensagens da conversa" (e páginas anteriores): id é crescente no tempo
+            models.Index(fields=['conversa', '-id'], name='mensagem_conversa_id_idx'),
+        ]
+
+
+# --- 3. Leitura (cursor de leitura de cada participante) ---
+class LeituraConversa(models.Model):
+    """
+    Até onde cada participante leu a conversa. 'nao_lidas' é mantido pelos signals
+    (nova mensagem soma 1 para o destinatário; marcar como lida recalcula), então a
+    lista de conversas não precisa contar mensagens.
+    """
+    conversa = models.ForeignKey(Conversa, on_delete=models.CASCADE, related_name='leituras')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='leituras_conversa')
+    # id da última mensagem lida (ids crescem no tempo; 0 = nada lido)
+    ultima_lida = models.PositiveBigIntegerField(default=0)
+    nao_lidas = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Leitura da conversa #{self.conversa_id} por {self.user_id}"
+
+    @classmethod
+    def marcar_como_lida(cls, conversa, user, ate=None):
+        """
+        Avança o cursor de 'user' até a mensagem 'ate' (padrão: a última) e recalcula
+        as não lidas depois dele. Retorna a leitura atualizada.
+        Deve rodar dentro de uma transação: a linha da leitura fica travada, então uma
+        mensagem nova simultânea soma 1 depois do recálculo, e não antes.
+        """
+        leitura = cls.objects.select_for_update().get(conversa=conversa, user=user)
+        ultima = conversa.ultima_mensagem_id or 0
+        ate = ultima if ate is None else min(ate, ultima)
+        if ate <= leitura.ultima_lida:
+            return leitura
+        leitura.ultima_lida = ate
+        # Só as mensagens depois do cursor (índice conversa, -id): não depende do tamanho do histórico
+        leitura.nao_lidas = Mensagem.objects.filter(
+            conversa=conversa, id__gt=ate,
+        ).exclude(sender=user).count()
+        leitura.save(update_fields=['ultima_lida', 'nao_lidas', 'updated_at'])
+
+        evento = {'tipo': 'leitura', 'conversa': conversa.pk, 'user_id': user.pk, 'ultima_lida': ate}
+        grupos = [grupo_do_usuario(user_id) for user_id in conversa.participantes()]
+        transaction.on_commit(lambda: get_channel_layer().publicar(grupos, evento))
+        return leitura
+
+    class Meta:
+        verbose_name = _('Leitura da conversa')
+        verbose_name_plural = _('Leituras das conversas')
+        constraints = [
+            models.UniqueConstraint(fields=['conversa', 'user'], name='leitura_unica_por_participante'),
+        ]
+
+
+# --- 4. Signals ---
+@receiver(post_save, sender=Conversa)
+def criar_leituras_da_conversa(sender, instance, created, raw=False, **kwargs):
+    """ Um cursor de leitura para cada participante, criado junto com a conversa. """
+    if not created or raw:
+        return
+    LeituraConversa.objects.bulk_create([
+        LeituraConversa(conversa=instance, user_id=user_id) for user_id in instance.participantes()
+    ])
+
+
+@receiver(post_save, sender=Mensagem)
+def registrar_nova_mensagem(sender, instance, created, raw=False, **kwargs):
+    """
+    Na mesma transação da mensagem: sobe a conversa na lista, grava a prévia
+    (ultima_mensagem), soma 1 às não lidas do destinatário e avança o cursor do
+    remetente. Depois do commit, envia a mensagem pelo channel layer para os
+    WebSockets dos dois participantes.
+    """
+    if not created or raw:
+        return
+    # Prévia e cursor do remetente só avançam: se uma mensagem mais nova já foi
+    # registrada (commits fora de ordem), eles não voltam para esta.
+    Conversa.objects.filter(
+        Q(ultima_mensagem__isnull=True) | Q(ultima_mensagem__lt=instance.pk), pk=instance.conversa_id,
+    ).update(updated_at=timezone.now(), ultima_mensagem=instance)
+    leituras = LeituraConversa.objects.filter(conversa_id=instance.conversa_id)
+    leituras.exclude(user_id=instance.sender_id).update(nao_lidas=F('nao_lidas') + 1, updated_at=timezone.now())
+    leituras.filter(user_id=instance.sender_id, ultima_lida__lt=instance.pk).update(
+        ultima_lida=instance.pk, nao_lidas=0, updated_at=timezone.now(),
+    )
+
+    conversa = instance.conversa
+    evento = instance.evento()
+    grupos = [grupo_do_usuario(user_id) for user_id in conversa.participantes()]
+    transaction.on_commit(lambda: get_channel_layer().publicar(grupos, evento))
@@ -0,0 +1,229 @@
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from app_servicos.models import Service, Demanda, Offer
+from chat.models import Conversa, LeituraConversa, Mensagem
+from chat.websocket import CODIGO_NAO_AUTENTICADO, ChatWebSocketApp
+
+
+class DadosChatMixin:
+    """ Cliente com uma demanda, um profissional que ofertou nela e um que não ofertou. """
+
+    def setUp(self):
+        self.api = APIClient()
+        self.cliente = User.objects.create_user('cliente@vagali.com', 'senha-teste', is_professional=False)
+        self.profissional = User.objects.create_user('pro@vagali.com', 'senha-teste', is_professional=True)
+        self.outro = User.objects.create_user('outro@vagali.com', 'senha-teste', is_professional=True)
+        servico = Service.objects.create(name='Eletricista', description='Serviços elétricos')
+        self.demanda = Demanda.objects.create(
+            client=self.cliente, service=servico, titulo='Trocar fiação', descricao='Apartamento', cep='24020000',
+        )
+        Offer.objects.create(
+            demanda=self.demanda, professional=self.profissional, proposta_valor='150.00', proposta_prazo='2 dias',
+        )
+
+    def criar_conversa(self):
+        return Conversa.objects.create(demanda=self.demanda, client=self.cliente, professional=self.profissional)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ChatAPITests(DadosChatMixin, TestCase):
+
+    def test_abrir_conversa_e_idempotente(self):
+        self.api.force_authenticate(self.cliente)
+        dados = {'demanda': self.demanda.pk, 'professional': self.profissional.pk}
+        primeira = self.api.post('/api/v1/chat/conversas/', dados)
+        segunda = self.api.post('/api/v1/chat/conversas/', dados)
+        self.assertEqual(primeira.status_code, 201)
+        self.assertEqual(segunda.status_code, 200)
+        self.assertEqual(primeira.data['id'], segunda.data['id'])
+        self.assertEqual(primeira.data['client'], self.cliente.pk)
+
+    def test_profissional_sem_oferta_nao_abre_conversa(self):
+        self.api.force_authenticate(self.outro)
+        response = self.api.post('/api/v1/chat/conversas/', {'demanda': self.demanda.pk, 'professional': self.outro.pk})
+        self.assertEqual(response.status_code, 403)
+
+    def test_enviar_e_listar_mensagens(self):
+        conversa = self.criar_conversa()
+        self.api.force_authenticate(self.profissional)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post('/api/v1/chat/messages/', {'conversa': conversa.pk, 'text': 'Olá!'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['sender_id'], self.profissional.pk)
+
+        self.api.force_authenticate(self.cliente)
+        response = self.api.get(f'/api/v1/chat/messages/?conversa={conversa.pk}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([m['text'] for m in response.data['results']], ['Olá!'])
+
+    def test_quem_nao_participa_nao_le_nem_envia(self):
+        conversa = self.criar_conversa()
+        self.api.force_authenticate(self.outro)
+        self.assertEqual(self.api.get(f'/api/v1/chat/messages/?conversa={conversa.pk}').status_code, 404)
+        response = self.api.post('/api/v1/chat/messages/', {'conversa': conversa.pk, 'text': 'Oi'})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Mensagem.objects.exists())
+
+    def test_trocar_de_papel_nao_esconde_as_conversas(self):
+        conversa = self.criar_conversa()
+        Mensagem.objects.create(conversa=conversa, sender=self.profissional, texto='Olá!')
+        self.cliente.is_professional = True
+        self.cliente.save(update_fields=['is_professional'])
+
+        self.api.force_authenticate(self.cliente)
+        response = self.api.get('/api/v1/chat/conversas/')
+        self.assertEqual([c['id'] for c in response.data['results']], [conversa.pk])
+        response = self.api.get(f'/api/v1/chat/messages/?conversa={conversa.pk}')
+        self.assertEqual([m['text'] for m in response.data['results']], ['Olá!'])
+
+        # Agora também como profissional: as duas conversas intercaladas, página a página
+        outra_demanda = Demanda.objects.create(
+            client=self.outro, service=self.demanda.service, titulo='Pintura', descricao='Sala', cep='24020000',
+        )
+        nova = Conversa.objects.create(demanda=outra_demanda, client=self.outro, professional=self.cliente)
+        primeira = self.api.get('/api/v1/chat/conversas/?page_size=1')
+        segunda = self.api.get(primeira.data['next'])
+        self.assertEqual([c['id'] for c in primeira.data['results'] + segunda.data['results']], [nova.pk, conversa.pk])
+        self.assertIsNone(segunda.data['next'])
+
+    def test_nova_mensagem_sobe_a_conversa_na_lista(self):
+        antiga = self.criar_conversa()
+        outra_demanda = Demanda.objects.create(
+            client=self.cliente, service=self.demanda.service, titulo='Pintura', descricao='Sala', cep='24020000',
+        )
+        Offer.objects.create(demanda=outra_demanda, professional=self.profissional, proposta_valor='90.00', proposta_prazo='1 dia')
+        Conversa.objects.create(demanda=outra_demanda, client=self.cliente, professional=self.profissional)
+
+        Mensagem.objects.create(conversa=antiga, sender=self.cliente, texto='Ainda está disponível?')
+        self.api.force_authenticate(self.profissional)
+        response = self.api.get('/api/v1/chat/conversas/')
+        self.assertEqual(response.data['results'][0]['id'], antiga.pk)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LeituraTests(DadosChatMixin, TestCase):
+    """ Prévia e não lidas denormalizadas, atualizadas junto com cada mensagem. """
+
+    def enviar(self, conversa, sender, texto):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Mensagem.objects.create(conversa=conversa, sender=sender, texto=texto)
+
+    def test_nova_mensagem_atualiza_previa_e_nao_lidas(self):
+        conversa = self.criar_conversa()
+        self.enviar(conversa, self.cliente, 'Oi')
+        ultima = self.enviar(conversa, self.cliente, 'Está disponível?')
+
+        self.api.force_authenticate(self.profissional)
+        item = self.api.get('/api/v1/chat/conversas/').data['results'][0]
+        self.assertEqual(item['unread_count'], 2)
+        self.assertEqual(item['last_message']['id'], ultima.pk)
+        self.assertEqual(item['last_message']['text'], 'Está disponível?')
+
+        # Quem envia não tem não lidas e o cursor avança até a própria mensagem
+        leitura_cliente = LeituraConversa.objects.get(conversa=conversa, user=self.cliente)
+        self.assertEqual((leitura_cliente.nao_lidas, leitura_cliente.ultima_lida), (0, ultima.pk))
+
+    def test_mensagem_registrada_fora_de_ordem_nao_volta_a_previa(self):
+        from chat.models import registrar_nova_mensagem
+
+        conversa = self.criar_conversa()
+        anterior = self.enviar(conversa, self.cliente, 'Oi')
+        ultima = self.enviar(conversa, self.cliente, 'Está disponível?')
+        # A mensagem mais antiga chega ao signal depois da mais nova (commits fora de ordem)
+        with self.captureOnCommitCallbacks(execute=True):
+            registrar_nova_mensagem(Mensagem, anterior, created=True)
+
+        conversa.refresh_from_db()
+        self.assertEqual(conversa.ultima_mensagem_id, ultima.pk)
+        self.assertEqual(LeituraConversa.objects.get(conversa=conversa, user=self.cliente).ultima_lida, ultima.pk)
+
+    def test_marcar_como_lida(self):
+        conversa = self.criar_conversa()
+        primeira = self.enviar(conversa, self.cliente, 'Oi')
+        self.enviar(conversa, self.cliente, 'Tudo bem?')
+
+        self.api.force_authenticate(self.profissional)
+        response = self.api.post(f'/api/v1/chat/conversas/{conversa.pk}/ler/', {'ate': primeira.pk})
+        self.assertEqual(response.data['unread_count'], 1)
+        response = self.api.post(f'/api/v1/chat/conversas/{conversa.pk}/ler/')
+        self.assertEqual(response.data['unread_count'], 0)
+
+        # Para o cliente, as mensagens enviadas aparecem como lidas pelo profissional
+        self.api.force_authenticate(self.cliente)
+        mensagens = self.api.get(f'/api/v1/chat/messages/?conversa={conversa.pk}').data['results']
+        self.assertEqual([m['is_read'] for m in mensagens], [True, True])
+
+    def test_lista_de_conversas_nao_cresce_com_o_historico(self):
+        conversa = self.criar_conversa()
+        self.api.force_authenticate(self.profissional)
+        self.enviar(conversa, self.cliente, 'Oi')
+        with CaptureQueriesContext(connection) as poucas:
+            self.api.get('/api/v1/chat/conversas/')
+        for i in range(30):
+            self.enviar(conversa, self.cliente, f'Mensagem {i}')
+        with CaptureQueriesContext(connection) as muitas:
+            response = self.api.get('/api/v1/chat/conversas/')
+        self.assertEqual(len(poucas.captured_queries), len(muitas.captured_queries))
+        # Uma consulta por ramo (conversas como cliente e como profissional), sem COUNT
+        self.assertEqual(len(muitas.captured_queries), 2)
+        self.assertFalse(any('COUNT(' in q['sql'] for q in muitas.captured_queries))
+        self.assertEqual(response.data['results'][0]['unread_count'], 31)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ChatWebSocketTests(DadosChatMixin, TransactionTestCase):
+    """
+    Conduz o ChatWebSocketApp pelo protocolo ASGI com filas no lugar do servidor.
+    TransactionTestCase: o socket fecha conexões antigas do banco, como um servidor real.
+    """
+
+    def conectar(self, token, acao):
+        async def executar():
+            entrada, saida = asyncio.Queue(), asyncio.Queue()
+            scope = {'type': 'websocket', 'path': '/ws/chat/', 'query_string': f'token={token}'.encode()}
+            await entrada.put({'type': 'websocket.connect'})
+            tarefa = asyncio.ensure_future(ChatWebSocketApp()(scope, entrada.get, saida.put))
+            try:
+                return await acao(entrada, saida)
+            finally:
+                await entrada.put({'type': 'websocket.disconnect', 'code': 1000})
+                await asyncio.wait_for(tarefa, timeout=5)
+
+        return async_to_sync(executar)()
+
+    def test_token_invalido_fecha_com_4401(self):
+        async def acao(entrada, saida):
+            return await asyncio.wait_for(saida.get(), timeout=5)
+
+        evento = self.conectar('token-invalido', acao)
+        self.assertEqual(evento, {'type': 'websocket.close', 'code': CODIGO_NAO_AUTENTICADO})
+
+    def test_nova_mensagem_chega_pelo_socket(self):
+        conversa = self.criar_conversa()
+        token = Token.objects.create(user=self.cliente)
+
+        def enviar():
+            Mensagem.objects.create(conversa=conversa, sender=self.profissional, texto='Posso ir amanhã.')
+
+        async def acao(entrada, saida):
+            self.assertEqual(await asyncio.wait_for(saida.get(), timeout=5), {'type': 'websocket.accept'})
+            await entrada.put({'type': 'websocket.receive', 'text': json.dumps({'tipo': 'ping'})})
+            pong = await asyncio.wait_for(saida.get(), timeout=5)
+            await sync_to_async(enviar)()
+            evento = await asyncio.wait_for(saida.get(), timeout=5)
+            return json.loads(pong['text']), json.loads(evento['text'])
+
+        pong, evento = self.conectar(token.key, acao)
+        self.assertEqual(pong, {'tipo': 'pong'})
+        self.assertEqual(evento['tipo'], 'mensagem')
+        self.assertEqual(evento['mensagem']['text'], 'Posso ir amanhã.')
+        self.assertEqual(evento['mensagem']['sender_id'], self.profissional.pk)
@@ -0,0 +1,108 @@
+# chat/websocket.py
+
+"""
+Endpoint WebSocket do chat (ASGI puro, sem Django Channels): ws[s]://<host>/ws/chat/?token=<token>
+
+- Autentica pelo mesmo token da API (Token do DRF ou access JWT), passado na query
+  string porque o WebSocket do navegador não envia cabeçalho Authorization. Token
+  inválido: a conexão é fechada com o código 4401.
+- Cada conexão assina o grupo do seu usuário no channel layer e recebe, como JSON,
+  os eventos publicados (ex: {'tipo': 'mensagem', 'conversa': 1, 'mensagem': {...}}).
+- O envio de mensagens continua pelo POST /api/v1/chat/messages/ (validação e
+  permissões da API); pelo socket o cliente só manda {"tipo": "ping"} (resposta: pong).
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from accounts.authentication import CachedJWTAuthentication, CachedTokenAuthentication
+
+from .layers import get_channel_layer, grupo_do_usuario
+
+
+CODIGO_NAO_AUTENTICADO = 4401
+
+
+def autenticar_token(token):
+    """Usuário dono do token (Token do DRF ou access JWT) ou None. Usa o cache de autenticação."""
+    close_old_connections()
+    try:
+        if token.count('.') == 2:  # header.payload.assinatura
+            jwt = CachedJWTAuthentication()
+            user = jwt.get_user(jwt.get_validated_token(token.encode()))
+        else:
+            user, _ = CachedTokenAuthentication().authenticate_credentials(token)
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+    finally:
+        close_old_connections()
+    return user if user.is_active else None
+
+
+class ChatWebSocketApp:
+    """ Aplicação ASGI para conexões websocket do chat (ver vagali_project/asgi.py). """
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'websocket':
+            raise ValueError('ChatWebSocketApp só atende conexões websocket.')
+
+        mensagem = await receive()
+        if mensagem['type'] != 'websocket.connect':
+            return
+
+        parametros = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        token = (parametros.get('token') or [''])[0]
+        user = await sync_to_async(autenticar_token)(token) if token else None
+        if user is None:
+            await send({'type': 'websocket.close', 'code': CODIGO_NAO_AUTENTICADO})
+            return
+
+        layer = get_channel_layer()
+        grupo = grupo_do_usuario(user.pk)
+        loop = asyncio.get_running_loop()
+        fila = asyncio.Queue(maxsize=layer.capacidade)
+
+        await send({'type': 'websocket.accept'})
+        layer.assinar(grupo, loop, fila)
+        try:
+            await self._conversar(receive, send, fila)
+        finally:
+            layer.cancelar(grupo, loop, fila)
+
+    async def _conversar(self, receive, send, fila):
+        """Repassa os eventos da fila ao socket até o cliente desconectar."""
+        recebendo = asyncio.ensure_future(receive())
+        aguardando_evento = asyncio.ensure_future(fila.get())
+        try:
+            while True:
+                prontos, _ = await asyncio.wait(
+                    {recebendo, aguardando_evento}, return_when=asyncio.FIRST_COMPLETED,
+                )
+                if aguardando_evento in prontos:
+                    await send({'type': 'websocket.send', 'text': json.dumps(aguardando_evento.result())})
+                    aguardando_evento = asyncio.ensure_future(fila.get())
+
+                if recebendo in prontos:
+                    mensagem = recebendo.result()
+                    if mensagem['type'] == 'websocket.disconnect':
+                        return
+                    if mensagem['type'] == 'websocket.receive':
+                        await self._responder(send, mensagem)
+                    recebendo = asyncio.ensure_future(receive())
+        finally:
+            recebendo.cancel()
+            aguardando_evento.cancel()
+
+    async def _responder(self, send, mensagem):
+        try:
+            dados = json.loads(mensagem.get('text') or '{}')
+        except ValueError:
+            dados = {}
+        if isinstance(dados, dict) and dados.get('tipo') == 'ping':
+            await send({'type': 'websocket.send', 'text': json.dumps({'tipo': 'pong'})})
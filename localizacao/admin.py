@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from .models import CepCoordenada
+
+
+@admin.register(CepCoordenada)
+class CepCoordenadaAdmin(admin.ModelAdmin):
+    list_display = ('cep', 'cidade', 'estado', 'latitude', 'longitude')
+    search_fields = ('cep', 'cidade')
@@ -0,0 +1,49 @@
+# localizacao/filters.py
+
+from rest_framework import exceptions
+from rest_framework.filters import BaseFilterBackend
+
+from .geo import RAIO_MAXIMO_KM, coordenadas_do_cep, filtrar_por_raio
+
+
+class ProximidadeFilter(BaseFilterBackend):
+    """
+    Filtro "dentro de N km" baseado na grade geográfica.
+    Uso: ?raio_km=10&cep=24020000
+    - Sem 'raio_km', o queryset não é alterado.
+    - Sem 'cep', usa o ponto retornado por 'ponto_padrao' (ex: o CEP do próprio usuário).
+    Subclasses definem 'prefixo' (caminho até as colunas geográficas).
+    """
+    prefixo = ''
+
+    def ponto_padrao(self, request):
+        return None
+
+    def filter_queryset(self, request, queryset, view):
+        raio = request.query_params.get('raio_km')
+        if not raio:
+            return queryset
+
+        try:
+            raio_km = float(raio)
+        except ValueError:
+            raise exceptions.ValidationError({'raio_km': 'Informe um número de quilômetros.'})
+        if not 0 < raio_km <= RAIO_MAXIMO_KM:
+            raise exceptions.ValidationError({'raio_km': f'O raio deve estar entre 0 e {RAIO_MAXIMO_KM} km.'})
+
+        cep = request.query_params.get('cep')
+        ponto = coordenadas_do_cep(cep) if cep else self.ponto_padrao(request)
+        if ponto is None:
+            raise exceptions.ValidationError({'cep': 'Não foi possível localizar o CEP de referência.'})
+
+        return filtrar_por_raio(queryset, ponto[0], ponto[1], raio_km, prefixo=self.prefixo)
+
+
+class PerfilDoUsuarioProximidadeFilter(ProximidadeFilter):
+    """ Usa as coordenadas do Profile do usuário logado como ponto padrão. """
+
+    def ponto_padrao(self, request):
+        profile = getattr(request.user, 'profile', None) if request.user.is_authenticated else None
+        if profile is not None and profile.latitude is not None:
+            return profile.latitude, profile.longitude
+        return None
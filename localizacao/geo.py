@@ -0,0 +1,97 @@
+# localizacao/geo.py
+
+"""
+Índice espacial simples por grade (grid buckets).
+
+Cada coordenada cai em uma célula de TAMANHO_CELULA graus ("-229:-432"), gravada em
+uma coluna indexada ('geo_celula'). Uma busca "dentro de N km" vira:
+1. um filtro indexado ``geo_celula IN (...)`` com as células que cobrem o raio;
+2. um refinamento pela distância exata (haversine) só sobre as linhas dessas células.
+"""
+
+import math
+
+from django.db.models import F, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+from .models import CepCoordenada
+
+
+RAIO_TERRA_KM = 6371.0
+TAMANHO_CELULA = 0.1      # graus (~11 km de latitude)
+KM_POR_GRAU_LAT = 111.32
+RAIO_MAXIMO_KM = 100
+
+
+# --- 1. CEP e Células ---
+def normalizar_cep(cep):
+    """Mantém apenas os dígitos ("24.020-000" -> "24020000")."""
+    digitos = ''.join(c for c in str(cep or '') if c.isdigit())
+    return digitos if len(digitos) == 8 else None
+
+
+def coordenadas_do_cep(cep):
+    """Retorna (latitude, longitude) do CEP ou None se não estiver na tabela offline."""
+    cep = normalizar_cep(cep)
+    if not cep:
+        return None
+    coordenada = CepCoordenada.objects.filter(pk=cep).values_list('latitude', 'longitude').first()
+    return tuple(coordenada) if coordenada else None
+
+
+def _indice(grau):
+    return math.floor(grau / TAMANHO_CELULA)
+
+
+def celula(latitude, longitude):
+    """Chave da célula da grade que contém o ponto."""
+    return f'{_indice(latitude)}:{_indice(longitude)}'
+
+
+def celulas_no_raio(latitude, longitude, raio_km):
+    """Todas as células que cobrem o quadrado envolvente do círculo de raio 'raio_km'."""
+    delta_lat = raio_km / KM_POR_GRAU_LAT
+    delta_lon = raio_km / (KM_POR_GRAU_LAT * max(math.cos(math.radians(latitude)), 0.01))
+    return [
+        f'{i}:{j}'
+        for i in range(_indice(latitude - delta_lat), _indice(latitude + delta_lat) + 1)
+        for j in range(_indice(longitude - delta_lon), _indice(longitude + delta_lon) + 1)
+    ]
+
+
+# --- 2. Sincronização dos Modelos ---
+def aplicar_coordenadas(instance):
+    """
+    Preenche latitude/longitude/geo_celula a partir do 'cep' da instância
+    (Demanda ou Profile). Chamado pelos signals pre_save de cada modelo.
+    """
+    coordenadas = coordenadas_do_cep(instance.cep)
+    if coordenadas:
+        instance.latitude, instance.longitude = coordenadas
+        instance.geo_celula = celula(*coordenadas)
+    else:
+        instance.latitude = instance.longitude = instance.geo_celula = None
+
+
+# --- 3. Consulta por Raio ---
+def distancia_km(latitude, longitude, prefixo=''):
+    """Expressão (haversine) com a distância em km até o ponto informado."""
+    lat = Radians(F(f'{prefixo}latitude'))
+    lon = Radians(F(f'{prefixo}longitude'))
+    lat0 = Value(math.radians(latitude))
+    lon0 = Value(math.radians(longitude))
+    a = Power(Sin((lat - lat0) / 2), 2) + Cos(lat0) * Cos(lat) * Power(Sin((lon - lon0) / 2), 2)
+    return Value(2 * RAIO_TERRA_KM) * ASin(Sqrt(Least(a, Value(1.0))))
+
+
+def filtrar_por_raio(queryset, latitude, longitude, raio_km, prefixo=''):
+    """
+    Restringe o queryset aos registros a até 'raio_km' do ponto e anota 'distancia_km'.
+    'prefixo' aponta para o modelo que tem as colunas geográficas (ex: 'profile__').
+    """
+    raio_km = min(float(raio_km), RAIO_MAXIMO_KM)
+    celulas = celulas_no_raio(latitude, longitude, raio_km)
+    return queryset.filter(**{f'{prefixo}geo_celula__in': celulas}).annotate(
+        distancia_km=distancia_km(latitude, longitude, prefixo)
+    ).filter(distancia_km__lte=raio_km)
+
@@ -0,0 +1,70 @@
+# localizacao/management/commands/importar_ceps.py
+
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from localizacao.geo import normalizar_cep
+from localizacao.models import CepCoordenada
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa a tabela offline de coordenadas de CEP a partir de um CSV local '
+        '(colunas: cep, latitude, longitude e, opcionalmente, cidade, estado).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do arquivo CSV.')
+        parser.add_argument('--delimitador', default=',', help='Delimitador do CSV (padrão: ",").')
+        parser.add_argument('--lote', type=int, default=5000, help='Tamanho do lote de gravação.')
+
+    def handle(self, *args, **options):
+        try:
+            arquivo = open(options['arquivo'], newline='', encoding='utf-8-sig')
+        except OSError as e:
+            raise CommandError(f'Não foi possível abrir o arquivo: {e}')
+
+        importados = ignorados = 0
+        lote = []
+        with arquivo:
+            for linha in csv.DictReader(arquivo, delimiter=options['delimitador']):
+                coordenada = self._converter(linha)
+                if coordenada is None:
+                    ignorados += 1
+                    continue
+                lote.append(coordenada)
+                if len(lote) >= options['lote']:
+                    importados += self._gravar(lote)
+                    lote = []
+            importados += self._gravar(lote)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{importados} CEPs importados ({ignorados} linhas ignoradas). '
+            'Rode "recalcular_coordenadas" para atualizar demandas e perfis existentes.'
+        ))
+
+    def _converter(self, linha):
+        cep = normalizar_cep(linha.get('cep'))
+        try:
+            latitude = float(linha.get('latitude', '').replace(',', '.'))
+            longitude = float(linha.get('longitude', '').replace(',', '.'))
+        except (AttributeError, ValueError):
+            return None
+        if not cep or not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return None
+        return CepCoordenada(
+            cep=cep, latitude=latitude, longitude=longitude,
+            cidade=(linha.get('cidade') or '')[:100], estado=(linha.get('estado') or '')[:2].upper(),
+        )
+
+    def _gravar(self, lote):
+        if not lote:
+            return 0
+        CepCoordenada.objects.bulk_create(
+            lote,
+            update_conflicts=True,
+            unique_fields=['cep'],
+            update_fields=['latitude', 'longitude', 'cidade', 'estado'],
+        )
+        return len(lote)
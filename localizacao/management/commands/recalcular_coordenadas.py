@@ -0,0 +1,46 @@
+# localizacao/management/commands/recalcular_coordenadas.py
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import Profile
+from app_servicos.models import Demanda
+from localizacao.geo import celula, normalizar_cep
+from localizacao.models import CepCoordenada
+
+
+class Command(BaseCommand):
+    help = 'Recalcula latitude/longitude/geo_celula de demandas e perfis a partir da tabela de CEPs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Tamanho do lote de gravação.')
+
+    def handle(self, *args, **options):
+        for model in (Demanda, Profile):
+            total = self._recalcular(model, options['lote'])
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {total} registros atualizados.')
+        self.stdout.write(self.style.SUCCESS('Coordenadas recalculadas.'))
+
+    def _recalcular(self, model, tamanho_lote):
+        total = 0
+        lote = []
+        campos = ['latitude', 'longitude', 'geo_celula']
+        for instance in model.objects.only('pk', 'cep', *campos).iterator(chunk_size=tamanho_lote):
+            lote.append(instance)
+            if len(lote) >= tamanho_lote:
+                total += self._gravar(model, lote, campos)
+                lote = []
+        return total + self._gravar(model, lote, campos)
+
+    def _gravar(self, model, lote, campos):
+        # Uma consulta por lote para buscar as coordenadas de todos os CEPs envolvidos
+        ceps = {normalizar_cep(i.cep) for i in lote} - {None}
+        coordenadas = dict(
+            (cep, (lat, lon))
+            for cep, lat, lon in CepCoordenada.objects.filter(pk__in=ceps).values_list('cep', 'latitude', 'longitude')
+        )
+        for instance in lote:
+            ponto = coordenadas.get(normalizar_cep(instance.cep))
+            instance.latitude, instance.longitude = ponto if ponto else (None, None)
+            instance.geo_celula = celula(*ponto) if ponto else None
+        model.objects.bulk_update(lote, campos)
+        return len(lote)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CepCoordenada',
+            fields=[
+                ('cep', models.CharField(max_length=8, primary_key=True, serialize=False, verbose_name='CEP')),
+                ('latitude', models.FloatField(verbose_name='Latitude')),
+                ('longitude', models.FloatField(verbose_name='Longitude')),
+                ('cidade', models.CharField(blank=True, default='', max_length=100, verbose_name='Cidade')),
+                ('estado', models.CharField(blank=True, default='', max_length=2, verbose_name='Estado (UF)')),
+            ],
+            options={
+                'verbose_name': 'Coordenada de CEP',
+                'verbose_name_plural': 'Coordenadas de CEP',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# localizacao/models.py
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+# --- 1. CepCoordenada Model (Tabela offline CEP -> latitude/longitude) ---
+class CepCoordenada(models.Model):
+    """ Coordenadas aproximadas de um CEP, importadas de um CSV local (comando importar_ceps). """
+    cep = models.CharField(_('CEP'), max_length=8, primary_key=True)
+    latitude = models.FloatField(_('Latitude'))
+    longitude = models.FloatField(_('Longitude'))
+    cidade = models.CharField(_('Cidade'), max_length=100, blank=True, default='')
+    estado = models.CharField(_('Estado (UF)'), max_length=2, blank=True, default='')
+
+    def __str__(self):
+        return f"{self.cep} ({self.latitude}, {self.longitude})"
+
+    class Meta:
+        verbose_name = _('Coordenada de CEP')
+        verbose_name_plural = _('Coordenadas de CEP')
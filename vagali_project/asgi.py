@@ -13,4 +13,19 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vagali_project.settings')
 
-application = get_asgi_application()
+# Inicializa o Django antes de importar módulos que usam os models
+django_application = get_asgi_application()
+
+from chat.websocket import ChatWebSocketApp  # noqa: E402
+
+chat_websocket_application = ChatWebSocketApp()
+
+
+async def application(scope, receive, send):
+    """ HTTP segue para o Django; WebSocket em /ws/chat/ vai para o chat. """
+    if scope['type'] == 'websocket':
+        if scope['path'].startswith('/ws/chat/'):
+            return await chat_websocket_application(scope, receive, send)
+        await receive()  # websocket.connect
+        return await send({'type': 'websocket.close', 'code': 4404})
+    return await django_application(scope, receive, send)
@@ -0,0 +1,128 @@
+# vagali_project/conditional.py
+
+"""
+Suporte a GET condicional (ETag / Last-Modified) para as views da API.
+
+Se o cliente já tem a versão atual (If-None-Match ou If-Modified-Since),
+a view responde 304 sem serializar nada.
+"""
+
+import hashlib
+
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def nao_modificado(request, etag=None, last_modified=None):
+    """
+    Retorna True se a representação que o cliente tem em cache ainda é válida.
+    'last_modified' é um timestamp (segundos). If-None-Match tem precedência (RFC 9110).
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and etag:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or quote_etag(etag) in etags
+
+    if_modified_since = request.headers.get('If-Modified-Since')
+    if if_modified_since and last_modified is not None:
+        desde = parse_http_date_safe(if_modified_since)
+        return desde is not None and int(last_modified) <= desde
+
+    return False
+
+
+def aplicar_cabecalhos(response, etag=None, last_modified=None):
+    """Adiciona ETag/Last-Modified e obriga o navegador a revalidar (no-cache)."""
+    patch_vary_headers(response, ['Authorization'])
+    if etag:
+        response['ETag'] = quote_etag(etag)
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(int(last_modified))
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def resposta_condicional(request, construir_dados, etag=None, last_modified=None):
+    """
+    Responde 304 se o cliente estiver atualizado; caso contrário chama 'construir_dados()'
+    (só então serializa) e devolve 200 com os cabeçalhos de validação.
+    """
+    if nao_modificado(request, etag, last_modified):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(construir_dados())
+    return aplicar_cabecalhos(response, etag, last_modified)
+
+
+def _valor_por_caminho(obj, caminho):
+    """Segue 'client__profile__updated_at' a partir do objeto (None se algum elo faltar)."""
+    for parte in caminho.split('__'):
+        obj = getattr(obj, parte, None)
+        if obj is None:
+            return None
+    return obj
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified para list/retrieve de ViewSets, sem rodar serializers no 304.
+
+    - retrieve: versão = campos 'etag_campos' do próprio objeto (já carregado por get_object).
+    - list: versão = a página que seria servida (id + 'etag_campos' de cada linha, e se há
+      próxima página). Só lê a página (custo limitado pelo page_size), nunca o queryset
+      inteiro; o 304 economiza a serialização e a transferência. Só ETag: a maior data
+      das linhas não muda quando uma linha é excluída ou sai da página, então um
+      Last-Modified geraria 304 com a lista desatualizada.
+    'etag_campos' são datas (também dão o Last-Modified do retrieve); 'etag_campos_extras'
+    são valores exibidos que não têm data própria (ex: nome do serviço, e-mail do usuário)
+    e entram só no ETag. Os caminhos devem estar no select_related do queryset (sem consulta por linha).
+    O ETag também inclui a URL (filtros/cursor) e o usuário, pois o conteúdo depende deles.
+    """
+    etag_campos = ('updated_at',)
+    etag_campos_extras = ()
+
+    def _etag(self, request, *partes):
+        bruto = '|'.join(str(p) for p in (request.get_full_path(), request.user.pk, *partes))
+        return hashlib.sha1(bruto.encode('utf-8')).hexdigest()
+
+    def _last_modified(self, datas):
+        datas = [d for d in datas if d is not None]
+        return max(datas).timestamp() if datas else None
+
+    def _versao_do_objeto(self, obj):
+        datas = [_valor_por_caminho(obj, campo) for campo in self.etag_campos]
+        extras = [_valor_por_caminho(obj, campo) for campo in self.etag_campos_extras]
+        return datas, extras
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objetos = page if page is not None else list(queryset)
+
+        linhas = []
+        for obj in objetos:
+            datas, extras = self._versao_do_objeto(obj)
+            linhas.append((obj.pk, *datas, *extras))
+        proxima = getattr(self.paginator, 'has_next', None) if page is not None else None
+        etag = self._etag(request, proxima, linhas)
+
+        if nao_modificado(request, etag):
+            return aplicar_cabecalhos(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        if page is not None:
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        else:
+            response = Response(self.get_serializer(objetos, many=True).data)
+        return aplicar_cabecalhos(response, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        datas, extras = self._versao_do_objeto(instance)
+        etag = self._etag(request, instance.pk, *datas, *extras)
+        last_modified = self._last_modified(datas)
+
+        return resposta_condicional(
+            request, lambda: self.get_serializer(instance).data, etag=etag, last_modified=last_modified
+        )
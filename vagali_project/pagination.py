@@ -0,0 +1,209 @@
+# vagali_project/pagination.py
+
+"""
+Paginação por chave (keyset/cursor) compartilhada pelas APIs.
+
+Em vez de OFFSET (que percorre e descarta todas as linhas anteriores), o cursor
+guarda os valores da última linha entregue, ex: (created_at, id), e a próxima
+página é buscada com:
+
+    WHERE (created_at < :c) OR (created_at = :c AND id < :id)
+    ORDER BY created_at DESC, id DESC LIMIT :n
+
+Com um índice composto na mesma ordem, a página 1000 custa o mesmo que a página 1.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+from functools import cmp_to_key
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por chave, apenas para frente (?cursor=<token opaco>).
+
+    A ordenação usada é a do próprio queryset (ex: ('-created_at', '-id')), o que
+    permite que filtros reordenem os resultados (ex: relevância da busca).
+    Se a ordenação não terminar em uma chave única, 'id' é acrescentado como desempate.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering)
+
+        valores = self.decode_cursor(request, queryset)
+        if valores is not None:
+            queryset = queryset.filter(self._filtro_apos(valores))
+
+        # Busca uma linha a mais só para saber se existe próxima página
+        resultados = list(queryset[:self.page_size + 1])
+        self.has_next = len(resultados) > self.page_size
+        self.page = resultados[:self.page_size]
+        return self.page
+
+    def paginate_ramos(self, ramos, request, view=None):
+        """
+        Pagina a união de querysets disjuntos (ex: registros do usuário como cliente e
+        como profissional) sem OR no SQL, que obrigaria a ordenar em tabela temporária:
+        cada ramo usa o próprio índice com o mesmo cursor e LIMIT, e as linhas são
+        intercaladas em Python (no máximo page_size + 1 por ramo).
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(ramos[0])
+        valores = self.decode_cursor(request, ramos[0])
+
+        resultados = []
+        for ramo in ramos:
+            ramo = ramo.order_by(*self.ordering)
+            if valores is not None:
+                ramo = ramo.filter(self._filtro_apos(valores))
+            resultados.extend(ramo[:self.page_size + 1])
+        resultados.sort(key=cmp_to_key(self._comparar))
+
+        self.has_next = len(resultados) > self.page_size
+        self.page = resultados[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    # --- Configuração ---
+    def get_page_size(self, request):
+        try:
+            tamanho = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(tamanho, self.max_page_size))
+
+    def get_ordering(self, queryset):
+        ordering = tuple(queryset.query.order_by)
+        if not ordering or not all(isinstance(campo, str) for campo in ordering):
+            ordering = tuple(self.ordering)
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering += ('-id' if ordering[-1].startswith('-') else 'id',)
+        return ordering
+
+    # --- Cursor ---
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        ultimo = self.page[-1]
+        valores = [getattr(ultimo, campo.lstrip('-')) for campo in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(valores))
+
+    def encode_cursor(self, valores):
+        bruto = json.dumps(valores, default=str, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(bruto).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request, queryset):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            bruto = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            valores = json.loads(bruto.decode('utf-8'))
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(valores, list) or len(valores) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return [
+            self._converter(queryset, campo.lstrip('-'), valor)
+            for campo, valor in zip(self.ordering, valores)
+        ]
+
+    # --- Auxiliares ---
+    def _filtro_apos(self, valores):
+        """
+        Monta a condição "linha vem depois do cursor" para ordenação composta:
+        (a > va) OR (a = va AND b > vb) OR (a = va AND b = vb AND c > vc) ...
+        """
+        condicao = Q()
+        iguais = {}
+        for campo, valor in zip(self.ordering, valores):
+            nome = campo.lstrip('-')
+            operador = 'lt' if campo.startswith('-') else 'gt'
+            condicao |= Q(**iguais, **{f'{nome}__{operador}': valor})
+            iguais[nome] = valor
+        return condicao
+
+    def _comparar(self, a, b):
+        """Compara duas linhas pela ordenação da paginação (para intercalar ramos)."""
+        for campo in self.ordering:
+            nome = campo.lstrip('-')
+            valor_a, valor_b = getattr(a, nome), getattr(b, nome)
+            if valor_a != valor_b:
+                resultado = -1 if valor_a < valor_b else 1
+                return -resultado if campo.startswith('-') else resultado
+        return 0
+
+    def _converter(self, queryset, campo, valor):
+        """
+        Converte o valor do cursor para o tipo do campo. O token vem do cliente: qualquer
+        valor que não converta (ex: id 'abc', mês 13) é um cursor inválido (404), não um 500.
+        """
+        try:
+            field = queryset.model._meta.get_field(campo)
+        except FieldDoesNotExist:
+            # Anotações (ex: search_rank) são números
+            if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+                raise NotFound(self.invalid_cursor_message)
+            return valor
+        try:
+            convertido = field.to_python(valor)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if convertido is None:
+            raise NotFound(self.invalid_cursor_message)
+        return convertido
+
+
+class ListagemPorRamosMixin:
+    """
+    Listagem paginada pela união dos querysets de get_ramos() (ver
+    KeysetPagination.paginate_ramos). get_queryset() continua valendo para o
+    detalhe e as ações por pk.
+    """
+
+    def get_ramos(self):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        pagina = self.paginator.paginate_ramos(self.get_ramos(), request, view=self)
+        return self.get_paginated_response(self.get_serializer(pagina, many=True).data)
+
+
+class ProfissionalKeysetPagination(KeysetPagination):
+    """ Profissionais: chave estável 'id' (ou relevância + id quando há ?search=). """
+    ordering = ('id',)
+
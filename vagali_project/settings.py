@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +45,9 @@ INSTALLED_APPS = [
     'rest_framework',
     'django_filters',
     'app_servicos',
+    'localizacao',
+    'chat',
+    'agenda',
 
     'djoser',
     'rest_framework.authtoken',
@@ -62,9 +66,9 @@ LOGOUT_REDIRECT_URL = '/'
 # 🚨 4. CRÍTICO: Configuração do Backend de Autenticação
 # Garante que o Django saiba como autenticar um usuário customizado pelo campo correto (email)
 AUTHENTICATION_BACKENDS = [
-    # 🚨 CORREÇÃO: Adiciona o backend customizado para login por email
+    # Backend único: login por email (e permissões do admin, herdadas do ModelBackend).
+    # Um segundo backend faria outra busca + outro hash a cada login que falha.
     'accounts.backends.EmailBackend', 
-    'django.contrib.auth.backends.ModelBackend',
 ]
 
 MIDDLEWARE = [
@@ -76,6 +80,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # 429 quando o pool de hash de senha está cheio (ver PASSWORD_HASH_POOL)
+    'accounts.middleware.HashPoolSaturadoMiddleware',
 ]
 
 
@@ -122,10 +128,85 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # BEGIN IMMEDIATE nos blocos atomic(): escritores concorrentes esperam a vez
+            # (até 'timeout' segundos) em vez de falhar com "database is locked" no meio da transação.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        'TEST': {
+            # Banco de teste em arquivo: o SQLite em memória compartilhada não espera locks,
+            # e os testes de concorrência (várias threads/conexões) precisam disso.
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# 'default' é local à memória do processo. O catálogo de serviços guarda a sua VERSÃO
+# no cache CATALOGO_CACHE_ALIAS: com ele local, só o worker que gravou a alteração troca
+# de versão e os demais servem o catálogo antigo (com ETag válido). A chave de versão não
+# expira (timeout=None), então isso dura até o worker reiniciar, não só alguns minutos.
+# Isso só é correto com um único processo; em produção com vários workers, aponte
+# CATALOGO_CACHE_ALIAS para um backend compartilhado (ex: FileBasedCache, Redis, Memcached).
+# 'manage.py check --deploy' avisa (app_servicos.W001) enquanto ele for local.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'vagali-default',
+    },
+}
+
+CATALOGO_CACHE_ALIAS = 'default'
+
+# Cache em memória (por processo) de token -> usuário usado por
+# accounts.authentication.CachedTokenAuthentication. Logout, troca de senha e
+# desativação invalidam a entrada no processo atual; nos demais, ela expira após TTL segundos.
+TOKEN_AUTH_CACHE = {
+    'TTL': 60,
+    'MAX_ENTRIES': 10000,
+}
+
+
+# JWT (djangorestframework-simplejwt): access curto verificado só pela assinatura e
+# refresh de uso único (rotação). Refresh revogados ficam em accounts.TokenRevogado até
+# expirarem (limpeza: python manage.py limpar_tokens_revogados).
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    'ROTATE_REFRESH_TOKENS': True,
+    # A revogação é feita por accounts.tokens (sem o app token_blacklist, que guarda todo token emitido)
+    'BLACKLIST_AFTER_ROTATION': False,
+    # Claim com hash da senha: trocar a senha invalida os tokens já emitidos
+    'CHECK_REVOKE_TOKEN': True,
+    'AUTH_HEADER_TYPES': ('Bearer',),
+    'UPDATE_LAST_LOGIN': False,
+}
+
+
+# Hash de senha: o primeiro hasher é o PBKDF2-SHA256 padrão do Django (mesmo formato),
+# opcionalmente calculado em um pool de processos (accounts/hashers.py).
+PASSWORD_HASHERS = [
+    'accounts.hashers.PoolPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# ATIVO: calcula o PBKDF2 fora da thread da requisição, em até PROCESSOS processos.
+# FILA_MAXIMA: hashes em andamento/aguardando por processo web; acima disso, 429 imediato (0: sem limite).
+PASSWORD_HASH_POOL = {
+    'ATIVO': False,
+    'PROCESSOS': 2,
+    'FILA_MAXIMA': 16,
+    'TIMEOUT': 10,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -162,16 +243,32 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploads (foto de perfil, banner e portfólio), gravados pelo default_storage
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Djoser (rotas 'users/'): cadastro e troca de e-mail normalizam o e-mail antes da
+# validação de unicidade (accounts/api/serializers.py).
+DJOSER = {
+    'SERIALIZERS': {
+        'user_create': 'accounts.api.serializers.UsuarioCreateSerializer',
+        'set_username': 'accounts.api.serializers.SetEmailSerializer',
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         # O método mais seguro e padrão para APIs Mobile/SPA
-        'rest_framework.authentication.TokenAuthentication', 
+        # (TokenAuthentication com cache de token -> usuário, ver accounts/authentication.py)
+        'accounts.authentication.CachedTokenAuthentication',
+        # "Authorization: Bearer <access>" (JWT, ver accounts/tokens.py)
+        'accounts.authentication.CachedJWTAuthentication',
         
         # Manter a autenticação de Sessão para a "Browsable API" (a tela do navegador)
         'rest_framework.authentication.SessionAuthentication',
@@ -186,5 +283,53 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter', # Adiciona a funcionalidade de busca
     ),
 
-    
-}
\ No newline at end of file
+    # Limites dos endpoints caros (hash de senha / envio de e-mail), ver vagali_project/throttling.py
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '20/min',
+        'login_email': '10/min',
+        'cadastro_ip': '20/hour',
+        'reset_senha_ip': '10/hour',
+        'reset_senha_email': '3/hour',
+    },
+}
+
+# Armazenamento dos contadores de throttle. MemoriaStore conta por processo; com vários
+# workers use o CacheStore apontando para um cache compartilhado (Redis/Memcached):
+# THROTTLE_STORE = {'BACKEND': 'vagali_project.throttling.CacheStore', 'CACHE_ALIAS': 'default'}
+THROTTLE_STORE = {
+    'BACKEND': 'vagali_project.throttling.MemoriaStore',
+    'MAX_CHAVES': 100000,
+}
+
+
+# Channel layer do chat (entrega das mensagens aos WebSockets de /ws/chat/).
+# InMemoryChannelLayer atende um único processo ASGI; com vários processos/nós use
+# o fan-out por LISTEN/NOTIFY do PostgreSQL:
+# CHAT_CHANNEL_LAYER = {'BACKEND': 'chat.layers.PostgresNotifyChannelLayer', 'CANAL': 'vagali_chat', 'CAPACIDADE': 100}
+CHAT_CHANNEL_LAYER = {
+    'BACKEND': 'chat.layers.InMemoryChannelLayer',
+    'CAPACIDADE': 100,
+}
+
+
+# Agenda dos profissionais: duração de cada horário oferecido e cache dos horários
+# livres por (profissional, dia), invalidado por versão a cada regra/exceção/agendamento.
+AGENDA = {
+    'DURACAO_SLOT_MINUTOS': 60,
+    'CACHE_ALIAS': 'default',
+    'CACHE_TIMEOUT': 10 * 60,
+}
+
+
+# Upload de mídia (accounts/midia.py). Arquivos completos vão para o default_storage
+# (MEDIA_ROOT) com o SHA-256 no nome; os pedaços dos uploads retomáveis ficam em
+# DIRETORIO_PARCIAL, que precisa ser compartilhado entre os nós se houver mais de um
+# (um pedaço pode chegar a outro servidor). Sessões abandonadas e arquivos sem uso
+# são removidos pelo comando 'limpar_midia'.
+MIDIA = {
+    'TAMANHO_MAXIMO': 10 * 1024 * 1024,
+    'TAMANHO_PEDACO_MAXIMO': 5 * 1024 * 1024,
+    'DIRETORIO_PARCIAL': BASE_DIR / 'uploads_parciais',
+    'TRAVA_SEGUNDOS': 5 * 60,
+    'SESSAO_EXPIRA_HORAS': 24,
+}
@@ -0,0 +1,180 @@
+# vagali_project/throttling.py
+
+"""
+Limite de requisições (rate limiting) para os endpoints caros: login, cadastro e
+recuperação de senha. Cada tentativa nesses endpoints custa um hash PBKDF2 ou um
+e-mail; o throttle roda antes da view, então o excesso é recusado (429) sem chegar
+ao hasher nem ao envio de e-mail.
+
+As taxas ficam em REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] (ex: 'login_ip': '20/min')
+e o armazenamento em THROTTLE_STORE:
+
+- MemoriaStore (padrão): token bucket em memória, por processo. Sem I/O, mas cada
+  worker tem o seu próprio limite.
+- CacheStore: janela deslizante aproximada (duas janelas fixas ponderadas) sobre um
+  cache compartilhado (Redis/Memcached), usando add/incr atômicos. Para deploys com
+  vários workers.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from accounts.models import User
+
+
+# --- 1. Armazenamentos ---
+class MemoriaStore:
+    """ Token bucket por chave, limitado a 'max_chaves' (LRU) para não crescer sem fim. """
+
+    def __init__(self, max_chaves=100000, **kwargs):
+        self.max_chaves = max_chaves
+        self._baldes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consumir(self, chave, capacidade, periodo):
+        """Retorna (permitido, segundos até a próxima ficha)."""
+        agora = time.monotonic()
+        taxa = capacidade / periodo
+        with self._lock:
+            fichas, ultimo = self._baldes.get(chave, (capacidade, agora))
+            fichas = min(capacidade, fichas + (agora - ultimo) * taxa)
+            permitido = fichas >= 1
+            if permitido:
+                fichas -= 1
+            self._baldes[chave] = (fichas, agora)
+            self._baldes.move_to_end(chave)
+            while len(self._baldes) > self.max_chaves:
+                self._baldes.popitem(last=False)
+        return permitido, 0 if permitido else (1 - fichas) / taxa
+
+    def limpar(self):
+        with self._lock:
+            self._baldes.clear()
+
+
+class CacheStore:
+    """ Janela deslizante aproximada sobre um cache do Django compartilhado entre workers. """
+
+    def __init__(self, cache_alias='default', **kwargs):
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def consumir(self, chave, capacidade, periodo):
+        agora = time.time()
+        janela = int(agora // periodo)
+        atual = f'throttle:{chave}:{janela}'
+        # add() só cria se não existir; incr() é atômico nos backends compartilhados
+        self.cache.add(atual, 0, timeout=periodo * 2)
+        try:
+            contagem = self.cache.incr(atual)
+        except ValueError:  # expirou entre o add e o incr
+            self.cache.add(atual, 1, timeout=periodo * 2)
+            contagem = 1
+        anterior = self.cache.get(f'throttle:{chave}:{janela - 1}', 0)
+        decorrido = (agora % periodo) / periodo
+        estimativa = anterior * (1 - decorrido) + contagem
+        if estimativa <= capacidade:
+            return True, 0
+        return False, periodo - (agora % periodo)
+
+    def limpar(self):
+        pass
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def throttle_store():
+    """Instância (por processo) do armazenamento configurado em THROTTLE_STORE."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = dict(getattr(settings, 'THROTTLE_STORE', {}))
+                classe = import_string(config.pop('BACKEND', 'vagali_project.throttling.MemoriaStore'))
+                _store = classe(**{k.lower(): v for k, v in config.items()})
+    return _store
+
+
+# --- 2. Throttles ---
+class BaseLimiteThrottle(SimpleRateThrottle):
+    """
+    Usa a configuração de taxas do DRF (por 'scope'), mas conta no THROTTLE_STORE.
+    Subclasses definem get_cache_key (por IP, por e-mail...).
+    """
+
+    def get_rate(self):
+        # Lido a cada instância (e não na definição da classe): escopo sem taxa = sem limite
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        permitido, self.espera = throttle_store().consumir(self.key, self.num_requests, self.duration)
+        return permitido
+
+    def wait(self):
+        return self.espera
+
+
+class IPThrottle(BaseLimiteThrottle):
+    """ Chave: IP do cliente (respeita NUM_PROXIES para X-Forwarded-For). """
+
+    def get_cache_key(self, request, view):
+        return f'{self.scope}:ip:{self.get_ident(request)}'
+
+
+class EmailThrottle(BaseLimiteThrottle):
+    """
+    Chave: e-mail enviado no corpo (normalizado). Limita tentativas contra uma mesma
+    conta mesmo quando vêm de muitos IPs.
+    """
+    campo = 'email'
+
+    def get_cache_key(self, request, view):
+        try:
+            email = request.data.get(self.campo)
+        except AttributeError:
+            return None
+        if not email or not isinstance(email, str):
+            return None
+        return f'{self.scope}:email:{User.objects.normalize_email(email)}'
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(EmailThrottle):
+    scope = 'login_email'
+
+
+class CadastroIPThrottle(IPThrottle):
+    scope = 'cadastro_ip'
+
+
+class ResetSenhaIPThrottle(IPThrottle):
+    scope = 'reset_senha_ip'
+
+
+class ResetSenhaEmailThrottle(EmailThrottle):
+    scope = 'reset_senha_email'
+
+
+LOGIN_THROTTLES = [LoginIPThrottle, LoginEmailThrottle]
+CADASTRO_THROTTLES = [CadastroIPThrottle]
+RESET_SENHA_THROTTLES = [ResetSenhaIPThrottle, ResetSenhaEmailThrottle]
@@ -1,13 +1,20 @@
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import TemplateView
+from rest_framework.routers import SimpleRouter
 
 # IMPORTAÇÕES DA AUTENTICAÇÃO
-from accounts.api.views import CustomAuthToken 
+from accounts.api.views import CustomAuthToken, JWTLoginView, JWTRefreshView, LogoutView, UsuarioDjoserViewSet
 from accounts.views import CadastroView 
 
 from app_servicos.api.views import DemandaViewSet 
 
+# Rotas 'users/' do Djoser servidas pela subclasse com throttle (têm precedência sobre djoser.urls)
+djoser_router = SimpleRouter()
+djoser_router.register('users', UsuarioDjoserViewSet, basename='user')
+
 
 urlpatterns = [
     # ------------------ ROTAS ADMINISTRATIVAS E TRADICIONAIS (HTML) ------------------
@@ -19,9 +26,17 @@ urlpatterns = [
     # 🚨 PONTO CRÍTICO: LOGIN CUSTOMIZADO (URL RENOMEADA) 🚨
     # Esta rota deve ser a primeira a ser verificada para evitar conflito com o Djoser.
     path('api/v1/auth/custom-login/', CustomAuthToken.as_view(), name='api_login'), 
+    path('api/v1/auth/logout/', LogoutView.as_view(), name='api_logout'),
+
+    # Modo JWT: access token assinado (sem consulta por requisição) + refresh rotativo
+    path('api/v1/auth/jwt/login/', JWTLoginView.as_view(), name='api_jwt_login'),
+    path('api/v1/auth/jwt/refresh/', JWTRefreshView.as_view(), name='api_jwt_refresh'),
 
     # 2. ROTAS DO DJOSER (MANTIDAS apenas as rotas de usuário/troca de senha, etc.)
     # ATENÇÃO: Removemos a inclusão de 'djoser.urls.authtoken' anteriormente.
+    path('api/v1/auth/', include(djoser_router.urls)),
+    # Caminho usado pelo front-end para "esqueci minha senha"
+    path('api/v1/auth/password/reset/', UsuarioDjoserViewSet.as_view({'post': 'reset_password'}), name='api_password_reset'),
     path('api/v1/auth/', include('djoser.urls')), 
     
     # 3. ROTA DE CADASTRO
@@ -32,4 +47,13 @@ urlpatterns = [
     
     # Rotas do app_servicos (Serviços e Demandas)
     path('api/v1/', include('app_servicos.api.urls')),
-]
\ No newline at end of file
+
+    # Chat (conversas e mensagens; entrega em tempo real pelo WebSocket /ws/chat/)
+    path('api/v1/chat/', include('chat.api.urls')),
+
+    # Agenda (disponibilidade, regras semanais, exceções e agendamentos)
+    path('api/v1/agenda/', include('agenda.api.urls')),
+]
+
+# Em desenvolvimento o próprio Django serve os uploads; em produção, o servidor web (MEDIA_ROOT)
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)